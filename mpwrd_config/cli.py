@@ -2,10 +2,12 @@ from __future__ import annotations
 
 import argparse
 import os
+import sys
 from pathlib import Path
 
 from mpwrd_config.core import DEFAULT_CONFIG_PATH, Config, WifiNetwork, config_to_toml, load_config, save_config
 from mpwrd_config.system import (
+    _append_output,
     ethernet_status,
     ip_addresses,
     list_ethernet_interfaces,
@@ -20,37 +22,6 @@ from mpwrd_config.system import (
     wifi_status,
     wifi_toggle,
 )
-from mpwrd_config.meshtastic import (
-    add_admin_key,
-    clear_admin_keys,
-    config_qr,
-    current_radio,
-    get_config_url,
-    get_legacy_admin_state,
-    get_private_key,
-    get_public_key,
-    i2c_state,
-    lora_settings,
-    list_admin_keys,
-    mesh_test,
-    meshtastic_info,
-    meshtastic_config,
-    meshtastic_summary,
-    meshtastic_update,
-    mac_address_source,
-    set_mac_address_source,
-    service_action as meshtastic_service_action,
-    service_enable as meshtastic_service_enable,
-    service_status as meshtastic_service_status,
-    set_lora_settings,
-    set_config_url,
-    set_legacy_admin_state,
-    set_private_key,
-    set_public_key,
-    set_radio,
-    uninstall,
-    upgrade,
-)
 from mpwrd_config.kernel_modules import (
     blacklist_module,
     disable_module,
@@ -68,22 +39,6 @@ from mpwrd_config.software_manager import (
     manage_full_control_conflicts,
     service_action as package_service_action,
 )
-from mpwrd_config.system_utils import (
-    act_led,
-    all_system_info,
-    cpu_info,
-    foxbuntu_version,
-    generate_ssh_keys,
-    logging_state,
-    networking_info,
-    os_info,
-    peripherals_info,
-    service_action as system_service_action,
-    service_status as system_service_status,
-    storage_info,
-    ttyd_action,
-)
-from mpwrd_config.tui_dialog import main as tui_main
 from mpwrd_config.time_config import current_timezone, set_time, set_timezone, status as time_status
 from mpwrd_config.watchclock import run_watchclock
 from mpwrd_config.wifi_mesh import run as wifi_mesh_run, sync_once as wifi_mesh_sync
@@ -380,8 +335,7 @@ def _cmd_wifi_toggle(path: Path, enable: bool) -> int:
     result = wifi_state("up" if enable else "down", interface=config.networking.wifi_interface)
     state = "enabled" if enable else "disabled"
     lines = [f"Wi-Fi {state} in config."]
-    if result.stdout.strip():
-        lines.append(result.stdout.strip())
+    _append_output(lines, result)
     print("\n".join(lines))
     return result.returncode
 
@@ -455,8 +409,15 @@ def _cmd_network_apply(path: Path) -> int:
     return max(result.returncode for result in results)
 
 
+def _print_output(text: str) -> None:
+    if text[-1:] == "\n" and not text[-2:-1].isspace():
+        sys.stdout.write(text)
+        return
+    print(text.rstrip())
+
+
 def _print_result(result) -> int:
-    print(result.stdout.rstrip())
+    _print_output(result.stdout)
     return result.returncode
 
 
@@ -505,19 +466,39 @@ def _cmd_software_action(package_dir: Path | None, name: str, action: str) -> in
     return result.returncode
 
 
+_SOFTWARE_SERVICE_FLAGS = {
+    "status": "-S",
+    "enable": "-e",
+    "disable": "-d",
+    "start": "-r",
+    "restart": "-r",
+    "stop": "-s",
+    "detailed": "-S",
+}
+
+
+_LORA_SET_FIELDS = (
+    ("region", "region"),
+    ("use_preset", "use_preset"),
+    ("preset", "modem_preset"),
+    ("bandwidth", "bandwidth"),
+    ("spread_factor", "spread_factor"),
+    ("coding_rate", "coding_rate"),
+    ("frequency_offset", "frequency_offset"),
+    ("hop_limit", "hop_limit"),
+    ("tx_enabled", "tx_enabled"),
+    ("tx_power", "tx_power"),
+    ("channel_num", "channel_num"),
+    ("override_duty_cycle", "override_duty_cycle"),
+    ("sx126x_rx_boosted_gain", "sx126x_rx_boosted_gain"),
+    ("override_frequency", "override_frequency"),
+    ("ignore_mqtt", "ignore_mqtt"),
+    ("ok_to_mqtt", "config_ok_to_mqtt"),
+)
+
+
 def _cmd_software_service(package_dir: Path | None, name: str, action: str) -> int:
-    flag_map = {
-        "status": "-S",
-        "enable": "-e",
-        "disable": "-d",
-        "start": "-r",
-        "restart": "-r",
-        "stop": "-s",
-        "detailed": "-S",
-    }
-    result = package_service_action(name, flag_map[action], package_dir)
-    print(result.stdout.rstrip())
-    return result.returncode
+    return _print_result(package_service_action(name, _SOFTWARE_SERVICE_FLAGS[action], package_dir))
 
 
 def main() -> int:
@@ -535,36 +516,34 @@ def main() -> int:
         if args.networking_command == "hostname" and args.hostname_command == "set":
             return _cmd_hostname_set(path, args.name)
         if args.networking_command == "wifi":
-            config = load_config(path)
             if args.wifi_command == "set":
                 return _cmd_wifi_set(path, args.ssid, args.psk, args.country)
             if args.wifi_command == "enable":
                 return _cmd_wifi_toggle(path, True)
             if args.wifi_command == "disable":
                 return _cmd_wifi_toggle(path, False)
-            if args.wifi_command == "status":
-                return _print_result(wifi_status(config.networking.wifi_interface))
-            if args.wifi_command == "up":
-                return _print_result(wifi_state("up", interface=config.networking.wifi_interface))
-            if args.wifi_command == "down":
-                return _print_result(wifi_state("down", interface=config.networking.wifi_interface))
-            if args.wifi_command == "toggle":
-                return _print_result(wifi_toggle(config.networking.wifi_interface))
-            if args.wifi_command == "restart":
-                return _print_result(wifi_restart(config.networking.wifi_interface))
             if args.wifi_command == "interfaces":
                 return _cmd_network_interfaces(path)
             if args.wifi_command == "set-interface":
                 return _cmd_wifi_set_interface(path, args.name)
             if args.wifi_command == "clear-interface":
                 return _cmd_wifi_set_interface(path, None)
+            wifi_interface = load_config(path).networking.wifi_interface
+            if args.wifi_command == "status":
+                return _print_result(wifi_status(wifi_interface))
+            if args.wifi_command == "up":
+                return _print_result(wifi_state("up", interface=wifi_interface))
+            if args.wifi_command == "down":
+                return _print_result(wifi_state("down", interface=wifi_interface))
+            if args.wifi_command == "toggle":
+                return _print_result(wifi_toggle(wifi_interface))
+            if args.wifi_command == "restart":
+                return _print_result(wifi_restart(wifi_interface))
         if args.networking_command == "eth-status":
-            config = load_config(path)
-            return _print_result(ethernet_status(config.networking.ethernet_interface))
+            return _print_result(ethernet_status(load_config(path).networking.ethernet_interface))
         if args.networking_command == "ethernet":
-            config = load_config(path)
             if args.ethernet_command == "status":
-                return _print_result(ethernet_status(config.networking.ethernet_interface))
+                return _print_result(ethernet_status(load_config(path).networking.ethernet_interface))
             if args.ethernet_command == "set-interface":
                 return _cmd_ethernet_set_interface(path, args.name)
             if args.ethernet_command == "clear-interface":
@@ -583,47 +562,78 @@ def main() -> int:
         if args.system_command == "shutdown":
             return _print_result(system_shutdown())
     if args.command == "services":
+        from mpwrd_config.system_utils import service_action as system_service_action
+
         return _print_result(system_service_action(args.service, args.action))
     if args.command == "meshtastic":
-        if args.meshtastic_command == "info":
-            return _print_result(meshtastic_info())
-        if args.meshtastic_command == "summary":
-            return _print_result(meshtastic_summary())
+        from mpwrd_config.meshtastic import (
+            add_admin_key,
+            clear_admin_keys,
+            config_qr,
+            current_radio,
+            get_config_url,
+            get_legacy_admin_state,
+            get_private_key,
+            get_public_key,
+            i2c_state,
+            lora_settings,
+            list_admin_keys,
+            mesh_test,
+            meshtastic_info,
+            meshtastic_config,
+            meshtastic_summary,
+            meshtastic_update,
+            mac_address_source,
+            set_mac_address_source,
+            service_action as meshtastic_service_action,
+            service_enable as meshtastic_service_enable,
+            service_status as meshtastic_service_status,
+            set_lora_settings,
+            set_config_url,
+            set_legacy_admin_state,
+            set_private_key,
+            set_public_key,
+            set_radio,
+            uninstall,
+            upgrade,
+        )
+
+        simple_commands = {
+            "info": meshtastic_info,
+            "summary": meshtastic_summary,
+            "config-qr": config_qr,
+            "config-url": get_config_url,
+            "public-key": get_public_key,
+            "private-key": get_private_key,
+            "admin-keys": list_admin_keys,
+            "clear-admin-keys": clear_admin_keys,
+            "legacy-admin": get_legacy_admin_state,
+            "radio": current_radio,
+            "mac-source": mac_address_source,
+            "mesh-test": mesh_test,
+            "upgrade": upgrade,
+            "uninstall": uninstall,
+        }
+        simple_command = simple_commands.get(args.meshtastic_command)
+        if simple_command:
+            return _print_result(simple_command())
         if args.meshtastic_command == "config":
             result = meshtastic_config(args.categories, quiet=args.quiet)
             if not args.quiet:
-                print(result.stdout.rstrip())
+                _print_output(result.stdout)
             return result.returncode
-        if args.meshtastic_command == "config-qr":
-            return _print_result(config_qr())
-        if args.meshtastic_command == "config-url":
-            return _print_result(get_config_url())
         if args.meshtastic_command == "set-config-url":
             return _print_result(set_config_url(args.url))
-        if args.meshtastic_command == "public-key":
-            return _print_result(get_public_key())
         if args.meshtastic_command == "set-public-key":
             return _print_result(set_public_key(args.key))
-        if args.meshtastic_command == "private-key":
-            return _print_result(get_private_key())
         if args.meshtastic_command == "set-private-key":
             return _print_result(set_private_key(args.key))
-        if args.meshtastic_command == "admin-keys":
-            return _print_result(list_admin_keys())
         if args.meshtastic_command == "add-admin-key":
             return _print_result(add_admin_key(args.key))
-        if args.meshtastic_command == "clear-admin-keys":
-            return _print_result(clear_admin_keys())
-        if args.meshtastic_command == "legacy-admin":
-            return _print_result(get_legacy_admin_state())
         if args.meshtastic_command == "set-legacy-admin":
             return _print_result(set_legacy_admin_state(args.enabled == "true"))
-        if args.meshtastic_command == "radio":
-            return _print_result(current_radio())
         if args.meshtastic_command == "set-radio":
             return _print_result(set_radio(args.model))
-        if args.meshtastic_command == "mac-source":
-            return _print_result(mac_address_source())
         if args.meshtastic_command == "set-mac-source":
             return _print_result(set_mac_address_source(args.source))
         if args.meshtastic_command == "service":
@@ -641,12 +651,6 @@ def main() -> int:
                 return _print_result(meshtastic_service_enable(False))
         if args.meshtastic_command == "i2c":
             return _print_result(i2c_state(args.state))
-        if args.meshtastic_command == "mesh-test":
-            return _print_result(mesh_test())
-        if args.meshtastic_command == "upgrade":
-            return _print_result(upgrade())
-        if args.meshtastic_command == "uninstall":
-            return _print_result(uninstall())
         if args.meshtastic_command == "update":
             return _print_result(meshtastic_update(args.update_command, attempts=args.attempts, label=args.label))
         if args.meshtastic_command == "lora":
@@ -659,38 +663,10 @@ def main() -> int:
                 return 0
             if args.lora_command == "set":
                 settings: dict[str, str] = {}
-                if args.region:
-                    settings["region"] = args.region
-                if args.use_preset:
-                    settings["use_preset"] = args.use_preset.lower()
-                if args.preset:
-                    settings["modem_preset"] = args.preset
-                if args.bandwidth:
-                    settings["bandwidth"] = args.bandwidth
-                if args.spread_factor:
-                    settings["spread_factor"] = args.spread_factor
-                if args.coding_rate:
-                    settings["coding_rate"] = args.coding_rate
-                if args.frequency_offset:
-                    settings["frequency_offset"] = args.frequency_offset
-                if args.hop_limit:
-                    settings["hop_limit"] = args.hop_limit
-                if args.tx_enabled:
-                    settings["tx_enabled"] = args.tx_enabled.lower()
-                if args.tx_power:
-                    settings["tx_power"] = args.tx_power
-                if args.channel_num:
-                    settings["channel_num"] = args.channel_num
-                if args.override_duty_cycle:
-                    settings["override_duty_cycle"] = args.override_duty_cycle.lower()
-                if args.sx126x_rx_boosted_gain:
-                    settings["sx126x_rx_boosted_gain"] = args.sx126x_rx_boosted_gain.lower()
-                if args.override_frequency:
-                    settings["override_frequency"] = args.override_frequency
-                if args.ignore_mqtt:
-                    settings["ignore_mqtt"] = args.ignore_mqtt.lower()
-                if args.ok_to_mqtt:
-                    settings["config_ok_to_mqtt"] = args.ok_to_mqtt.lower()
+                for dest, key in _LORA_SET_FIELDS:
+                    value = getattr(args, dest)
+                    if value:
+                        settings[key] = value
                 return _print_result(set_lora_settings(settings))
     if args.command == "kernel":
         if args.kernel_command == "boot":
@@ -708,6 +684,8 @@ def main() -> int:
         if args.kernel_command == "blacklist-clear":
             return _print_result(unblacklist_module(args.name))
     if args.command == "tui":
+        from mpwrd_config.tui_dialog import main as tui_main
+
         return tui_main()
     if args.command == "time":
         if args.time_command == "status":
@@ -744,6 +722,21 @@ def main() -> int:
         if args.software_command == "conflicts":
             return _print_result(manage_full_control_conflicts(args.action))
     if args.command == "utils":
+        from mpwrd_config.system_utils import (
+            act_led,
+            all_system_info,
+            cpu_info,
+            foxbuntu_version,
+            generate_ssh_keys,
+            logging_state,
+            networking_info,
+            os_info,
+            peripherals_info,
+            service_status as system_service_status,
+            storage_info,
+            ttyd_action,
+        )
+
         if args.utils_command == "act-led":
             return _print_result(act_led(args.state))
         if args.utils_command == "logging":
@@ -775,18 +768,15 @@ def main() -> int:
                 threshold_seconds=args.threshold_seconds,
                 interval_seconds=args.interval_seconds,
             )
-            print(result.stdout.rstrip())
-            return result.returncode
+            return _print_result(result)
     if args.command == "wifi-mesh":
         if args.wifi_mesh_command == "run":
-            result = wifi_mesh_run()
-            print(result.stdout.rstrip())
-            return result.returncode
+            return _print_result(wifi_mesh_run())
         if args.wifi_mesh_command == "sync":
-            result = wifi_mesh_sync()
-            print(result.stdout.rstrip())
-            return result.returncode
+            return _print_result(wifi_mesh_sync())
     if args.command == "wizard":
+        from mpwrd_config.tui_dialog import main as tui_main
+
         return tui_main(wizard=True)
 
     raise SystemExit("Unknown command")
@@ -15,6 +15,8 @@ import tomli_w
 DEFAULT_CONFIG_PATH = Path("/etc/mpwrd-config.toml")
 LEGACY_CONFIG_PATH = Path("/etc/femto-config.toml")
 
+_CONFIG_CACHE: Dict[Path, tuple[tuple[int, int], Dict[str, Any]]] = {}
+
 
 @dataclass
 class WifiNetwork:
@@ -101,12 +103,26 @@ def _resolve_config_path(path: Path) -> Path:
     return path
 
 
+def _config_stamp(path: Path) -> tuple[int, int] | None:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
 def load_config(path: Path = DEFAULT_CONFIG_PATH) -> Config:
     path = _resolve_config_path(path)
-    if not path.exists():
+    stamp = _config_stamp(path)
+    if stamp is None:
+        _CONFIG_CACHE.pop(path, None)
         return Config()
+    cached = _CONFIG_CACHE.get(path)
+    if cached and cached[0] == stamp:
+        return Config.from_dict(cached[1])
     with path.open("rb") as handle:
         payload = tomllib.load(handle)
+    _CONFIG_CACHE[path] = (stamp, payload)
     return Config.from_dict(payload)
 
 
@@ -116,8 +132,12 @@ def _serialize_config(config: Config) -> str:
 
 def save_config(config: Config, path: Path = DEFAULT_CONFIG_PATH) -> bool:
     path = Path(path)
+    stamp = _config_stamp(path)
+    cached = _CONFIG_CACHE.get(path)
+    if stamp is not None and cached and cached[0] == stamp and cached[1] == config.to_dict():
+        return False
     content = _serialize_config(config)
-    if path.exists():
+    if stamp is not None:
         existing = path.read_text(encoding="utf-8")
         if existing == content:
             return False
@@ -126,6 +146,9 @@ def save_config(config: Config, path: Path = DEFAULT_CONFIG_PATH) -> bool:
         handle.write(content)
         temp_name = handle.name
     Path(temp_name).replace(path)
+    stamp = _config_stamp(path)
+    if stamp is not None:
+        _CONFIG_CACHE[path] = (stamp, tomllib.loads(content))
     return True
 
 
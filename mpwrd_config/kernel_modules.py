@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import os
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -9,6 +11,8 @@ from mpwrd_config.system import CommandResult, _run
 DEFAULT_MODULE_DIR = Path("/lib/modules")
 BOOT_MODULES_PATH = Path("/etc/modules")
 
+_MODULE_NAME_CACHE: dict[Path, tuple[float, list[str]]] = {}
+
 
 @dataclass
 class KernelModuleResult:
@@ -34,11 +38,8 @@ def _resolve_module_dir() -> Path:
 def list_boot_modules() -> KernelModuleResult:
     if not BOOT_MODULES_PATH.exists():
         return KernelModuleResult(returncode=0, stdout="none")
-    lines = [
-        line.strip()
-        for line in BOOT_MODULES_PATH.read_text(encoding="utf-8").splitlines()
-        if line.strip() and not line.strip().startswith("#")
-    ]
+    stripped = (line.strip() for line in BOOT_MODULES_PATH.read_text(encoding="utf-8").splitlines())
+    lines = [line for line in stripped if line and not line.startswith("#")]
     if not lines:
         return KernelModuleResult(returncode=0, stdout="none")
     return KernelModuleResult(returncode=0, stdout="\n".join(lines))
@@ -48,11 +49,7 @@ def list_active_modules() -> KernelModuleResult:
     result = _run(["lsmod"])
     if result.returncode != 0:
         return KernelModuleResult(returncode=1, stdout=result.stdout.strip())
-    lines = [
-        line.split()[0]
-        for idx, line in enumerate(result.stdout.splitlines())
-        if idx > 0 and line.strip()
-    ]
+    lines = [line.split(None, 1)[0] for line in result.stdout.splitlines()[1:] if line.strip()]
     if not lines:
         return KernelModuleResult(returncode=0, stdout="none")
     return KernelModuleResult(returncode=0, stdout="\n".join(lines))
@@ -103,32 +100,50 @@ def list_blacklisted_modules() -> KernelModuleResult:
 
 
 def _parse_module_list(output: str) -> set[str]:
-    return {
-        line.strip()
-        for line in output.splitlines()
-        if line.strip() and line.strip().lower() != "none"
-    }
+    modules = {line.strip() for line in output.splitlines()}
+    modules.discard("")
+    modules.discard("none")
+    return modules
 
 
-def list_module_overview() -> list[KernelModuleOverview]:
-    module_dir = _resolve_module_dir()
-    paths = list(module_dir.glob("*.ko*"))
-    if not paths:
-        paths = list(module_dir.rglob("*.ko*"))
-    names: list[str] = []
-    seen: set[str] = set()
-    for path in paths:
-        name = path.name
-        if ".ko" in name:
-            name = name.split(".ko")[0]
-        if not name or name in seen:
+def _module_dir_stamp(module_dir: Path) -> float | None:
+    for path in (module_dir / "modules.dep", module_dir):
+        try:
+            return os.stat(path).st_mtime
+        except OSError:
             continue
-        seen.add(name)
-        names.append(name)
-    names.sort()
-    boot_set = _parse_module_list(list_boot_modules().stdout)
-    active_set = _parse_module_list(list_active_modules().stdout)
-    blacklist_set = _parse_module_list(list_blacklisted_modules().stdout)
+    return None
+
+
+def _module_names(module_dir: Path) -> list[str]:
+    stamp = _module_dir_stamp(module_dir)
+    cached = _MODULE_NAME_CACHE.get(module_dir)
+    if stamp is not None and cached and cached[0] == stamp:
+        return cached[1]
+    seen: set[str] = set()
+    for pattern in ("*.ko*", "**/*.ko*"):
+        for path in module_dir.glob(pattern):
+            name = path.name.split(".ko")[0]
+            if name:
+                seen.add(name)
+        if seen:
+            break
+    names = sorted(seen)
+    if stamp is not None:
+        _MODULE_NAME_CACHE[module_dir] = (stamp, names)
+    return names
+
+
+def list_module_overview() -> list[KernelModuleOverview]:
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        names_future = pool.submit(lambda: _module_names(_resolve_module_dir()))
+        boot_future = pool.submit(list_boot_modules)
+        active_future = pool.submit(list_active_modules)
+        blacklist_future = pool.submit(list_blacklisted_modules)
+    names = names_future.result()
+    boot_set = _parse_module_list(boot_future.result().stdout)
+    active_set = _parse_module_list(active_future.result().stdout)
+    blacklist_set = _parse_module_list(blacklist_future.result().stdout)
     return [
         KernelModuleOverview(
             name=name,
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import base64
-import copy
 import json
 import os
 import re
@@ -12,6 +11,7 @@ import sys
 import threading
 import time
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Callable, Sequence
 
@@ -25,6 +25,7 @@ from mpwrd_config.system import CommandResult, _run, _run_live
 
 MESHTASTIC_HOST = os.environ.get("MESHTASTIC_HOST", "127.0.0.1")
 MESHTASTIC_TIMEOUT_SEC = float(os.environ.get("MESHTASTIC_TIMEOUT_SEC", "60"))
+_RUNNING_AS_ROOT = os.geteuid() == 0
 
 
 MESHTASTIC_CONFIG_DIR = Path("/etc/meshtasticd/config.d")
@@ -51,6 +52,8 @@ RADIO_CONFIG_MAP = {
     "lora-meshstick-1262": "lora-meshstick-1262.yaml",
 }
 RADIO_CONFIG_REVERSE = {value.lower(): key for key, value in RADIO_CONFIG_MAP.items()}
+_RADIO_MODELS = frozenset({*RADIO_CONFIG_MAP, "sim", "none"})
+_I2C_STATES = frozenset({"enable", "disable", "check"})
 
 OPENSUSE_REPO_PATTERN = re.compile(r"download\.opensuse\.org/repositories/network:/Meshtastic:/([a-z]+)/", re.I)
 PPA_REPO_PATTERN = re.compile(r"ppa\.launchpadcontent\.net/meshtastic/([a-z]+)/ubuntu", re.I)
@@ -77,13 +80,7 @@ def _service_action_with_recovery(action: str) -> CommandResult:
 
     reset = _run(["systemctl", "reset-failed", "meshtasticd"])
     retry = _run(["systemctl", action, "meshtasticd"])
-    parts: list[str] = []
-    if result.stdout.strip():
-        parts.append(result.stdout.strip())
-    if reset.stdout.strip():
-        parts.append(reset.stdout.strip())
-    if retry.stdout.strip():
-        parts.append(retry.stdout.strip())
+    parts = [output for output in (entry.stdout.strip() for entry in (result, reset, retry)) if output]
     if retry.returncode == 0:
         parts.append("Cleared failed state and retried.")
     return CommandResult(returncode=retry.returncode, stdout="\n".join(parts))
@@ -153,6 +150,15 @@ def _set_lora_module(module: str) -> CommandResult:
     return CommandResult(returncode=0, stdout=f"Lora.Module set to {module}.")
 
 
+_QR_HALF_BLOCKS = {
+    (True, True): "█",
+    (True, False): "▀",
+    (False, True): "▄",
+    (False, False): " ",
+}
+
+
+@lru_cache(maxsize=16)
 def _render_qr_text_python(data: str) -> str | None:
     try:
         import qrcode
@@ -181,19 +187,8 @@ def _render_qr_text_python(data: str) -> str | None:
 
     lines: list[str] = []
     for row in range(0, len(matrix), 2):
-        top = matrix[row]
-        bottom = matrix[row + 1]
-        chars: list[str] = []
-        for top_pixel, bottom_pixel in zip(top, bottom):
-            if top_pixel and bottom_pixel:
-                chars.append("█")
-            elif top_pixel and not bottom_pixel:
-                chars.append("▀")
-            elif not top_pixel and bottom_pixel:
-                chars.append("▄")
-            else:
-                chars.append(" ")
-        lines.append("".join(chars).rstrip())
+        pairs = zip(matrix[row], matrix[row + 1])
+        lines.append("".join(_QR_HALF_BLOCKS[bool(top), bool(bottom)] for top, bottom in pairs).rstrip())
 
     return "\n".join(lines).rstrip()
 
@@ -226,6 +221,7 @@ def _machine_id() -> str:
     return ""
 
 
+@lru_cache(maxsize=1)
 def _generated_cpu_mac() -> str | None:
     identifier = _cpu_serial() or _machine_id()
     if not identifier:
@@ -287,7 +283,7 @@ def mac_address_source() -> CommandResult:
 
 
 def set_mac_address_source(source: str) -> CommandResult:
-    if os.geteuid() != 0:
+    if not _RUNNING_AS_ROOT:
         return CommandResult(returncode=1, stdout="Must be run as root.")
     if not MESHTASTIC_MAIN_CONFIG_PATH.exists():
         return CommandResult(returncode=1, stdout="Meshtastic config.yaml not found.")
@@ -497,7 +493,7 @@ def meshtastic_repo_status() -> CommandResult:
 
 
 def set_meshtastic_repo(channel: str, install: bool = True, stream: bool = False) -> CommandResult:
-    if os.geteuid() != 0:
+    if not _RUNNING_AS_ROOT:
         return CommandResult(returncode=1, stdout="Must be run as root.")
     runner = _run_live if stream else _run
     channel = channel.strip().lower()
@@ -729,6 +725,17 @@ def _run_meshtastic_action(
             interface.close()
 
 
+_NODE_DROP_KEYS = frozenset({"raw", "decoded", "payload"})
+
+
+def _strip_node_keys(node: dict[str, Any]) -> dict[str, Any]:
+    return {
+        key: _strip_node_keys(value) if isinstance(value, dict) else value
+        for key, value in node.items()
+        if key not in _NODE_DROP_KEYS
+    }
+
+
 def _interface_info(interface: TCPInterface) -> str:
     owner = f"Owner: {interface.getLongName()} ({interface.getShortName()})"
     myinfo = f"\nMy info: {meshtastic_util.message_to_json(interface.myInfo)}" if interface.myInfo else ""
@@ -736,9 +743,7 @@ def _interface_info(interface: TCPInterface) -> str:
     nodes: dict[str, Any] = {}
     if interface.nodes:
         for node in interface.nodes.values():
-            node_copy = copy.deepcopy(node)
-            keys_to_remove = ("raw", "decoded", "payload")
-            meshtastic_util.remove_keys_from_dict(keys_to_remove, node_copy)
+            node_copy = _strip_node_keys(node)
             if "user" in node_copy and isinstance(node_copy["user"], dict) and "macaddr" in node_copy["user"]:
                 node_copy["user"]["macaddr"] = meshtastic_util.convert_mac_addr(node_copy["user"]["macaddr"])
             node_id = node_copy.get("user", {}).get("id")
@@ -1276,9 +1281,12 @@ def channel_set(
     value: str,
     session: MeshtasticSession | None = None,
 ) -> MeshtasticResult:
+    if index < 0:
+        return MeshtasticResult(returncode=1, stdout="Invalid channel index.")
+
     def _build(interface: TCPInterface) -> MeshtasticResult:
         node = _get_node(interface)
-        if index < 0 or index >= len(node.channels):
+        if index >= len(node.channels):
             return MeshtasticResult(returncode=1, stdout="Invalid channel index.")
         ch = node.channels[index]
         if field == "psk":
@@ -1299,9 +1307,10 @@ def channel_set(
 
 
 def channel_add(name: str, session: MeshtasticSession | None = None) -> MeshtasticResult:
+    if len(name) > 10:
+        return MeshtasticResult(returncode=1, stdout="Channel name must be shorter than 10 characters.")
+
     def _build(interface: TCPInterface) -> MeshtasticResult:
-        if len(name) > 10:
-            return MeshtasticResult(returncode=1, stdout="Channel name must be shorter than 10 characters.")
         node = _get_node(interface)
         if node.getChannelByName(name):
             return MeshtasticResult(returncode=1, stdout=f"Channel '{name}' already exists.")
@@ -1342,10 +1351,12 @@ def channel_delete(index: int, session: MeshtasticSession | None = None) -> Mesh
 def channel_enable(index: int, session: MeshtasticSession | None = None) -> MeshtasticResult:
     if index == 0:
         return MeshtasticResult(returncode=1, stdout="Cannot enable primary channel.")
+    if index < 0:
+        return MeshtasticResult(returncode=1, stdout="Invalid channel index.")
 
     def _build(interface: TCPInterface) -> MeshtasticResult:
         node = _get_node(interface)
-        if index < 0 or index >= len(node.channels):
+        if index >= len(node.channels):
             return MeshtasticResult(returncode=1, stdout="Invalid channel index.")
         ch = node.channels[index]
         ch.role = channel_pb2.Channel.Role.SECONDARY
@@ -1362,10 +1373,12 @@ def channel_enable(index: int, session: MeshtasticSession | None = None) -> Mesh
 def channel_disable(index: int, session: MeshtasticSession | None = None) -> MeshtasticResult:
     if index == 0:
         return MeshtasticResult(returncode=1, stdout="Cannot disable primary channel.")
+    if index < 0:
+        return MeshtasticResult(returncode=1, stdout="Invalid channel index.")
 
     def _build(interface: TCPInterface) -> MeshtasticResult:
         node = _get_node(interface)
-        if index < 0 or index >= len(node.channels):
+        if index >= len(node.channels):
             return MeshtasticResult(returncode=1, stdout="Invalid channel index.")
         ch = node.channels[index]
         ch.role = channel_pb2.Channel.Role.DISABLED
@@ -1380,6 +1393,9 @@ def channel_disable(index: int, session: MeshtasticSession | None = None) -> Mes
 
 
 def channel_set_url(url: str, session: MeshtasticSession | None = None) -> MeshtasticResult:
+    if not url.strip():
+        return MeshtasticResult(returncode=1, stdout="Channel URL cannot be empty.")
+
     def _build(interface: TCPInterface) -> MeshtasticResult:
         node = _get_node(interface)
         try:
@@ -1396,6 +1412,9 @@ def channel_set_url(url: str, session: MeshtasticSession | None = None) -> Mesht
 
 
 def channel_add_url(url: str, session: MeshtasticSession | None = None) -> MeshtasticResult:
+    if not url.strip():
+        return MeshtasticResult(returncode=1, stdout="Channel URL cannot be empty.")
+
     def _build(interface: TCPInterface) -> MeshtasticResult:
         node = _get_node(interface)
         try:
@@ -1411,6 +1430,32 @@ def channel_add_url(url: str, session: MeshtasticSession | None = None) -> Mesht
     )
 
 
+_LORA_SETTING_FIELDS = (
+    ("lora_region", "region"),
+    ("lora_usePreset", "use_preset"),
+    ("lora_modemPreset", "modem_preset"),
+    ("lora_bandwidth", "bandwidth"),
+    ("lora_spreadFactor", "spread_factor"),
+    ("lora_codingRate", "coding_rate"),
+    ("lora_frequencyOffset", "frequency_offset"),
+    ("lora_hopLimit", "hop_limit"),
+    ("lora_txEnabled", "tx_enabled"),
+    ("lora_txPower", "tx_power"),
+    ("lora_channelNum", "channel_num"),
+    ("lora_overrideDutyCycle", "override_duty_cycle"),
+    ("lora_sx126xRxBoostedGain", "sx126x_rx_boosted_gain"),
+    ("lora_overrideFrequency", "override_frequency"),
+    ("lora_ignoreMqtt", "ignore_mqtt"),
+    ("lora_configOkToMqtt", "config_ok_to_mqtt"),
+)
+_LORA_PREFERENCE_KEYS = {attr: f"lora.{attr}" for _, attr in _LORA_SETTING_FIELDS}
+
+
+def _lora_settings_dict(interface: TCPInterface) -> dict[str, Any]:
+    lora = interface.localNode.localConfig.lora
+    return {key: getattr(lora, attr) for key, attr in _LORA_SETTING_FIELDS}
+
+
 def lora_settings(session: MeshtasticSession | None = None) -> tuple[MeshtasticResult, dict[str, Any]]:
     close_interface = session is None
     if session is None:
@@ -1421,52 +1466,14 @@ def lora_settings(session: MeshtasticSession | None = None) -> tuple[MeshtasticR
         return error or MeshtasticResult(returncode=1, stdout="Unable to connect to Meshtastic."), {}
 
     try:
-        lora = interface.localNode.localConfig.lora
-        info = _interface_info(interface)
-        return MeshtasticResult(returncode=0, stdout=info), {
-            "lora_region": lora.region,
-            "lora_usePreset": lora.use_preset,
-            "lora_modemPreset": lora.modem_preset,
-            "lora_bandwidth": lora.bandwidth,
-            "lora_spreadFactor": lora.spread_factor,
-            "lora_codingRate": lora.coding_rate,
-            "lora_frequencyOffset": lora.frequency_offset,
-            "lora_hopLimit": lora.hop_limit,
-            "lora_txEnabled": lora.tx_enabled,
-            "lora_txPower": lora.tx_power,
-            "lora_channelNum": lora.channel_num,
-            "lora_overrideDutyCycle": lora.override_duty_cycle,
-            "lora_sx126xRxBoostedGain": lora.sx126x_rx_boosted_gain,
-            "lora_overrideFrequency": lora.override_frequency,
-            "lora_ignoreMqtt": lora.ignore_mqtt,
-            "lora_configOkToMqtt": lora.config_ok_to_mqtt,
-        }
+        return MeshtasticResult(returncode=0, stdout=""), _lora_settings_dict(interface)
     except Exception:
         if session is None:
             return MeshtasticResult(returncode=1, stdout="Unable to connect to Meshtastic."), {}
         retry_error, retry_interface = session.get_interface(wait_for_config=True, reconnect=True)
         if retry_error or not retry_interface:
             return retry_error or MeshtasticResult(returncode=1, stdout="Unable to connect to Meshtastic."), {}
-        lora = retry_interface.localNode.localConfig.lora
-        info = _interface_info(retry_interface)
-        return MeshtasticResult(returncode=0, stdout=info), {
-            "lora_region": lora.region,
-            "lora_usePreset": lora.use_preset,
-            "lora_modemPreset": lora.modem_preset,
-            "lora_bandwidth": lora.bandwidth,
-            "lora_spreadFactor": lora.spread_factor,
-            "lora_codingRate": lora.coding_rate,
-            "lora_frequencyOffset": lora.frequency_offset,
-            "lora_hopLimit": lora.hop_limit,
-            "lora_txEnabled": lora.tx_enabled,
-            "lora_txPower": lora.tx_power,
-            "lora_channelNum": lora.channel_num,
-            "lora_overrideDutyCycle": lora.override_duty_cycle,
-            "lora_sx126xRxBoostedGain": lora.sx126x_rx_boosted_gain,
-            "lora_overrideFrequency": lora.override_frequency,
-            "lora_ignoreMqtt": lora.ignore_mqtt,
-            "lora_configOkToMqtt": lora.config_ok_to_mqtt,
-        }
+        return MeshtasticResult(returncode=0, stdout=""), _lora_settings_dict(retry_interface)
     finally:
         if close_interface:
             interface.close()
@@ -1478,28 +1485,10 @@ def set_lora_settings(
     session: MeshtasticSession | None = None,
 ) -> MeshtasticResult:
     updates: list[tuple[str, str]] = []
-    mapping = {
-        "region": "lora.region",
-        "use_preset": "lora.use_preset",
-        "modem_preset": "lora.modem_preset",
-        "bandwidth": "lora.bandwidth",
-        "spread_factor": "lora.spread_factor",
-        "coding_rate": "lora.coding_rate",
-        "frequency_offset": "lora.frequency_offset",
-        "hop_limit": "lora.hop_limit",
-        "tx_enabled": "lora.tx_enabled",
-        "tx_power": "lora.tx_power",
-        "channel_num": "lora.channel_num",
-        "override_duty_cycle": "lora.override_duty_cycle",
-        "sx126x_rx_boosted_gain": "lora.sx126x_rx_boosted_gain",
-        "override_frequency": "lora.override_frequency",
-        "ignore_mqtt": "lora.ignore_mqtt",
-        "config_ok_to_mqtt": "lora.config_ok_to_mqtt",
-    }
     for key, value in settings.items():
         if value is None:
             continue
-        meshtastic_key = mapping.get(key)
+        meshtastic_key = _LORA_PREFERENCE_KEYS.get(key)
         if not meshtastic_key:
             continue
         updates.append((meshtastic_key, str(value)))
@@ -1668,6 +1657,8 @@ def current_radio() -> MeshtasticResult:
 
 
 def set_radio(model: str) -> CommandResult:
+    if model not in _RADIO_MODELS:
+        return CommandResult(returncode=1, stdout="Invalid radio model.")
     for path in MESHTASTIC_CONFIG_DIR.glob("femtofox_*.yaml"):
         path.unlink()
     if model == "sim":
@@ -1680,8 +1671,6 @@ def set_radio(model: str) -> CommandResult:
         if result.returncode != 0:
             return result
         return _service_action_with_recovery("restart")
-    if model not in RADIO_CONFIG_MAP:
-        return CommandResult(returncode=1, stdout="Invalid radio model.")
     result = _set_lora_module("auto")
     if result.returncode != 0:
         return result
@@ -1694,7 +1683,7 @@ def set_radio(model: str) -> CommandResult:
         destination_name = "femtofox_lora-meshstick-1262.yaml"
     destination = MESHTASTIC_CONFIG_DIR / destination_name
     if source.exists():
-        destination.write_bytes(source.read_bytes())
+        shutil.copyfile(source, destination)
     return _service_action_with_recovery("restart")
 
 
@@ -1708,7 +1697,7 @@ def service_enable(enable: bool) -> CommandResult:
     if enable:
         restart = _service_action_with_recovery("restart")
         if restart.returncode != 0:
-            parts = [entry.strip() for entry in (result.stdout, restart.stdout) if entry.strip()]
+            parts = [output for output in (result.stdout.strip(), restart.stdout.strip()) if output]
             return CommandResult(returncode=restart.returncode, stdout="\n".join(parts) or "Failed to restart meshtasticd.")
     else:
         _run(["systemctl", "stop", "meshtasticd"])
@@ -1736,6 +1725,8 @@ def mesh_test(session: MeshtasticSession | None = None) -> MeshtasticResult:
 
 
 def i2c_state(state: str) -> CommandResult:
+    if state not in _I2C_STATES:
+        return CommandResult(returncode=1, stdout="Invalid i2c state.")
     content = ""
     if MESHTASTIC_CONFIG_PATH.exists():
         content = MESHTASTIC_CONFIG_PATH.read_text(encoding="utf-8")
@@ -1748,11 +1739,9 @@ def i2c_state(state: str) -> CommandResult:
         content = re.sub(r"I2C:.*?I2CDevice: /dev/i2c-3\\n", "", content, flags=re.DOTALL)
         MESHTASTIC_CONFIG_PATH.write_text(content, encoding="utf-8")
         return _service_action_with_recovery("restart")
-    if state == "check":
-        if "I2C:" in content and "I2CDevice: /dev/i2c-3" in content:
-            return CommandResult(returncode=0, stdout="enabled")
-        return CommandResult(returncode=1, stdout="disabled")
-    return CommandResult(returncode=1, stdout="Invalid i2c state.")
+    if "I2C:" in content and "I2CDevice: /dev/i2c-3" in content:
+        return CommandResult(returncode=0, stdout="enabled")
+    return CommandResult(returncode=1, stdout="disabled")
 
 
 def upgrade(stream: bool = False) -> CommandResult:
@@ -1,11 +1,12 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Sequence
+from typing import ContextManager, Sequence
 
-from mpwrd_config.system import CommandResult, _run
+from mpwrd_config.system import CommandResult, service_action_many
 from mpwrd_config.software_packages import (
     PackageActionResult,
+    full_control_conflicts_stopped as _full_control_conflicts_stopped,
     get_package_spec,
     list_package_specs,
     manage_full_control_conflicts as _manage_full_control_conflicts,
@@ -13,6 +14,14 @@ from mpwrd_config.software_packages import (
 )
 
 
+_SERVICE_FLAG_ACTIONS = {
+    "-e": "enable",
+    "-d": "disable",
+    "-s": "stop",
+    "-r": "restart",
+}
+
+
 @dataclass
 class PackageInfo:
     key: str
@@ -104,31 +113,15 @@ def service_action(key: str, action: str, package_dir=None) -> CommandResult:
     spec = get_package_spec(key)
     if not spec.service_names:
         return CommandResult(returncode=1, stdout="No service defined for this package.")
-    action_map = {
-        "-e": "enable",
-        "-d": "disable",
-        "-s": "stop",
-        "-r": "restart",
-    }
-    outputs: list[str] = []
-    returncode = 0
     if action == "-S":
-        for service in spec.service_names:
-            result = _run(["systemctl", "status", service])
-            returncode = max(returncode, result.returncode)
-            if result.stdout.strip():
-                outputs.append(result.stdout.strip())
-        return CommandResult(returncode=returncode, stdout="\n".join(outputs).strip())
-
-    systemctl_action = action_map.get(action)
+        result = service_action_many(spec.service_names, "status")
+        return CommandResult(returncode=result.returncode, stdout=result.stdout.strip())
+
+    systemctl_action = _SERVICE_FLAG_ACTIONS.get(action)
     if systemctl_action is None:
         return CommandResult(returncode=1, stdout="Unsupported service action.")
-    for service in spec.service_names:
-        result = _run(["systemctl", systemctl_action, service])
-        returncode = max(returncode, result.returncode)
-        if result.stdout.strip():
-            outputs.append(result.stdout.strip())
-    return CommandResult(returncode=returncode, stdout="\n".join(outputs).strip())
+    result = service_action_many(spec.service_names, systemctl_action)
+    return CommandResult(returncode=result.returncode, stdout=result.stdout.strip())
 
 
 def license_text(key: str, package_dir=None) -> str:
@@ -138,3 +131,7 @@ def license_text(key: str, package_dir=None) -> str:
 
 def manage_full_control_conflicts(action: str) -> CommandResult:
     return _manage_full_control_conflicts(action)
+
+
+def full_control_conflicts_stopped() -> ContextManager[CommandResult | None]:
+    return _full_control_conflicts_stopped()
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+from contextlib import contextmanager
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Callable, Iterable
+from typing import Callable, Iterable, Iterator
+import gzip
 import json
 import os
 import pwd
@@ -11,7 +13,7 @@ import subprocess
 import textwrap
 import urllib.request
 
-from mpwrd_config.system import CommandResult, TTYD_CERT_PATH, TTYD_KEY_PATH, _run
+from mpwrd_config.system import CommandResult, TTYD_CERT_PATH, TTYD_KEY_PATH, _run, service_action_many
 
 
 @dataclass(frozen=True)
@@ -63,8 +65,7 @@ class _ActionLog:
     def add_result(self, result: CommandResult, prefix: str | None = None) -> None:
         if prefix:
             self.add(prefix)
-        if result.stdout.strip():
-            self.add(result.stdout.strip())
+        self.add(result.stdout)
 
     def finish(self, returncode: int, user_message: str | None = None) -> PackageActionResult:
         return PackageActionResult(returncode=returncode, output="\n".join(self._lines).strip(), user_message=user_message)
@@ -76,6 +77,7 @@ CONTROL_DIR = OPT_ROOT / "control"
 MESHING_DIR = OPT_ROOT / "meshing-around"
 TC2_DIR = OPT_ROOT / "TC2-BBS-mesh"
 TTYD_DIR = OPT_ROOT / "ttyd"
+DAEMON_RELOAD_TIMEOUT = 30
 
 
 def _run_interactive(command: list[str], env: dict[str, str] | None = None, cwd: Path | None = None) -> CommandResult:
@@ -209,6 +211,10 @@ def _chown_recursive(log: _ActionLog, dest: Path, user: str | None) -> None:
     log.add_result(result)
 
 
+def _daemon_reload(log: _ActionLog) -> None:
+    log.add_result(_run(["systemctl", "daemon-reload"], timeout=DAEMON_RELOAD_TIMEOUT))
+
+
 def _git_safe_directory(log: _ActionLog, dest: Path) -> None:
     result = _run(["git", "config", "--global", "--add", "safe.directory", str(dest)])
     log.add(f"$ git config --global --add safe.directory {dest}")
@@ -396,14 +402,16 @@ def _install_meshing(interactive: bool) -> PackageActionResult:
 
 def _uninstall_meshing(interactive: bool) -> PackageActionResult:
     log = _ActionLog()
+    units_changed = False
     for service in ("mesh_bot",):
-        log.add_result(_run(["systemctl", "stop", service]))
-        log.add_result(_run(["systemctl", "disable", service]))
+        log.add_result(_run(["systemctl", "disable", "--now", service]))
         service_file = Path("/etc/systemd/system") / f"{service}.service"
         if service_file.exists():
             service_file.unlink()
+            units_changed = True
             log.add(f"Removed {service_file}.")
-    log.add_result(_run(["systemctl", "daemon-reload"]))
+    if units_changed:
+        _daemon_reload(log)
     log.add_result(_run(["systemctl", "reset-failed"]))
     log.add_result(_run(["gpasswd", "-d", "meshbot", "dialout"]))
     log.add_result(_run(["gpasswd", "-d", "meshbot", "tty"]))
@@ -442,12 +450,10 @@ def _install_tc2(interactive: bool) -> PackageActionResult:
     user = _primary_user()
     _chown_recursive(log, TC2_DIR, user)
     _git_safe_directory(log, TC2_DIR)
-    example_config = TC2_DIR / "example_config.ini"
     config = TC2_DIR / "config.ini"
-    if example_config.exists() and not config.exists():
-        shutil.copy(example_config, config)
-    if config.exists():
-        content = config.read_text(encoding="utf-8")
+    config_source = config if config.exists() else TC2_DIR / "example_config.ini"
+    if config_source.exists():
+        content = config_source.read_text(encoding="utf-8")
         content = content.replace("type = serial", "type = tcp")
         content = content.replace("# hostname = 192.168.x.x", "hostname = 127.0.0.1")
         config.write_text(content, encoding="utf-8")
@@ -457,9 +463,8 @@ def _install_tc2(interactive: bool) -> PackageActionResult:
         service_contents = service_contents.replace("pi", user)
         service_contents = service_contents.replace(f"/home/{user}/", "/opt/")
         service_contents = service_contents.replace("/opt/TC2-BBS-mesh/venv/bin/python3", "python")
-        service_file.write_text(service_contents, encoding="utf-8")
-        shutil.copy(service_file, Path("/etc/systemd/system") / service_file.name)
-    log.add_result(_run(["systemctl", "daemon-reload"]))
+        (Path("/etc/systemd/system") / service_file.name).write_text(service_contents, encoding="utf-8")
+        _daemon_reload(log)
     log.add_result(_run(["systemctl", "enable", "mesh-bbs.service"]))
     log.add_result(_run(["systemctl", "restart", "mesh-bbs.service"]))
     return log.finish(0, "Installation complete, service launched. To adjust configuration, run `sudo nano /opt/TC2-BBS-mesh/config.ini`.")
@@ -467,12 +472,11 @@ def _install_tc2(interactive: bool) -> PackageActionResult:
 
 def _uninstall_tc2(interactive: bool) -> PackageActionResult:
     log = _ActionLog()
-    log.add_result(_run(["systemctl", "disable", "mesh-bbs"]))
-    log.add_result(_run(["systemctl", "stop", "mesh-bbs"]))
+    log.add_result(_run(["systemctl", "disable", "--now", "mesh-bbs"]))
     service_file = Path("/etc/systemd/system/mesh-bbs.service")
     if service_file.exists():
         service_file.unlink()
-    log.add_result(_run(["systemctl", "daemon-reload"]))
+        _daemon_reload(log)
     if TC2_DIR.exists():
         shutil.rmtree(TC2_DIR, ignore_errors=True)
         log.add(f"Removed {TC2_DIR}.")
@@ -499,8 +503,7 @@ def _install_mosquitto_broker(interactive: bool) -> PackageActionResult:
 def _uninstall_mosquitto_broker(interactive: bool) -> PackageActionResult:
     log = _ActionLog()
     _apt_remove(log, ["mosquitto"])
-    log.add_result(_run(["systemctl", "stop", "mosquitto"]))
-    log.add_result(_run(["systemctl", "disable", "mosquitto"]))
+    log.add_result(_run(["systemctl", "disable", "--now", "mosquitto"]))
     return log.finish(0, "Some files may remain. To remove: `sudo apt remove --purge mosquitto -y` then `sudo apt autoremove -y`.")
 
 
@@ -538,10 +541,11 @@ def _install_samba(interactive: bool) -> PackageActionResult:
     log = _ActionLog()
     user = _primary_user()
     share_path = f"/home/{user}"
+    hostname = _hostname()
     init_msg = "To enable file sharing, run `Initialize` in the mpwrd-config Samba menu to set a Samba password."
     user_message = (
-        f"To connect to network share, enter `\\\\{_hostname()}\\\\home` in Windows, "
-        f"`smb://{_hostname()}/home` in MacOS or `smbclient //{_hostname()}/home -U {user}` in Linux. "
+        f"To connect to network share, enter `\\\\{hostname}\\\\home` in Windows, "
+        f"`smb://{hostname}/home` in MacOS or `smbclient //{hostname}/home -U {user}` in Linux. "
         f"Default configuration shares {share_path}. Edit `/etc/samba/smb.conf` to add other shares.\n\n"
         "Troubleshooting: if Windows refuses to connect after succeeding previously, hit [win]+R and enter `net use * /delete`."
     )
@@ -559,13 +563,13 @@ def _init_samba(interactive: bool) -> PackageActionResult:
     result = _run_interactive(["smbpasswd", "-a", user])
     if result.returncode != 0:
         return log.finish(1, "Samba password setup failed.")
-    for service in ("smbd", "nmbd"):
-        log.add_result(_run(["systemctl", "enable", service]))
-        log.add_result(_run(["systemctl", "restart", service]))
+    log.add_result(service_action_many(("smbd", "nmbd"), "enable"))
+    log.add_result(service_action_many(("smbd", "nmbd"), "restart"))
+    hostname = _hostname()
     user_message = (
         "Samba initialized, and service enabled and started. "
-        f"To connect, enter `\\\\{_hostname()}\\\\home` in Windows, "
-        f"`smb://{_hostname()}/home` in MacOS or `smbclient //{_hostname()}/home -U {user}` in Linux."
+        f"To connect, enter `\\\\{hostname}\\\\home` in Windows, "
+        f"`smb://{hostname}/home` in MacOS or `smbclient //{hostname}/home -U {user}` in Linux."
     )
     return log.finish(0, user_message)
 
@@ -600,15 +604,13 @@ def _install_ttyd(interactive: bool) -> PackageActionResult:
     if key_result.returncode != 0:
         log.add_result(key_result)
         return log.finish(1, "Failed to generate SSL keys.")
-    log.add_result(_run(["systemctl", "enable", "ttyd"]))
-    log.add_result(_run(["systemctl", "start", "ttyd"]))
+    log.add_result(_run(["systemctl", "enable", "--now", "ttyd"]))
     return log.finish(0, f"ttyd service started and should be available at https://{_hostname()}.local:7681")
 
 
 def _uninstall_ttyd(interactive: bool) -> PackageActionResult:
     log = _ActionLog()
-    log.add_result(_run(["systemctl", "disable", "ttyd"]))
-    log.add_result(_run(["systemctl", "stop", "ttyd"]))
+    log.add_result(_run(["systemctl", "disable", "--now", "ttyd"]))
     if TTYD_DIR.exists():
         shutil.rmtree(TTYD_DIR, ignore_errors=True)
         log.add(f"Removed {TTYD_DIR}.")
@@ -628,9 +630,16 @@ def _upgrade_ttyd(interactive: bool) -> PackageActionResult:
 
 
 def _latest_ttyd_url() -> str | None:
+    request = urllib.request.Request(
+        "https://api.github.com/repos/tsl0922/ttyd/releases/latest",
+        headers={"Accept-Encoding": "gzip"},
+    )
     try:
-        with urllib.request.urlopen("https://api.github.com/repos/tsl0922/ttyd/releases/latest", timeout=15) as resp:
-            payload = json.loads(resp.read().decode("utf-8"))
+        with urllib.request.urlopen(request, timeout=15) as resp:
+            body = resp.read()
+            if resp.headers.get("Content-Encoding") == "gzip":
+                body = gzip.decompress(body)
+            payload = json.loads(body)
     except Exception:
         return None
     for asset in payload.get("assets", []):
@@ -656,6 +665,7 @@ def _generate_ttyd_keys() -> CommandResult:
         return CommandResult(returncode=1, stdout="openssl not found")
     TTYD_KEY_PATH.parent.mkdir(parents=True, exist_ok=True)
     TTYD_CERT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    hostname = _hostname()
     result = _run(
         [
             "openssl",
@@ -672,9 +682,9 @@ def _generate_ttyd_keys() -> CommandResult:
             "-out",
             str(TTYD_CERT_PATH),
             "-subj",
-            f"/CN={_hostname()}",
+            f"/CN={hostname}",
             "-addext",
-            f"subjectAltName=DNS:{_hostname()}",
+            f"subjectAltName=DNS:{hostname}",
         ]
     )
     if result.returncode == 0:
@@ -704,6 +714,10 @@ def _hostname() -> str:
         return "localhost"
 
 
+_BOOT_HOSTNAME = _hostname()
+_BOOT_USER = _primary_user()
+
+
 CONTACT_SPEC = PackageSpec(
     key="contact_client",
     name="Contact",
@@ -817,9 +831,9 @@ SAMBA_SPEC = PackageSpec(
     author="Software Freedom Conservancy",
     description=(
         "Femtofox comes with Samba preinstalled but disabled. To enable file sharing, run Initialize in the mpwrd-config Samba menu to set a Samba password.\n\n"
-        f"To connect to network share, enter `\\\\{_hostname()}\\\\home` in Windows, "
-        f"`smb://{_hostname()}/home` in MacOS or `smbclient //{_hostname()}/home -U {_primary_user()}` in Linux. "
-        f"Default configuration shares /home/{_primary_user()}. Edit `/etc/samba/smb.conf` to add other shares.\n\n"
+        f"To connect to network share, enter `\\\\{_BOOT_HOSTNAME}\\\\home` in Windows, "
+        f"`smb://{_BOOT_HOSTNAME}/home` in MacOS or `smbclient //{_BOOT_HOSTNAME}/home -U {_BOOT_USER}` in Linux. "
+        f"Default configuration shares /home/{_BOOT_USER}. Edit `/etc/samba/smb.conf` to add other shares.\n\n"
         "Troubleshooting: if Windows refuses to connect after succeeding previously, hit [win]+R and enter `net use * /delete`."
     ),
     url="https://www.samba.org/",
@@ -864,7 +878,7 @@ TTYD_SPEC = PackageSpec(
         "ttyd is installed and enabled by default on Foxbuntu.\n\n"
         "SSL encryption is provided by keys generated during first-boot or during installation. Your browser may give a warning (net::ERR_CERT_AUTHORITY_INVALID) "
         "about the self-signed encryption certificate. This is normal. In Chromium (Chrome, Edge) click \"Advanced\" and \"Continue to femtofox.local (unsafe)\""
-    ).format(hostname=_hostname()),
+    ).format(hostname=_BOOT_HOSTNAME),
     url="https://github.com/tsl0922/ttyd",
     options="hxiugedsrNADUOSELGTCIk",
     service_names=("ttyd",),
@@ -931,3 +945,20 @@ def manage_full_control_conflicts(action: str) -> CommandResult:
             output = result.stdout.strip() or f"{verb} requested"
             lines.append(f"{spec.name}: {output}")
     return CommandResult(returncode=0, stdout="\n".join(lines).strip())
+
+
+_CONFLICT_FENCE_DEPTH = 0
+
+
+@contextmanager
+def full_control_conflicts_stopped() -> Iterator[CommandResult | None]:
+    global _CONFLICT_FENCE_DEPTH
+    outermost = _CONFLICT_FENCE_DEPTH == 0
+    stop = manage_full_control_conflicts("stop") if outermost else None
+    _CONFLICT_FENCE_DEPTH += 1
+    try:
+        yield stop
+    finally:
+        _CONFLICT_FENCE_DEPTH -= 1
+        if outermost:
+            manage_full_control_conflicts("start")
@@ -5,7 +5,10 @@ import re
 import shutil
 import socket
 import subprocess
+import threading
+import time
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Iterable, Sequence
 
@@ -19,6 +22,16 @@ TTYD_CERT_PATH = Path("/etc/ssl/certs/ttyd.crt")
 WEB_KEY_PATH = Path("/etc/ssl/private/mpwrd-config-web.key")
 WEB_CERT_PATH = Path("/etc/ssl/certs/mpwrd-config-web.crt")
 EXTRA_BIN_PATHS = ("/usr/local/sbin", "/usr/sbin", "/sbin")
+IW_INTERFACE_PATTERN = re.compile(r"^\s*Interface\s+(\S+)", re.MULTILINE)
+IW_SIGNAL_PATTERN = re.compile(r"signal:\s*([-\d.]+)")
+IWLIST_QUALITY_PATTERN = re.compile(r"Quality=([0-9]+)/([0-9]+)")
+IWLIST_SIGNAL_PATTERN = re.compile(r"Signal level=([-\d]+)\s*dBm")
+NMCLI_SCAN_PATTERN = re.compile(r"^([^:]*):([^:]*):?(.*)$")
+NMCLI_IN_USE_PATTERN = re.compile(r"^([^:]*):(.*):([^:]*)$")
+INTERFACE_CACHE_TTL = 5.0
+
+_INTERFACE_SPLIT: tuple[float, tuple[str, ...], frozenset[str]] | None = None
+_INTERFACE_SPLIT_LOCK = threading.Lock()
 
 
 @dataclass
@@ -114,15 +127,20 @@ def _resolve_wifi_ip_config(
     resolved_nameservers = [entry for entry in resolved_nameservers if entry]
     return resolved_dhcp4, resolved_address, resolved_gateway, resolved_nameservers
 
-def _find_command(name: str) -> str | None:
+@lru_cache(maxsize=1)
+def _command_search_path() -> str:
     path_entries = [entry for entry in os.environ.get("PATH", "").split(os.pathsep) if entry]
     for extra in EXTRA_BIN_PATHS:
         if extra not in path_entries:
             path_entries.append(extra)
-    return shutil.which(name, path=os.pathsep.join(path_entries))
+    return os.pathsep.join(path_entries)
+
+
+def _find_command(name: str) -> str | None:
+    return shutil.which(name, path=_command_search_path())
 
 
-def _run(command: Sequence[str]) -> CommandResult:
+def _run(command: Sequence[str], timeout: float | None = None) -> CommandResult:
     try:
         result = subprocess.run(
             command,
@@ -130,14 +148,23 @@ def _run(command: Sequence[str]) -> CommandResult:
             text=True,
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
+            timeout=timeout,
         )
         return CommandResult(returncode=result.returncode, stdout=result.stdout)
+    except subprocess.TimeoutExpired:
+        return CommandResult(returncode=124, stdout=f"command timed out: {command[0]}")
     except FileNotFoundError:
         return CommandResult(returncode=127, stdout=f"command not found: {command[0]}")
     except PermissionError:
         return CommandResult(returncode=126, stdout=f"permission denied: {command[0]}")
 
 
+def _append_output(lines: list[str], result: CommandResult) -> None:
+    output = result.stdout.strip()
+    if output:
+        lines.append(output)
+
+
 def _run_live(command: Sequence[str]) -> CommandResult:
     try:
         result = subprocess.run(
@@ -159,30 +186,53 @@ def _list_interfaces() -> list[str]:
         return []
 
 
-def _is_wireless(interface: str) -> bool:
-    if not interface or interface == "lo":
-        return False
-    if Path(f"/sys/class/net/{interface}/wireless").exists():
-        return True
-    if interface.startswith("wl"):
-        return True
+def _iw_interfaces() -> set[str]:
     iw_cmd = _find_command("iw")
-    if iw_cmd:
-        info = _run([iw_cmd, "dev"]).stdout
-        return bool(re.search(rf"Interface\\s+{re.escape(interface)}\\b", info))
-    return False
+    if not iw_cmd:
+        return set()
+    return set(IW_INTERFACE_PATTERN.findall(_run([iw_cmd, "dev"]).stdout))
+
+
+def _wireless_interfaces(interfaces: Sequence[str]) -> set[str]:
+    wireless: set[str] = set()
+    unknown: list[str] = []
+    for interface in interfaces:
+        if not interface or interface == "lo":
+            continue
+        if interface.startswith("wl") or Path(f"/sys/class/net/{interface}/wireless").exists():
+            wireless.add(interface)
+        else:
+            unknown.append(interface)
+    if unknown:
+        wireless.update(_iw_interfaces().intersection(unknown))
+    return wireless
+
+
+def _physical_interfaces() -> list[str]:
+    return [iface for iface in _list_interfaces() if is_physical_interface(iface)]
+
+
+def _interface_split() -> tuple[tuple[str, ...], frozenset[str]]:
+    global _INTERFACE_SPLIT
+    interfaces = tuple(_physical_interfaces())
+    with _INTERFACE_SPLIT_LOCK:
+        now = time.monotonic()
+        cached = _INTERFACE_SPLIT
+        if cached and cached[1] == interfaces and now - cached[0] < INTERFACE_CACHE_TTL:
+            return interfaces, cached[2]
+        wireless = frozenset(_wireless_interfaces(interfaces))
+        _INTERFACE_SPLIT = (now, interfaces, wireless)
+    return interfaces, wireless
 
 
 def list_wifi_interfaces() -> list[str]:
-    return [iface for iface in _list_interfaces() if _is_wireless(iface) and is_physical_interface(iface)]
+    interfaces, wireless = _interface_split()
+    return [iface for iface in interfaces if iface in wireless]
 
 
 def list_ethernet_interfaces() -> list[str]:
-    return [
-        iface
-        for iface in _list_interfaces()
-        if iface != "lo" and not _is_wireless(iface) and is_physical_interface(iface)
-    ]
+    interfaces, wireless = _interface_split()
+    return [iface for iface in interfaces if iface != "lo" and iface not in wireless]
 
 
 def is_physical_interface(interface: str) -> bool:
@@ -226,9 +276,16 @@ def _read_text(path: Path) -> str:
     return path.read_text(encoding="utf-8")
 
 
-def _write_text(path: Path, content: str) -> None:
+def _write_text(path: Path, content: str) -> bool:
+    encoded = content.encode("utf-8")
+    try:
+        if path.read_bytes() == encoded:
+            return False
+    except OSError:
+        pass
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(content, encoding="utf-8")
+    path.write_bytes(encoded)
+    return True
 
 
 def _update_hosts(old_hostname: str, new_hostname: str) -> None:
@@ -341,6 +398,22 @@ def _service_is_active(service: str) -> bool:
     return _run(["systemctl", "is-active", "--quiet", service]).returncode == 0
 
 
+def service_action_many(services: Sequence[str], action: str) -> CommandResult:
+    if not services:
+        return CommandResult(returncode=0, stdout="")
+    result = _run(["systemctl", action, *services])
+    if result.returncode == 0 or action == "status" or len(services) == 1:
+        return result
+    lines: list[str] = []
+    returncode = 0
+    for service in services:
+        single = _run(["systemctl", action, service])
+        _append_output(lines, single)
+        if single.returncode != 0:
+            returncode = single.returncode
+    return CommandResult(returncode=returncode, stdout="\n".join(lines))
+
+
 def _detect_network_backend() -> str:
     has_netplan = Path("/etc/netplan").exists() and _find_command("netplan") is not None
     has_nm = _find_command("nmcli") is not None
@@ -582,7 +655,7 @@ def _connected_wifi_info(interface: str, backend: str) -> tuple[str, str, dict[s
         scan = _run([nmcli_cmd, "-t", "-f", "IN-USE,SSID,SIGNAL", "device", "wifi", "list", "ifname", interface])
         if scan.returncode == 0:
             for line in scan.stdout.splitlines():
-                match = re.match(r"^([^:]*):(.*):([^:]*)$", line)
+                match = NMCLI_IN_USE_PATTERN.match(line)
                 if not match:
                     continue
                 marker, ssid, signal = match.groups()
@@ -709,7 +782,7 @@ def _parse_iw_scan(output: str) -> list[WifiScanNetwork]:
         if line.startswith("SSID:"):
             current["ssid"] = line.split("SSID:", 1)[1].strip()
         elif line.startswith("signal:"):
-            match = re.search(r"signal:\s*([-\d.]+)", line)
+            match = IW_SIGNAL_PATTERN.search(line)
             if match:
                 try:
                     current["signal_dbm"] = float(match.group(1))
@@ -760,7 +833,7 @@ def _parse_iwlist_scan(output: str) -> list[WifiScanNetwork]:
             current["ssid"] = ssid
         if "Encryption key:" in line and "on" in line:
             current["secure"] = True
-        quality_match = re.search(r"Quality=([0-9]+)/([0-9]+)", line)
+        quality_match = IWLIST_QUALITY_PATTERN.search(line)
         if quality_match:
             try:
                 quality = int(quality_match.group(1))
@@ -769,7 +842,7 @@ def _parse_iwlist_scan(output: str) -> list[WifiScanNetwork]:
                     current["signal_percent"] = int(round(quality * 100 / total))
             except ValueError:
                 pass
-        signal_match = re.search(r"Signal level=([-\d]+)\s*dBm", line)
+        signal_match = IWLIST_SIGNAL_PATTERN.search(line)
         if signal_match:
             try:
                 current["signal_dbm"] = float(signal_match.group(1))
@@ -785,7 +858,7 @@ def _parse_nmcli_scan(output: str) -> list[WifiScanNetwork]:
     for line in output.splitlines():
         if not line.strip():
             continue
-        match = re.match(r"^([^:]*):([^:]*):?(.*)$", line)
+        match = NMCLI_SCAN_PATTERN.match(line)
         if not match:
             continue
         ssid, signal, security = match.groups()
@@ -793,9 +866,11 @@ def _parse_nmcli_scan(output: str) -> list[WifiScanNetwork]:
         if not ssid:
             continue
         signal_percent: int | None = None
-        if signal.strip().isdigit():
-            signal_percent = int(signal.strip())
-        secure = bool(security.strip()) and security.strip() != "--"
+        signal = signal.strip()
+        if signal.isdecimal():
+            signal_percent = int(signal)
+        security = security.strip()
+        secure = bool(security) and security != "--"
         networks.append(
             WifiScanNetwork(
                 ssid=ssid,
@@ -902,8 +977,7 @@ def set_wifi_credentials(
             resolved_gateway,
             resolved_nameservers,
         )
-        if netplan_result.stdout.strip():
-            messages.append(netplan_result.stdout.strip())
+        _append_output(messages, netplan_result)
         returncode = max(returncode, netplan_result.returncode)
     elif backend == "networkmanager" and iface:
         primary = next((entry for entry in normalized if entry[0] == ssid), None)
@@ -924,24 +998,21 @@ def set_wifi_credentials(
             resolved_gateway,
             resolved_nameservers,
         )
-        if nm_result.stdout.strip():
-            messages.append(nm_result.stdout.strip())
+        _append_output(messages, nm_result)
         returncode = max(returncode, nm_result.returncode)
         if nm_result.returncode != 0:
             return CommandResult(returncode=returncode, stdout="\n".join(line for line in messages if line))
     if apply:
         state_result = wifi_state("up", interface=iface or interface)
         returncode = max(returncode, state_result.returncode)
-        if state_result.stdout.strip():
-            messages.append(state_result.stdout.strip())
+        _append_output(messages, state_result)
         if backend == "legacy" and iface:
             wpa_cli_cmd = _find_command("wpa_cli")
             if wpa_cli_cmd:
                 reconfig = _run([wpa_cli_cmd, "-i", iface, "reconfigure"])
             else:
                 reconfig = CommandResult(returncode=127, stdout="wpa_cli not found.")
-            if reconfig.stdout.strip():
-                messages.append(reconfig.stdout.strip())
+            _append_output(messages, reconfig)
             returncode = max(returncode, reconfig.returncode)
     return CommandResult(returncode=returncode, stdout="\n".join(line for line in messages if line))
 
@@ -992,8 +1063,9 @@ def wifi_state(state: str, interface: str | None = None) -> CommandResult:
                 applied = CommandResult(returncode=127, stdout="netplan command not found.")
             if applied.returncode != 0:
                 return applied
-            if applied.stdout.strip():
-                combined = "\n".join(part for part in (result.stdout.strip(), applied.stdout.strip()) if part)
+            applied_output = applied.stdout.strip()
+            if applied_output:
+                combined = "\n".join(part for part in (result.stdout.strip(), applied_output) if part)
                 result = CommandResult(returncode=result.returncode, stdout=combined)
     else:
         result = _run(["ip", "link", "set", iface, state])
@@ -1024,8 +1096,7 @@ def wifi_restart(interface: str | None = None) -> CommandResult:
     returncode = 0
     state_result = wifi_state("up", interface=interface)
     returncode = max(returncode, state_result.returncode)
-    if state_result.stdout.strip():
-        result_lines.append(state_result.stdout.strip())
+    _append_output(result_lines, state_result)
     iface, error = _resolve_wifi_interface(interface)
     if error:
         result_lines.append(error)
@@ -1033,8 +1104,7 @@ def wifi_restart(interface: str | None = None) -> CommandResult:
     wpa_cli_cmd = _find_command("wpa_cli")
     if iface and wpa_cli_cmd:
         reconfig = _run([wpa_cli_cmd, "-i", iface, "reconfigure"])
-        if reconfig.stdout.strip():
-            result_lines.append(reconfig.stdout.strip())
+        _append_output(result_lines, reconfig)
         returncode = max(returncode, reconfig.returncode)
     return CommandResult(returncode=returncode, stdout="\n".join(line for line in result_lines if line))
 
@@ -1197,6 +1267,7 @@ def ip_addresses() -> CommandResult:
         result = _run(["ip", "-o", "addr", "show"])
         if result.returncode != 0:
             return result
+        physical = set(_physical_interfaces())
         by_iface: dict[str, list[str]] = {}
         for line in result.stdout.splitlines():
             parts = line.split()
@@ -1204,7 +1275,7 @@ def ip_addresses() -> CommandResult:
                 continue
             iface = parts[1]
             family = parts[2]
-            if iface == "lo" or not is_physical_interface(iface):
+            if iface not in physical:
                 continue
             addr = parts[3]
             label = "IPv4" if family == "inet" else "IPv6" if family == "inet6" else family
@@ -5,7 +5,10 @@ import platform
 import re
 import shutil
 import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Iterable
 
@@ -34,6 +37,30 @@ ACT_LED_TRIGGER_PATH = Path("/sys/class/leds/work/trigger")
 LUKFOX_CFG_PATH = Path("/etc/luckfox.cfg")
 FOX_RELEASE_PATH = Path("/etc/foxbuntu-release")
 LEGACY_BIN_DIRS = [Path("/usr/local/bin")]
+PROC_CACHE_TTL = 1.0
+PROC_READ_SIZE = 8192
+_PROC_CACHE: dict[str, tuple[float, str]] = {}
+_MEMINFO_FIELDS = frozenset({"MemTotal", "MemAvailable", "SwapTotal", "SwapFree"})
+_ACT_LED_STATES = frozenset({"enable", "disable", "check", None})
+_SYSTEMCTL_ACTIONS = frozenset({"start", "stop", "restart", "enable", "disable"})
+_ENABLED_UNIT_FILE_STATES = frozenset(
+    {"enabled", "enabled-runtime", "alias", "static", "indirect", "generated", "transient"}
+)
+_RADIO_ALIASES = {
+    "ebyte-e22-900m30s": "sx1262_tcxo",
+    "ebyte-e22-900m22s": "sx1262_tcxo",
+    "heltec-ht-ra62": "sx1262_tcxo",
+    "seeed-wio-sx1262": "sx1262_tcxo",
+    "waveshare-sx126x-xxxm": "sx1262_xtal",
+    "ai-thinker-ra-01sh": "sx1262_xtal",
+    "ebyte-e80-900m22s": "lr1121_tcxo",
+    "sx1262_tcxo": "sx1262_tcxo",
+    "sx1262_xtal": "sx1262_xtal",
+    "lr1121_tcxo": "lr1121_tcxo",
+    "sim": "sim",
+    "none": "none",
+}
+_RESIZE_PARTITIONS = ("/dev/mmcblk1p5", "/dev/mmcblk1p6", "/dev/mmcblk1p7")
 
 _PINOUT_FEMTOFOX = """┌──────────┬────┬─────┬────┬───────────────┬───┬───────────────┐
 │⚪:♥KILL ●│●   │USB-C│   ●│●       PWR-IN │✚ ▬│ 3.3-5V      ⚪│
@@ -156,6 +183,31 @@ _LICENSE_UBUNTU = (
     "Ubuntu is a trademark of Canonical. Femtofox does not represent Ubuntu or Canonical in any way, shape or form. Find Ubuntu's license information on their site, https://ubuntu.com/legal. Licenses are also available in `/usr/share/common-licenses`."
 )
 
+_LICENSE_ABOUT = (
+    "mpwrd-config\n"
+    "\n"
+    "Written by Ruledo\n"
+    "\n"
+    "based on femto-config\n"
+    "by noon92 aka nagu\n"
+    "\"We really did something good didn't we?\" - nagu"
+)
+
+_PINOUTS = {
+    "femtofox": _PINOUT_FEMTOFOX,
+    "zero": _PINOUT_FEMTOFOX_ZERO,
+    "tiny": _PINOUT_FEMTOFOX_TINY,
+    "luckfox": _PINOUT_LUCKFOX,
+}
+
+_LICENSES = {
+    "about": _LICENSE_ABOUT,
+    "short": _LICENSE_FEMTOFOX_SHORT,
+    "meshtastic": _LICENSE_MESHTASTIC,
+    "luckfox": _LICENSE_LUCKFOX,
+    "ubuntu": _LICENSE_UBUNTU,
+}
+
 
 def _legacy_tool_path(name: str) -> Path | None:
     for base in LEGACY_BIN_DIRS:
@@ -165,17 +217,23 @@ def _legacy_tool_path(name: str) -> Path | None:
     return None
 
 
-def legacy_tool_command(names: list[str]) -> list[str] | None:
+@lru_cache(maxsize=None)
+def _which_first(names: tuple[str, ...]) -> str | None:
     for name in names:
         path = _legacy_tool_path(name)
         if path:
-            return [str(path)]
+            return str(path)
         found = shutil.which(name)
         if found:
-            return [found]
+            return found
     return None
 
 
+def legacy_tool_command(names: list[str]) -> list[str] | None:
+    found = _which_first(tuple(names))
+    return [found] if found else None
+
+
 def run_legacy_tool(name: str, args: list[str] | None = None) -> CommandResult:
     path = _legacy_tool_path(name)
     if not path:
@@ -192,6 +250,23 @@ class InfoResult:
     stdout: str
 
 
+def _read_proc(path: str) -> str:
+    now = time.monotonic()
+    cached = _PROC_CACHE.get(path)
+    if cached and now - cached[0] < PROC_CACHE_TTL:
+        return cached[1]
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        chunks = [os.read(fd, PROC_READ_SIZE)]
+        while chunks[-1]:
+            chunks.append(os.read(fd, PROC_READ_SIZE))
+    finally:
+        os.close(fd)
+    text = b"".join(chunks).decode("utf-8", errors="ignore")
+    _PROC_CACHE[path] = (now, text)
+    return text
+
+
 def _read_kv_file(path: Path) -> dict[str, str]:
     if not path.exists():
         return {}
@@ -221,7 +296,7 @@ def _set_kv_value(path: Path, key: str, value: str) -> None:
 
 
 def act_led(state: str | None) -> CommandResult:
-    if state not in ("enable", "disable", "check", None):
+    if state not in _ACT_LED_STATES:
         return CommandResult(returncode=1, stdout="Invalid ACT LED state.")
     if state == "check":
         config = _read_kv_file(FEMTO_CONF_PATH)
@@ -268,11 +343,14 @@ def generate_ssh_keys() -> CommandResult:
     errors: list[str] = []
     returncode = 0
 
-    def _check(result: CommandResult, label: str) -> None:
+    def _fail(code: int, message: str) -> None:
         nonlocal returncode
+        returncode = max(returncode, code)
+        errors.append(message)
+
+    def _check(result: CommandResult, label: str) -> None:
         if result.returncode != 0:
-            returncode = max(returncode, result.returncode)
-            errors.append(result.stdout.strip() or label)
+            _fail(result.returncode, result.stdout.strip() or label)
 
     _check(
         _run(["ssh-keygen", "-t", "ed25519", "-f", "/etc/ssh/ssh_host_ed25519_key", "-N", ""]),
@@ -282,12 +360,15 @@ def generate_ssh_keys() -> CommandResult:
         _run(["ssh-keygen", "-t", "rsa", "-b", "4096", "-f", "/etc/ssh/ssh_host_rsa_key", "-N", ""]),
         "ssh-keygen rsa failed.",
     )
-    for key_path in Path("/etc/ssh").glob("ssh_host_*_key"):
-        _check(_run(["chmod", "600", str(key_path)]), f"chmod 600 {key_path} failed.")
-    for pub_path in Path("/etc/ssh").glob("ssh_host_*_key.pub"):
-        _check(_run(["chmod", "644", str(pub_path)]), f"chmod 644 {pub_path} failed.")
     for host_path in Path("/etc/ssh").glob("ssh_host_*"):
-        _check(_run(["chown", "root:root", str(host_path)]), f"chown root:root {host_path} failed.")
+        try:
+            if host_path.name.endswith("_key.pub"):
+                os.chmod(host_path, 0o644)
+            elif host_path.name.endswith("_key"):
+                os.chmod(host_path, 0o600)
+            os.chown(host_path, 0, 0)
+        except OSError as exc:
+            _fail(1, f"Updating permissions on {host_path} failed: {exc}")
     _check(_run(["systemctl", "restart", "ssh"]), "Failed to restart ssh service.")
     if returncode != 0:
         return CommandResult(returncode=returncode, stdout="\n".join(errors).strip() or "SSH key regeneration failed.")
@@ -295,10 +376,13 @@ def generate_ssh_keys() -> CommandResult:
 
 
 def service_status(service: str) -> CommandResult:
-    enabled = _run(["systemctl", "is-enabled", service])
-    enabled_state = "enabled" if enabled.returncode == 0 else "disabled"
-    active = _run(["systemctl", "is-active", service])
-    if active.returncode == 0:
+    result = _run(["systemctl", "show", "--property=UnitFileState,ActiveState", service])
+    properties: dict[str, str] = {}
+    for line in result.stdout.splitlines():
+        key, _, value = line.partition("=")
+        properties[key] = value.strip()
+    enabled_state = "enabled" if properties.get("UnitFileState") in _ENABLED_UNIT_FILE_STATES else "disabled"
+    if properties.get("ActiveState") == "active":
         running_state = "running"
         returncode = 0
     else:
@@ -310,7 +394,7 @@ def service_status(service: str) -> CommandResult:
 def service_action(service: str, action: str) -> CommandResult:
     if action == "status":
         return service_status(service)
-    if action in {"start", "stop", "restart", "enable", "disable"}:
+    if action in _SYSTEMCTL_ACTIONS:
         return _run(["systemctl", action, service])
     return CommandResult(returncode=1, stdout="Invalid service action.")
 
@@ -318,7 +402,7 @@ def service_action(service: str, action: str) -> CommandResult:
 def ttyd_action(action: str) -> CommandResult:
     if action == "check":
         return service_status("ttyd")
-    if action in {"enable", "disable", "start", "stop", "restart"}:
+    if action in _SYSTEMCTL_ACTIONS:
         return _run(["systemctl", action, "ttyd"])
     return CommandResult(returncode=1, stdout="Invalid ttyd action.")
 
@@ -348,18 +432,20 @@ def run_first_boot() -> CommandResult:
         returncode = max(returncode, result.returncode)
         if result.returncode == 0 and success_msg:
             log(success_msg)
-        elif result.stdout.strip():
-            log(result.stdout.strip())
+        else:
+            output = result.stdout.strip()
+            if output:
+                log(output)
 
     log("Starting first boot steps.")
     if _run(["systemctl", "is-enabled", "femto-runonce"]).returncode != 0:
         log("femto-runonce not enabled; running first boot tasks anyway.")
 
-    for device in ("/dev/mmcblk1p5", "/dev/mmcblk1p6", "/dev/mmcblk1p7"):
-        if Path(device).exists():
-            log(f"Resizing filesystem on {device}...")
-            maybe_run(["resize2fs", device])
-    if not any(Path(dev).exists() for dev in ("/dev/mmcblk1p5", "/dev/mmcblk1p6", "/dev/mmcblk1p7")):
+    partitions = [device for device in _RESIZE_PARTITIONS if Path(device).exists()]
+    for device in partitions:
+        log(f"Resizing filesystem on {device}...")
+        maybe_run(["resize2fs", device])
+    if not partitions:
         log("No mmcblk1p5-7 partitions found; skipping resize.")
 
     swap_path = Path("/swapfile")
@@ -437,7 +523,7 @@ def run_first_boot() -> CommandResult:
     compiler_keep = Path("/usr/lib/arm-linux-gnueabihf/libc_nonshared.a.keep")
     compiler_target = Path("/usr/lib/arm-linux-gnueabihf/libc_nonshared.a")
     if compiler_keep.exists():
-        compiler_target.write_bytes(compiler_keep.read_bytes())
+        shutil.copyfile(compiler_keep, compiler_target)
         log("Compiler support updated.")
 
     log("Enabling meshtasticd service.")
@@ -445,8 +531,9 @@ def run_first_boot() -> CommandResult:
 
     log("Generating new SSH keys.")
     ssh_result = generate_ssh_keys()
-    if ssh_result.stdout.strip():
-        log(ssh_result.stdout.strip())
+    ssh_output = ssh_result.stdout.strip()
+    if ssh_output:
+        log(ssh_output)
     returncode = max(returncode, ssh_result.returncode)
 
     log("Generating new ttyd SSL keys.")
@@ -570,21 +657,7 @@ def run_usb_config_tool() -> CommandResult:
 
     if "meshtastic_lora_radio" in entries:
         raw = entries["meshtastic_lora_radio"][0].lower()
-        mapping = {
-            "ebyte-e22-900m30s": "sx1262_tcxo",
-            "ebyte-e22-900m22s": "sx1262_tcxo",
-            "heltec-ht-ra62": "sx1262_tcxo",
-            "seeed-wio-sx1262": "sx1262_tcxo",
-            "waveshare-sx126x-xxxm": "sx1262_xtal",
-            "ai-thinker-ra-01sh": "sx1262_xtal",
-            "ebyte-e80-900m22s": "lr1121_tcxo",
-            "sx1262_tcxo": "sx1262_tcxo",
-            "sx1262_xtal": "sx1262_xtal",
-            "lr1121_tcxo": "lr1121_tcxo",
-            "sim": "sim",
-            "none": "none",
-        }
-        model = mapping.get(raw)
+        model = _RADIO_ALIASES.get(raw)
         if model:
             result = set_radio(model)
             if result.returncode != 0:
@@ -687,46 +760,30 @@ def run_usb_config_tool() -> CommandResult:
 
 
 def pinout_info(kind: str) -> CommandResult:
-    pinouts = {
-        "femtofox": _PINOUT_FEMTOFOX,
-        "zero": _PINOUT_FEMTOFOX_ZERO,
-        "tiny": _PINOUT_FEMTOFOX_TINY,
-        "luckfox": _PINOUT_LUCKFOX,
-    }
-    text = pinouts.get(kind)
+    text = _PINOUTS.get(kind)
     if not text:
         return CommandResult(returncode=1, stdout="Unknown pinout selection.")
     return CommandResult(returncode=0, stdout=text)
 
 
+@lru_cache(maxsize=1)
+def _long_license_text() -> str | None:
+    path = Path("/usr/share/doc/femtofox/long_license")
+    if path.exists():
+        return path.read_text(encoding="utf-8")
+    return None
+
+
 def license_info(kind: str) -> CommandResult:
-    if kind == "about":
-        return CommandResult(
-            returncode=0,
-            stdout=(
-                "mpwrd-config\n"
-                "\n"
-                "Written by Ruledo\n"
-                "\n"
-                "based on femto-config\n"
-                "by noon92 aka nagu\n"
-                "\"We really did something good didn't we?\" - nagu"
-            ),
-        )
-    if kind == "short":
-        return CommandResult(returncode=0, stdout=_LICENSE_FEMTOFOX_SHORT)
     if kind == "long":
-        path = Path("/usr/share/doc/femtofox/long_license")
-        if path.exists():
-            return CommandResult(returncode=0, stdout=path.read_text(encoding="utf-8"))
-        return CommandResult(returncode=1, stdout="Long license not found.")
-    if kind == "meshtastic":
-        return CommandResult(returncode=0, stdout=_LICENSE_MESHTASTIC)
-    if kind == "luckfox":
-        return CommandResult(returncode=0, stdout=_LICENSE_LUCKFOX)
-    if kind == "ubuntu":
-        return CommandResult(returncode=0, stdout=_LICENSE_UBUNTU)
-    return CommandResult(returncode=1, stdout="Unknown license selection.")
+        text = _long_license_text()
+        if text is None:
+            return CommandResult(returncode=1, stdout="Long license not found.")
+        return CommandResult(returncode=0, stdout=text)
+    text = _LICENSES.get(kind)
+    if text is None:
+        return CommandResult(returncode=1, stdout="Unknown license selection.")
+    return CommandResult(returncode=0, stdout=text)
 
 
 def process_snapshot() -> CommandResult:
@@ -737,7 +794,7 @@ def process_snapshot() -> CommandResult:
 
 def _human_uptime() -> str:
     try:
-        uptime_seconds = float(Path("/proc/uptime").read_text().split()[0])
+        uptime_seconds = float(_read_proc("/proc/uptime").split()[0])
     except Exception:
         return "unknown"
     minutes, _ = divmod(int(uptime_seconds), 60)
@@ -779,7 +836,7 @@ def cpu_info() -> InfoResult:
             speed = "unknown"
     serial = "unknown"
     try:
-        for line in Path("/proc/cpuinfo").read_text().splitlines():
+        for line in _read_proc("/proc/cpuinfo").splitlines():
             if line.lower().startswith("serial"):
                 serial = line.split(":", 1)[1].strip()
                 break
@@ -796,24 +853,42 @@ def cpu_info() -> InfoResult:
     return InfoResult(returncode=0, stdout=output)
 
 
+def _meminfo() -> dict[str, int]:
+    values: dict[str, int] = {}
+    try:
+        text = _read_proc("/proc/meminfo")
+    except OSError:
+        return values
+    for line in text.splitlines():
+        key, _, rest = line.partition(":")
+        if key in _MEMINFO_FIELDS:
+            values[key] = int(rest.split()[0])
+            if len(values) == len(_MEMINFO_FIELDS):
+                break
+    return values
+
+
+def _hundredths(numerator: int, denominator: int) -> str:
+    if not denominator:
+        return "0.00"
+    scaled = (numerator * 100 + denominator // 2) // denominator
+    return f"{scaled // 100}.{scaled % 100:02d}"
+
+
 def storage_info() -> InfoResult:
     total, used, free = shutil.disk_usage("/")
-    total_gb = total / 1024 / 1024 / 1024
-    free_pct = (free / total) * 100 if total else 0
-    microsd = f"{total_gb:.2f} GB ({free_pct:.2f}% free)"
-    meminfo = _read_kv_file(Path("/proc/meminfo"))
-    mem_total = int(meminfo.get("MemTotal", "0 kB").split()[0])
-    mem_avail = int(meminfo.get("MemAvailable", "0 kB").split()[0])
-    mem_pct_free = (mem_avail / mem_total) * 100 if mem_total else 0
-    memory = f"{mem_total // 1024} MB ({mem_pct_free:.2f}% free)"
-    swap_total = int(meminfo.get("SwapTotal", "0 kB").split()[0])
-    swap_free = int(meminfo.get("SwapFree", "0 kB").split()[0])
-    if swap_total >= 1024 * 1024:
-        swap_display = f"{swap_total / 1024 / 1024:.2f} GB"
+    microsd = f"{_hundredths(total, 1 << 30)} GB ({_hundredths(free * 100, total)}% free)"
+    meminfo = _meminfo()
+    mem_total = meminfo.get("MemTotal", 0)
+    mem_avail = meminfo.get("MemAvailable", 0)
+    memory = f"{mem_total >> 10} MB ({_hundredths(mem_avail * 100, mem_total)}% free)"
+    swap_total = meminfo.get("SwapTotal", 0)
+    swap_free = meminfo.get("SwapFree", 0)
+    if swap_total >= 1 << 20:
+        swap_display = f"{_hundredths(swap_total, 1 << 20)} GB"
     else:
-        swap_display = f"{swap_total // 1024} MB"
-    swap_pct_free = (swap_free / swap_total) * 100 if swap_total else 0
-    swap = f"{swap_display} ({swap_pct_free:.2f}% free)"
+        swap_display = f"{swap_total >> 10} MB"
+    swap = f"{swap_display} ({_hundredths(swap_free * 100, swap_total)}% free)"
     mounted = " ".join(str(path) for path in Path("/mnt").glob("*/") if path.is_dir())
     mounted = mounted.strip() if mounted else "none"
     output = (
@@ -834,12 +909,19 @@ def os_info() -> InfoResult:
         codename = data.get("VERSION_CODENAME", "unknown")
     uptime = _human_uptime()
     kernel_version = platform.release()
-    active_modules = list_active_modules().stdout.replace("\n", " ").strip()
-    boot_modules = list_boot_modules().stdout.replace("\n", ", ").strip()
-    blacklisted = list_blacklisted_modules().stdout.strip()
-    ttyd_state = service_status("ttyd").stdout
-    logging_state_text = logging_state("check").stdout
-    act_led_state = act_led("check").stdout
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        active_future = pool.submit(list_active_modules)
+        boot_future = pool.submit(list_boot_modules)
+        blacklisted_future = pool.submit(list_blacklisted_modules)
+        ttyd_future = pool.submit(service_status, "ttyd")
+        logging_future = pool.submit(logging_state, "check")
+        act_led_future = pool.submit(act_led, "check")
+    active_modules = active_future.result().stdout.replace("\n", " ").strip()
+    boot_modules = boot_future.result().stdout.replace("\n", ", ").strip()
+    blacklisted = blacklisted_future.result().stdout.strip()
+    ttyd_state = ttyd_future.result().stdout
+    logging_state_text = logging_future.result().stdout
+    act_led_state = act_led_future.result().stdout
     output = (
         f"OS:{pretty} ({codename})\n"
         f"Kernel ver:{kernel_version}\n"
@@ -858,9 +940,13 @@ def os_info() -> InfoResult:
 def networking_info() -> InfoResult:
     config_path = Path(os.getenv("MPWRD_CONFIG_PATH") or DEFAULT_CONFIG_PATH)
     config = load_config(config_path)
-    wifi = wifi_status(config.networking.wifi_interface).stdout.strip()
-    eth = ethernet_status(config.networking.ethernet_interface).stdout.strip()
-    ips = ip_addresses().stdout.strip()
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        wifi_future = pool.submit(wifi_status, config.networking.wifi_interface)
+        eth_future = pool.submit(ethernet_status, config.networking.ethernet_interface)
+        ips_future = pool.submit(ip_addresses)
+    wifi = wifi_future.result().stdout.strip()
+    eth = eth_future.result().stdout.strip()
+    ips = ips_future.result().stdout.strip()
     output = f"Wi-Fi:\n{wifi}\n\nEthernet:\n{eth}\n\nIP addresses:\n{ips}"
     return InfoResult(returncode=0, stdout=output)
 
@@ -962,24 +1048,28 @@ def peripherals_info() -> InfoResult:
 
 
 def all_system_info() -> InfoResult:
+    sources = (cpu_info, os_info, storage_info, networking_info, peripherals_info, meshtastic_info)
+    with ThreadPoolExecutor(max_workers=len(sources)) as pool:
+        futures = [pool.submit(source) for source in sources]
+        cpu, system, storage, networking, peripherals, meshtasticd = (future.result().stdout for future in futures)
     sections = [
         "            Femtofox",
         "    CPU:",
-        cpu_info().stdout,
+        cpu,
         "",
         "    Operating System:",
-        os_info().stdout,
+        system,
         "",
         "    Storage:",
-        storage_info().stdout,
+        storage,
         "",
         "    Networking (Wi-Fi & Ethernet):",
-        networking_info().stdout,
+        networking,
         "",
         "    Peripherals:",
-        peripherals_info().stdout,
+        peripherals,
         "",
         "    Meshtasticd:",
-        meshtastic_info().stdout,
+        meshtasticd,
     ]
     return InfoResult(returncode=0, stdout="\n".join(sections))
@@ -6,28 +6,43 @@ import ipaddress
 import os
 import re
 import shutil
+import socket
 import subprocess
 import sys
 import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Callable, TypeVar
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Callable, Mapping, Sequence, TypeVar
 
 from InquirerPy import get_style, inquirer
 from prompt_toolkit.application import Application
+from prompt_toolkit.document import Document
 from prompt_toolkit.filters import has_focus
 from prompt_toolkit.formatted_text import FormattedText
 from prompt_toolkit.key_binding import KeyBindings, merge_key_bindings
 from prompt_toolkit.key_binding.bindings.focus import focus_next, focus_previous
 from prompt_toolkit.key_binding.defaults import load_key_bindings
-from prompt_toolkit.layout import Layout
+from prompt_toolkit.layout import HSplit, Layout, VSplit
 from prompt_toolkit.styles import Style
-from prompt_toolkit.widgets import Button, Dialog, RadioList, TextArea
+from prompt_toolkit.widgets import Button, Dialog, Label, RadioList, TextArea
 
 DEFAULT_KEY_BINDINGS = load_key_bindings()
 SPINNER_FRAMES = ("⣾", "⣽", "⣻", "⢿", "⡿", "⣟", "⣯", "⣷")
 SPINNER_INTERVAL = 0.06
+CLEAR_SCREEN_BYTES = b"\x1b[2J\x1b[H"
+MESSAGE_MAX_CHARS = 64 * 1024
+CLI_OUTPUT_MAX_LINES = 2000
+CLI_STREAM_TAIL_LINES = 200
+FUZZY_MENU_THRESHOLD = 30
+FUZZY_KEYBINDINGS = {
+    "answer": [{"key": "enter"}, {"key": "right"}, {"key": " "}],
+    "skip": [{"key": "escape"}, {"key": "left"}],
+}
 
 
 class _QuickExit(Exception):
@@ -66,8 +81,9 @@ GLOBAL_KEY_BINDINGS.add("c-c")(_quick_exit)
 
 def _clear_screen() -> None:
     try:
-        sys.stdout.write("\033[2J\033[H")
         sys.stdout.flush()
+        sys.stdout.buffer.write(CLEAR_SCREEN_BYTES)
+        sys.stdout.buffer.flush()
     except Exception:
         return
 
@@ -151,77 +167,10 @@ MAIN_MENU_TITLE = FormattedText(
     ]
 )
 
-from mpwrd_config.core import DEFAULT_CONFIG_PATH, WifiNetwork, load_config, save_config
-from mpwrd_config.software_manager import (
-    license_text,
-    list_packages,
-    manage_full_control_conflicts,
-    package_info,
-    run_action,
-    service_action as package_service_action,
-)
-from mpwrd_config.meshtastic import (
-    MeshtasticSession,
-    add_admin_key,
-    channel_add,
-    channel_add_url,
-    channel_delete,
-    channel_disable,
-    channel_enable,
-    channel_set,
-    channel_set_url,
-    clear_admin_keys,
-    config_qr,
-    current_radio,
-    get_legacy_admin_state,
-    get_private_key,
-    get_preference,
-    get_public_key,
-    i2c_state,
-    list_admin_keys,
-    list_preference_fields,
-    lora_settings,
-    mac_address_source,
-    mac_address_source_options,
-    meshtastic_config,
-    meshtastic_info,
-    meshtastic_repo_status,
-    meshtastic_summary,
-    meshtastic_update,
-    mesh_test,
-    service_action as meshtastic_service_action,
-    service_enable as meshtastic_service_enable,
-    service_status as meshtastic_service_status,
-    set_config_url,
-    set_legacy_admin_state,
-    set_mac_address_source,
-    set_meshtastic_repo,
-    set_lora_settings,
-    set_private_key,
-    set_preference,
-    set_public_key,
-    set_radio,
-    uninstall as meshtastic_uninstall,
-    upgrade as meshtastic_upgrade,
-)
-from mpwrd_config.system_utils import (
-    act_led,
-    all_system_info,
-    cpu_info,
-    generate_ssh_keys,
-    legacy_tool_command,
-    license_info,
-    logging_state,
-    networking_info,
-    os_info,
-    peripherals_info,
-    pinout_info,
-    process_snapshot,
-    storage_info,
-    ttyd_action,
-)
+from mpwrd_config.core import DEFAULT_CONFIG_PATH, Config, WifiNetwork, load_config, save_config
 from mpwrd_config.system import (
     CommandResult,
+    _append_output,
     ethernet_status,
     ip_addresses,
     list_ethernet_interfaces,
@@ -234,52 +183,555 @@ from mpwrd_config.system import (
     wifi_state,
     wifi_status,
 )
-from mpwrd_config.time_config import current_timezone, set_time, set_timezone, status as time_status
-from mpwrd_config.wifi_mesh import sync_once as wifi_mesh_sync
+
+if TYPE_CHECKING:
+    from mpwrd_config.meshtastic import MeshtasticSession
 
 T = TypeVar("T")
 
+_LORA_OFFLINE_ITEMS = (
+    ("1", "Set LoRa radio model"),
+    ("2", "Back"),
+)
+
+_LORA_MENU_ITEMS = (
+    ("1", "Wizard (set all)"),
+    ("2", "Set LoRa radio model"),
+    ("3", "Configure with URL"),
+    ("4", "Region"),
+    ("5", "Use modem preset"),
+    ("6", "Preset"),
+    ("7", "Bandwidth"),
+    ("8", "Spread factor"),
+    ("9", "Coding rate"),
+    ("10", "Frequency offset"),
+    ("11", "Hop limit"),
+    ("12", "Enable/disable TX"),
+    ("13", "TX power"),
+    ("14", "Frequency slot"),
+    ("15", "Override duty cycle"),
+    ("16", "SX126X RX boosted gain"),
+    ("17", "Override frequency"),
+    ("18", "Ignore MQTT"),
+    ("19", "OK to MQTT"),
+    ("20", "Show current LoRa settings"),
+    ("21", "Show config URL + QR"),
+    ("22", "Back"),
+)
+
+_RADIO_OPTIONS = (
+    ("lr1121_tcxo", "LR1121 TCXO"),
+    ("sx1262_tcxo", "SX1262 TCXO (Ebyte e22-900m30s / Heltec ht-ra62 / Seeed wio-sx1262)"),
+    ("sx1262_xtal", "SX1262 XTAL (Ebyte e80-900m22s / Waveshare / AI Thinker ra-01sh)"),
+    ("lora-meshstick-1262", "LoRa Meshstick 1262 (USB)"),
+    ("sim", "Simulated radio (software)"),
+    ("none", "Auto-detect (no forced profile)"),
+)
+_RADIO_KEYS = frozenset(key for key, _ in _RADIO_OPTIONS)
+
+_LORA_CONFIG_METHOD_ITEMS = (
+    ("url", "Automatic configuration with URL"),
+    ("manual", "Manual configuration"),
+    ("cancel", "Cancel"),
+)
+
+_LORA_REGIONS = (
+    "UNSET",
+    "US",
+    "EU_433",
+    "EU_868",
+    "CN",
+    "JP",
+    "ANZ",
+    "KR",
+    "TW",
+    "RU",
+    "IN",
+    "NZ_865",
+    "TH",
+    "LORA_24",
+    "UA_433",
+    "UA_868",
+    "MY_433",
+    "MY_919",
+    "SG_923",
+)
+_LORA_REGION_ITEMS = tuple((value, value) for value in _LORA_REGIONS)
+
+_LORA_PRESETS = (
+    "LONG_FAST",
+    "LONG_SLOW",
+    "VERY_LONG_SLOW",
+    "MEDIUM_SLOW",
+    "MEDIUM_FAST",
+    "SHORT_SLOW",
+    "SHORT_FAST",
+    "SHORT_TURBO",
+)
+_LORA_PRESET_ITEMS = tuple((value, value) for value in _LORA_PRESETS)
+
+_LORA_BANDWIDTH_ITEMS = tuple((value, value) for value in ("0", "31", "62", "125", "250", "500"))
+_LORA_SPREAD_FACTOR_ITEMS = tuple((value, value) for value in ("0", "7", "8", "9", "10", "11", "12"))
+_LORA_CODING_RATE_ITEMS = tuple((value, value) for value in ("0", "5", "6", "7", "8"))
+
+_LORA_SETTING_KEYS = {
+    "region": "lora_region",
+    "use_preset": "lora_usePreset",
+    "modem_preset": "lora_modemPreset",
+    "bandwidth": "lora_bandwidth",
+    "spread_factor": "lora_spreadFactor",
+    "coding_rate": "lora_codingRate",
+    "frequency_offset": "lora_frequencyOffset",
+    "hop_limit": "lora_hopLimit",
+    "tx_enabled": "lora_txEnabled",
+    "tx_power": "lora_txPower",
+    "channel_num": "lora_channelNum",
+    "override_duty_cycle": "lora_overrideDutyCycle",
+    "sx126x_rx_boosted_gain": "lora_sx126xRxBoostedGain",
+    "override_frequency": "lora_overrideFrequency",
+    "ignore_mqtt": "lora_ignoreMqtt",
+    "config_ok_to_mqtt": "lora_configOkToMqtt",
+}
+
+INTERFACE_CACHE_TTL = 5.0
+_INTERFACE_CACHE: dict[str, tuple[float, list[str]]] = {}
+STATUS_CACHE_TTL = 5.0
+_STATUS_CACHE: dict[str, tuple[float, CommandResult]] = {}
+SERVICE_CACHE_TTL = 5.0
+_UNIT_DIR_CACHE: dict[str, tuple[float, frozenset[str]]] = {}
+
+_WIFI_IP_ITEMS = (
+    ("dhcp", "DHCP (automatic)"),
+    ("static", "Static IP"),
+)
+
+_SERVICE_MENU_ITEMS = (
+    ("1", "Status"),
+    ("2", "Start"),
+    ("3", "Stop"),
+    ("4", "Restart"),
+    ("5", "Enable"),
+    ("6", "Disable"),
+    ("7", "Back"),
+)
+
+_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+_TIME_RE = re.compile(r"\d{2}:\d{2}:\d{2}")
+_FREQUENCY_OFFSET_RE = re.compile(r"[0-9]{1,7}(\.[0-9]+)?")
+_MAC_ADDRESS_RE = re.compile(r"([0-9a-f]{2}:){5}[0-9a-f]{2}", re.I)
+_FREQUENCY_RE = re.compile(r"[0-9]+(\.[0-9]+)?")
+_WPA_SSID_RE = re.compile(r'\bssid="([^"]+)"')
+_WPA_COUNTRY_RE = re.compile(r"country=([A-Za-z]{2})")
+
+_SYSTEMD_UNIT_DIRS = ("/etc/systemd/system", "/lib/systemd/system", "/usr/lib/systemd/system")
+
+_SERVICE_ACTIONS: Mapping[str, str] = MappingProxyType(
+    {
+        "1": "status",
+        "2": "start",
+        "3": "stop",
+        "4": "restart",
+        "5": "enable",
+        "6": "disable",
+    }
+)
+
+_IDENTITY_ITEMS = (
+    ("1", "Set hostname"),
+    ("2", "Back"),
+)
+
+_INTERFACES_ITEMS = (
+    ("1", "Select Wi-Fi interface"),
+    ("2", "Select ethernet interface"),
+    ("3", "Back"),
+)
+
+_WIFI_SETTINGS_ITEMS = (
+    ("1", "Wi-Fi status"),
+    ("2", "Connect to Wi-Fi"),
+    ("3", "Configure Wi-Fi IP"),
+    ("4", "Enable Wi-Fi"),
+    ("5", "Disable Wi-Fi"),
+    ("6", "Select Wi-Fi interface"),
+    ("7", "Restart Wi-Fi"),
+    ("8", "Back"),
+)
+
+_NETWORKING_DIAGNOSTICS_ITEMS = (
+    ("1", "Wi-Fi status"),
+    ("2", "Show ethernet status"),
+    ("3", "Show IP addresses"),
+    ("4", "Test internet connection"),
+    ("5", "Back"),
+)
+
+_NETWORKING_ITEMS = (
+    ("1", "Identity"),
+    ("2", "Interfaces"),
+    ("3", "Wi-Fi Settings"),
+    ("4", "Diagnostics"),
+    ("5", "Back"),
+)
+
+_MESHTASTIC_SETTINGS_ITEMS = (
+    ("1", "Preferences"),
+    ("2", "Channels"),
+    ("3", "Back"),
+)
+
+_MESHTASTIC_PREFERENCES_ITEMS = (
+    ("1", "Show preferences + modules"),
+    ("2", "List preference fields"),
+    ("3", "Get preference value"),
+    ("4", "Set preference value"),
+    ("5", "Back"),
+)
+
+_MESHTASTIC_CHANNELS_ITEMS = (
+    ("1", "Show channels"),
+    ("2", "Set channel field"),
+    ("3", "Add channel"),
+    ("4", "Delete channel"),
+    ("5", "Enable channel"),
+    ("6", "Disable channel"),
+    ("7", "Set channels from URL"),
+    ("8", "Add channels from URL"),
+    ("9", "Back"),
+)
+
+_MESHTASTIC_REPO_ITEMS = (
+    ("1", "Show current repo"),
+    ("2", "Upgrade meshtasticd"),
+    ("3", "Install/Update repo (choose channel)"),
+    ("4", "Use beta repo (install/update)"),
+    ("5", "Use alpha repo (install/update)"),
+    ("6", "Use daily repo (install/update)"),
+    ("7", "Uninstall meshtasticd"),
+    ("8", "Back"),
+)
+
+_MESHTASTIC_REPO_INSTALL_ITEMS = (
+    ("beta", "Beta"),
+    ("alpha", "Alpha"),
+    ("daily", "Daily"),
+    ("back", "Back"),
+)
+
+_MESHTASTICD_SERVICE_ITEMS = (
+    ("1", "Status"),
+    ("2", "Start"),
+    ("3", "Stop"),
+    ("4", "Restart"),
+    ("5", "Enable"),
+    ("6", "Disable"),
+    ("7", "MAC address source"),
+    ("8", "Back"),
+)
+
+_MESHTASTIC_SERVICES_ITEMS = (
+    ("1", "meshtasticd service"),
+    ("2", "avahi"),
+    ("3", "Admin mesh client Wi-Fi toggle"),
+    ("4", "Back"),
+)
+
+_MESHTASTIC_KEYS_ITEMS = (
+    ("1", "Show public key"),
+    ("2", "Set public key"),
+    ("3", "Show private key"),
+    ("4", "Set private key"),
+    ("5", "List admin keys"),
+    ("6", "Add admin key"),
+    ("7", "Clear admin keys"),
+    ("8", "Legacy admin status"),
+    ("9", "Set legacy admin"),
+    ("10", "Back"),
+)
+
+_MESHTASTIC_ADVANCED_ITEMS = (
+    ("1", "Run custom Meshtastic command"),
+    ("2", "Back"),
+)
+
+_MESHTASTIC_OVERVIEW_ITEMS = (
+    ("1", "Show node summary"),
+    ("2", "Show node info"),
+    ("3", "Back"),
+)
+
+_MESHTASTIC_URL_ITEMS = (
+    ("1", "Show config URL + QR"),
+    ("2", "Set config URL"),
+    ("3", "Back"),
+)
+
+_MESHTASTIC_DIAGNOSTICS_ITEMS = (
+    ("1", "Show LoRa settings"),
+    ("2", "Mesh connectivity test"),
+    ("3", "Back"),
+)
+
+_MESHTASTIC_ITEMS = (
+    ("1", "Meshtastic overview"),
+    ("2", "URL"),
+    ("3", "Channels"),
+    ("4", "LoRa configuration"),
+    ("5", "Preferences"),
+    ("6", "Keys & admin"),
+    ("7", "Meshtastic services"),
+    ("8", "Meshtastic repository"),
+    ("9", "Diagnostics"),
+    ("10", "Advanced"),
+    ("11", "Back"),
+)
+
+_SYSTEM_ACTIONS_ITEMS = (
+    ("1", "Reboot"),
+    ("2", "Shutdown"),
+    ("3", "Back"),
+)
+
+_TIME_ITEMS = (
+    ("1", "Show current status"),
+    ("2", "Set timezone"),
+    ("3", "Set time"),
+    ("4", "Watchclock service"),
+    ("5", "Back"),
+)
+
+_LEGACY_ADMIN_ITEMS = (
+    ("true", "Enable"),
+    ("false", "Disable"),
+    ("back", "Back"),
+)
+
+_UNCHANGED = object()
+_BOOL_ITEMS = (
+    ("true", "True"),
+    ("false", "False"),
+    ("skip", "Cancel"),
+)
+
+_MESHTASTIC_I2C_ITEMS = (
+    ("1", "Check I2C state"),
+    ("2", "Enable I2C"),
+    ("3", "Disable I2C"),
+    ("4", "Back"),
+)
+
+_UTILITIES_ITEMS = (
+    ("1", "System info"),
+    ("2", "Logging"),
+    ("3", "Activity LED"),
+    ("4", "Meshtastic I2C"),
+    ("5", "ttyd service"),
+    ("6", "Regenerate SSH keys"),
+    ("7", "Process viewer/manager"),
+    ("8", "Time & Timezone"),
+    ("9", "Back"),
+)
+
+_SYSTEM_INFO_ITEMS = (
+    ("all", "All"),
+    ("cpu", "CPU"),
+    ("os", "OS"),
+    ("storage", "Storage"),
+    ("network", "Networking"),
+    ("peripherals", "Peripherals"),
+    ("back", "Back"),
+)
+
+_LOGGING_ITEMS = (
+    ("enable", "Enable /var/log"),
+    ("disable", "Disable /var/log"),
+    ("check", "Check"),
+    ("back", "Back"),
+)
+
+_ACT_LED_ITEMS = (
+    ("enable", "Enable"),
+    ("disable", "Disable"),
+    ("check", "Check"),
+    ("back", "Back"),
+)
+
+_TTYD_ITEMS = (
+    ("enable", "Enable"),
+    ("disable", "Disable"),
+    ("start", "Start"),
+    ("stop", "Stop"),
+    ("restart", "Restart"),
+    ("check", "Check"),
+)
+
+_HELP_ITEMS = (
+    ("1", "About mpwrd-config"),
+    ("2", "Display pinout"),
+    ("3", "Femtofox licensing info - short"),
+    ("4", "Femtofox licensing info - long"),
+    ("5", "Meshtastic licensing info"),
+    ("6", "Back"),
+)
+
+_HELP_LICENSE_SECTIONS: Mapping[str, tuple[str, str]] = MappingProxyType(
+    {
+        "1": ("About mpwrd-config", "about"),
+        "3": ("Femtofox license", "short"),
+        "4": ("Femtofox license (long)", "long"),
+        "5": ("Meshtastic license", "meshtastic"),
+    }
+)
+
+_PINOUT_ITEMS = (
+    ("femtofox", "Femtofox Pro/CE"),
+    ("zero", "Femtofox Zero"),
+    ("tiny", "Femtofox Tiny"),
+    ("luckfox", "Luckfox Pico Mini"),
+    ("back", "Back"),
+)
+
+_WIFI_MESH_ITEMS = (
+    ("1", "Run sync now"),
+    ("2", "Service status"),
+    ("3", "Start service"),
+    ("4", "Stop service"),
+    ("5", "Restart service"),
+    ("6", "Enable service"),
+    ("7", "Disable service"),
+    ("8", "Back"),
+)
+
+_WIFI_MESH_SERVICES = ("femto-wifi-mesh", "femto-wifi-mesh-control")
+_WATCHCLOCK_SERVICES = ("femto-watchclock", "watchclock")
+
+_WIFI_MESH_ACTIONS: Mapping[str, str] = MappingProxyType(
+    {
+        "2": "status",
+        "3": "start",
+        "4": "stop",
+        "5": "restart",
+        "6": "enable",
+        "7": "disable",
+    }
+)
+
+_SOFTWARE_RUN_ACTIONS: Mapping[str, tuple[str, str]] = MappingProxyType(
+    {
+        "install": ("Install", "-i"),
+        "uninstall": ("Uninstall", "-u"),
+        "upgrade": ("Upgrade", "-g"),
+        "init": ("Initialize", "-a"),
+        "run": ("Run", "-l"),
+    }
+)
+_PKG_SERVICE_FLAGS: Mapping[str, str] = MappingProxyType(
+    {
+        "enable": "-e",
+        "disable": "-d",
+        "stop": "-s",
+        "restart": "-r",
+    }
+)
+_SOFTWARE_STATE_ACTIONS = frozenset({"install", "uninstall", "init", "upgrade"})
+
+_WIZARD_MESHTASTIC_ITEMS = (
+    ("1", "Set LoRa radio model"),
+    ("2", "Set configuration URL"),
+    ("3", "Set private key"),
+    ("4", "Set public key"),
+    ("5", "Full Meshtastic settings"),
+    ("6", "Continue"),
+)
+
+_BASIC_MENU_ITEMS = (
+    ("1", "Install Wizard"),
+    ("2", "Back"),
+)
+
+_ADVANCED_MENU_ITEMS = (
+    ("1", "Meshtastic"),
+    ("2", "Networking"),
+    ("3", "Software Manager"),
+    ("4", "System Utilities"),
+    ("5", "System Actions"),
+    ("6", "Help / About"),
+    ("7", "Back"),
+)
+
+_MAIN_MENU_ITEMS = (
+    ("1", "Basic"),
+    ("2", "Advanced"),
+    ("3", "Exit"),
+)
+
+
+class _PersistentMessageDialog:
+    def __init__(self) -> None:
+        self._text_area = TextArea(
+            text="",
+            read_only=True,
+            scrollbar=True,
+            wrap_lines=True,
+            focusable=True,
+        )
+        ok_button = Button(text="OK", handler=self._close)
+        self._dialog = Dialog(title="", body=self._text_area, buttons=[ok_button], with_background=True)
+        kb = KeyBindings()
+        kb.add("tab")(focus_next)
+        kb.add("s-tab")(focus_previous)
+        kb.add("escape")(self._close)
+        kb.add("q")(self._close)
+        kb.add("enter")(self._close)
+        kb.add("left")(self._close)
+        self._app = Application(
+            layout=Layout(self._dialog, focused_element=self._text_area),
+            key_bindings=merge_key_bindings([GLOBAL_KEY_BINDINGS, DEFAULT_KEY_BINDINGS, kb]),
+            mouse_support=False,
+            style=DIALOG_STYLE,
+            full_screen=True,
+        )
+
+    def _close(self, event=None) -> None:
+        _safe_app_exit(self._app)
+
+    def show(self, title: str, body: str) -> None:
+        self._dialog.title = title
+        self._text_area.text = body
+        self._app.layout.focus(self._text_area)
+        self._app.run()
+
+
+_MESSAGE_DIALOG: _PersistentMessageDialog | None = None
+
+
+def _message_dialog() -> _PersistentMessageDialog:
+    global _MESSAGE_DIALOG
+    if _MESSAGE_DIALOG is None:
+        _MESSAGE_DIALOG = _PersistentMessageDialog()
+    return _MESSAGE_DIALOG
+
 
 def _message(title: str, body: str) -> None:
     _clear_screen()
     text = body or ""
-    text_area = TextArea(
-        text=text,
-        read_only=True,
-        scrollbar=True,
-        wrap_lines=True,
-        focusable=True,
-    )
-    app: Application | None = None
-
-    def _close(event=None) -> None:
-        _safe_app_exit(app)
-
-    ok_button = Button(text="OK", handler=_close)
-    buttons = [ok_button]
-    dialog = Dialog(title=title, body=text_area, buttons=buttons, with_background=True)
-    kb = KeyBindings()
-    kb.add("tab")(focus_next)
-    kb.add("s-tab")(focus_previous)
-    kb.add("escape")(_close)
-    kb.add("q")(_close)
-    kb.add("enter")(_close)
-    kb.add("left")(_close)
-    app = Application(
-        layout=Layout(dialog, focused_element=text_area),
-        key_bindings=merge_key_bindings([GLOBAL_KEY_BINDINGS, load_key_bindings(), kb]),
-        mouse_support=False,
-        style=DIALOG_STYLE,
-        full_screen=True,
-    )
+    if len(text) > MESSAGE_MAX_CHARS:
+        text = text[-MESSAGE_MAX_CHARS:]
     try:
-        app.run()
+        _message_dialog().show(title, text)
     except (EOFError, KeyboardInterrupt):
         return
     finally:
         _clear_screen()
 
 
+def _output_message(title: str, output: str | None, empty: str) -> None:
+    text = output or ""
+    if text[-1:].isspace():
+        text = text.rstrip()
+    _message(title, text or empty)
+
+
 def _print_exiting_notice() -> None:
     _print_terminal_spinner_notice("Exiting...")
 
@@ -313,55 +765,74 @@ def _run_interactive(command: list[str], title: str, missing: str) -> None:
         _clear_screen()
 
 
-def _run_with_status(title: str, body: str, action: Callable[[], T]) -> T:
-    _clear_screen()
-    result: dict[str, T] = {}
-    errors: dict[str, BaseException] = {}
-    text = body.strip() or "Working..."
-    text_area = TextArea(
-        text=text,
-        read_only=True,
-        scrollbar=False,
-        wrap_lines=True,
-        focusable=False,
-    )
-    dialog = Dialog(title=title, body=text_area, buttons=[], with_background=True)
-    kb = KeyBindings()
+class _PersistentStatusDialog:
+    def __init__(self) -> None:
+        self._text_area = TextArea(
+            text="",
+            read_only=True,
+            scrollbar=False,
+            wrap_lines=True,
+            focusable=False,
+        )
+        self._dialog = Dialog(title="", body=self._text_area, buttons=[], with_background=True)
+        kb = KeyBindings()
 
-    def _ignore(event=None) -> None:
-        return
+        def _ignore(event=None) -> None:
+            return
 
-    kb.add("escape")(_ignore)
-    kb.add("q")(_ignore)
-    kb.add("enter")(_ignore)
-    kb.add(" ")(_ignore)
-    kb.add("left")(_ignore)
-    kb.add("right")(_ignore)
+        kb.add("escape")(_ignore)
+        kb.add("q")(_ignore)
+        kb.add("enter")(_ignore)
+        kb.add(" ")(_ignore)
+        kb.add("left")(_ignore)
+        kb.add("right")(_ignore)
 
-    app = Application(
-        layout=Layout(dialog),
-        key_bindings=merge_key_bindings([GLOBAL_KEY_BINDINGS, DEFAULT_KEY_BINDINGS, kb]),
-        mouse_support=False,
-        style=DIALOG_STYLE,
-        full_screen=True,
-    )
+        self._app = Application(
+            layout=Layout(self._dialog),
+            key_bindings=merge_key_bindings([GLOBAL_KEY_BINDINGS, DEFAULT_KEY_BINDINGS, kb]),
+            mouse_support=False,
+            style=DIALOG_STYLE,
+            full_screen=True,
+        )
 
-    async def _run_action() -> None:
-        loop = asyncio.get_running_loop()
-        try:
-            result["value"] = await loop.run_in_executor(None, action)
-        except BaseException as exc:
-            errors["error"] = exc
-        finally:
-            _safe_app_exit(app)
+    def run(self, title: str, body: str, action: Callable[[], T]) -> T:
+        result: dict[str, T] = {}
+        errors: dict[str, BaseException] = {}
+        app = self._app
+        self._dialog.title = title
+        self._text_area.text = body.strip() or "Working..."
+
+        async def _run_action() -> None:
+            loop = asyncio.get_running_loop()
+            try:
+                result["value"] = await loop.run_in_executor(None, action)
+            except BaseException as exc:
+                errors["error"] = exc
+            finally:
+                _safe_app_exit(app)
 
-    try:
         app.run(pre_run=lambda: app.create_background_task(_run_action()))
+        if "error" in errors:
+            raise errors["error"]
+        return result["value"]
+
+
+_STATUS_DIALOG: _PersistentStatusDialog | None = None
+
+
+def _status_dialog() -> _PersistentStatusDialog:
+    global _STATUS_DIALOG
+    if _STATUS_DIALOG is None:
+        _STATUS_DIALOG = _PersistentStatusDialog()
+    return _STATUS_DIALOG
+
+
+def _run_with_status(title: str, body: str, action: Callable[[], T]) -> T:
+    _clear_screen()
+    try:
+        return _status_dialog().run(title, body, action)
     finally:
         _clear_screen()
-    if "error" in errors:
-        raise errors["error"]
-    return result["value"]
 
 
 def _run_with_status_message(
@@ -373,10 +844,10 @@ def _run_with_status_message(
 ) -> object:
     result = _run_with_status(title, status, action)
     if hasattr(result, "stdout"):
-        output = str(getattr(result, "stdout", "") or "").strip()
+        output = str(getattr(result, "stdout", "") or "")
     else:
-        output = str(result or "").strip()
-    _message(title, output or empty)
+        output = str(result or "")
+    _output_message(title, output, empty)
     return result
 
 
@@ -574,27 +1045,28 @@ def _menu_dialog() -> _PersistentMenuDialog:
     return _MENU_DIALOG
 
 
-def _menu(title: str, items: list[tuple[str, str]], default: str | None = None) -> str | None:
-    choices = [{"name": label or key, "value": key} for key, label in items]
+def _menu(title: str, items: Sequence[tuple[str, str]], default: str | None = None) -> str | None:
     try:
-        if len(choices) > 30:
-            return inquirer.fuzzy(
-                message=title,
-                choices=choices,
-                default=default,
-                border=True,
-                pointer=">",
-                style=FUZZY_STYLE,
-                qmark="",
-                amark="",
-                mandatory=False,
-                raise_keyboard_interrupt=True,
-                keybindings={
-                    "answer": [{"key": "enter"}, {"key": "right"}, {"key": " "}],
-                    "skip": [{"key": "escape"}, {"key": "left"}],
-                },
-            ).execute()
-        values = [(item["value"], item["name"]) for item in choices]
+        if len(items) > FUZZY_MENU_THRESHOLD:
+            keys = {key for key, _ in items}
+            choices = [{"name": label or key, "value": key} for key, label in items]
+            while True:
+                choice = inquirer.fuzzy(
+                    message=title,
+                    choices=choices,
+                    default=default,
+                    border=True,
+                    pointer=">",
+                    style=FUZZY_STYLE,
+                    qmark="",
+                    amark="",
+                    mandatory=False,
+                    raise_keyboard_interrupt=True,
+                    keybindings=FUZZY_KEYBINDINGS,
+                ).execute()
+                if choice is None or choice in keys:
+                    return choice
+        values = [(key, label or key) for key, label in items]
         if not values:
             return None
         return _menu_dialog().show(title, values, default=default)
@@ -602,50 +1074,75 @@ def _menu(title: str, items: list[tuple[str, str]], default: str | None = None)
         raise _QuickExit()
 
 
-def _yesno(title: str, body: str) -> bool:
-    _clear_screen()
-    text_area = TextArea(
-        text=body or "",
-        read_only=True,
-        scrollbar=True,
-        wrap_lines=True,
-        focusable=False,
-    )
-    app: Application | None = None
-    result = {"value": False}
+class _PersistentYesNoDialog:
+    def __init__(self) -> None:
+        self._result = False
+        self._text_area = TextArea(
+            text="",
+            read_only=True,
+            scrollbar=True,
+            wrap_lines=True,
+            focusable=False,
+        )
+        self._yes_button = Button(text="Yes", handler=self._accept)
+        no_button = Button(text="No", handler=self._cancel)
+        self._dialog = Dialog(
+            title="",
+            body=self._text_area,
+            buttons=[self._yes_button, no_button],
+            with_background=True,
+        )
+        kb = KeyBindings()
+        kb.add("tab")(focus_next)
+        kb.add("s-tab")(focus_previous)
+        kb.add("escape")(self._cancel)
+        kb.add("q")(self._cancel)
+        kb.add("left")(self._cancel)
+        kb.add("right")(self._accept)
+        kb.add("enter")(self._accept)
+        self._app = Application(
+            layout=Layout(self._dialog, focused_element=self._yes_button),
+            key_bindings=merge_key_bindings([GLOBAL_KEY_BINDINGS, DEFAULT_KEY_BINDINGS, kb]),
+            mouse_support=False,
+            style=DIALOG_STYLE,
+            full_screen=True,
+        )
 
-    def _accept(event=None) -> None:
-        result["value"] = True
-        _safe_app_exit(app)
+    def _accept(self, event=None) -> None:
+        self._result = True
+        _safe_app_exit(self._app)
 
-    def _cancel(event=None) -> None:
-        result["value"] = False
-        _safe_app_exit(app)
+    def _cancel(self, event=None) -> None:
+        self._result = False
+        _safe_app_exit(self._app)
 
-    yes_button = Button(text="Yes", handler=_accept)
-    no_button = Button(text="No", handler=_cancel)
-    dialog = Dialog(title=title, body=text_area, buttons=[yes_button, no_button], with_background=True)
-    kb = KeyBindings()
-    kb.add("tab")(focus_next)
-    kb.add("s-tab")(focus_previous)
-    kb.add("escape")(_cancel)
-    kb.add("q")(_cancel)
-    kb.add("left")(_cancel)
-    kb.add("right")(_accept)
-    kb.add("enter")(_accept)
-    app = Application(
-        layout=Layout(dialog, focused_element=yes_button),
-        key_bindings=merge_key_bindings([GLOBAL_KEY_BINDINGS, DEFAULT_KEY_BINDINGS, kb]),
-        mouse_support=False,
-        style=DIALOG_STYLE,
-        full_screen=True,
-    )
+    def show(self, title: str, body: str) -> bool:
+        self._dialog.title = title
+        self._text_area.text = body or ""
+        self._result = False
+        self._app.layout.focus(self._yes_button)
+        self._app.run()
+        return self._result
+
+
+_YESNO_DIALOG: _PersistentYesNoDialog | None = None
+
+
+def _yesno_dialog() -> _PersistentYesNoDialog:
+    global _YESNO_DIALOG
+    if _YESNO_DIALOG is None:
+        _YESNO_DIALOG = _PersistentYesNoDialog()
+    return _YESNO_DIALOG
+
+
+def _yesno(title: str, body: str) -> bool:
+    _clear_screen()
     try:
-        app.run()
+        result = _yesno_dialog().show(title, body)
     except (KeyboardInterrupt, EOFError):
         raise _QuickExit()
     _clear_screen()
-    return result["value"]
+    return result
 
 
 def _inputbox(title: str, body: str, default: str = "") -> str | None:
@@ -660,6 +1157,69 @@ def _inputbox(title: str, body: str, default: str = "") -> str | None:
     return str(value).strip()
 
 
+def _formbox(
+    title: str,
+    fields: Sequence[tuple[str, str, str, Callable[[str], Any], str]],
+) -> dict[str, str] | None:
+    values = {key: default for key, _, default, _, _ in fields}
+    width = max(len(label) for _, label, _, _, _ in fields) + 2
+    while True:
+        _clear_screen()
+        inputs = {key: TextArea(text=values[key], multiline=False, width=24) for key, _, _, _, _ in fields}
+        for key, area in inputs.items():
+            area.buffer.cursor_position = len(area.text)
+        rows = [VSplit([Label(text=label, width=width), inputs[key]]) for key, label, _, _, _ in fields]
+        submitted = {"value": False}
+        app: Application | None = None
+
+        def _submit(event=None) -> None:
+            submitted["value"] = True
+            _safe_app_exit(app)
+
+        def _cancel(event=None) -> None:
+            _safe_app_exit(app)
+
+        dialog = Dialog(
+            title=title,
+            body=HSplit(rows, padding=0),
+            buttons=[Button(text="OK", handler=_submit), Button(text="Cancel", handler=_cancel)],
+            with_background=True,
+        )
+        kb = KeyBindings()
+        kb.add("tab")(focus_next)
+        kb.add("s-tab")(focus_previous)
+        kb.add("down")(focus_next)
+        kb.add("up")(focus_previous)
+        kb.add("escape")(_cancel)
+        kb.add("enter")(_submit)
+        app = Application(
+            layout=Layout(dialog, focused_element=inputs[fields[0][0]]),
+            key_bindings=merge_key_bindings([GLOBAL_KEY_BINDINGS, DEFAULT_KEY_BINDINGS, kb]),
+            mouse_support=False,
+            style=DIALOG_STYLE,
+            full_screen=True,
+        )
+        try:
+            app.run()
+        except KeyboardInterrupt:
+            raise _QuickExit()
+        except EOFError:
+            return None
+        finally:
+            _clear_screen()
+        if not submitted["value"]:
+            return None
+        values = {key: inputs[key].text.strip() for key, _, _, _, _ in fields}
+        errors = [
+            f"{label} {error}"
+            for key, label, _, validator, error in fields
+            if values[key] and not validator(values[key])
+        ]
+        if not errors:
+            return {key: value for key, value in values.items() if value}
+        _message(title, "\n".join(errors))
+
+
 def _safe_date(value: str) -> bool:
     try:
         datetime.strptime(value, "%Y-%m-%d")
@@ -680,8 +1240,87 @@ def _config_path() -> Path:
     return Path(os.getenv("MPWRD_CONFIG_PATH") or DEFAULT_CONFIG_PATH)
 
 
+@lru_cache(maxsize=1)
+def _nodename() -> str:
+    return socket.gethostname()
+
+
+@lru_cache(maxsize=1)
+def _timezone_items() -> tuple[tuple[str, str], ...]:
+    output = subprocess.check_output(["timedatectl", "list-timezones"], text=True)
+    return tuple((zone, "") for zone in output.splitlines())
+
+
+def _cached_interfaces(kind: str, loader: Callable[[], list[str]]) -> list[str]:
+    now = time.monotonic()
+    cached = _INTERFACE_CACHE.get(kind)
+    if cached and now - cached[0] < INTERFACE_CACHE_TTL:
+        return list(cached[1])
+    interfaces = loader()
+    _INTERFACE_CACHE[kind] = (now, interfaces)
+    return list(interfaces)
+
+
+def _wifi_interfaces() -> list[str]:
+    return _cached_interfaces("wifi", list_wifi_interfaces)
+
+
+def _ethernet_interfaces() -> list[str]:
+    return _cached_interfaces("ethernet", list_ethernet_interfaces)
+
+
+def _cached_status(key: str, action: Callable[[], CommandResult]) -> CommandResult:
+    now = time.monotonic()
+    cached = _STATUS_CACHE.get(key)
+    if cached and now - cached[0] < STATUS_CACHE_TTL:
+        return cached[1]
+    result = action()
+    if result.returncode == 0:
+        _STATUS_CACHE[key] = (now, result)
+    return result
+
+
+def _scan_unit_dir(base: str) -> frozenset[str]:
+    try:
+        with os.scandir(base) as entries:
+            return frozenset(entry.name for entry in entries)
+    except OSError:
+        return frozenset()
+
+
+def _unit_installed(unit: str) -> bool:
+    now = time.monotonic()
+    for base in _SYSTEMD_UNIT_DIRS:
+        cached = _UNIT_DIR_CACHE.get(base)
+        if cached and (unit in cached[1] or now - cached[0] < SERVICE_CACHE_TTL):
+            names = cached[1]
+        else:
+            names = _scan_unit_dir(base)
+            _UNIT_DIR_CACHE[base] = (now, names)
+        if unit in names:
+            return True
+    return False
+
+
+def _service_exists(name: str) -> bool:
+    return _unit_installed(f"{name}.service")
+
+
+@lru_cache(maxsize=None)
+def _select_service(candidates: tuple[str, ...]) -> str:
+    for candidate in candidates:
+        if _service_exists(candidate):
+            return candidate
+    return candidates[0]
+
+
+def _forget_unit_files() -> None:
+    _UNIT_DIR_CACHE.clear()
+    _select_service.cache_clear()
+
+
 def _has_wifi_interface() -> bool:
-    return len(list_wifi_interfaces()) > 0
+    return len(_wifi_interfaces()) > 0
 
 
 def _calendar(title: str, body: str, day: int, month: int, year: int) -> str | None:
@@ -690,8 +1329,7 @@ def _calendar(title: str, body: str, day: int, month: int, year: int) -> str | N
         value = inquirer.text(
             message=f"{title}\n{body}\n(YYYY-MM-DD)",
             default=default,
-            validate=lambda text: bool(re.fullmatch(r"\\d{4}-\\d{2}-\\d{2}", text))
-            and _safe_date(text),
+            validate=lambda text: bool(_DATE_RE.fullmatch(text)) and _safe_date(text),
             style=APP_STYLE,
         ).execute()
     except KeyboardInterrupt:
@@ -710,7 +1348,7 @@ def _timebox(title: str, body: str, hour: int, minute: int, second: int) -> str
         value = inquirer.text(
             message=f"{title}\n{body}\n(HH:MM:SS)",
             default=default,
-            validate=lambda text: bool(re.fullmatch(r"\\d{2}:\\d{2}:\\d{2}", text)) and _safe_time(text),
+            validate=lambda text: bool(_TIME_RE.fullmatch(text)) and _safe_time(text),
             style=APP_STYLE,
         ).execute()
     except KeyboardInterrupt:
@@ -723,7 +1361,7 @@ def _timebox(title: str, body: str, hour: int, minute: int, second: int) -> str
 
 
 def _cli_command(args: list[str]) -> list[str]:
-    return [sys.executable, "-m", "mpwrd_config.cli", *args]
+    return [sys.executable, "-u", "-m", "mpwrd_config.cli", *args]
 
 
 def _run_cli(args: list[str]) -> int:
@@ -734,20 +1372,83 @@ def _run_cli(args: list[str]) -> int:
     )
 
 
-def _run_cli_output(args: list[str], title: str) -> int:
-    result = _run_with_status(
-        title,
-        "Working...",
-        lambda: subprocess.run(
-            _cli_command(args),
-            check=False,
-            text=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-        ),
+def _run_cli_streaming(args: list[str], title: str) -> CommandResult:
+    _clear_screen()
+    lines: deque[str] = deque(maxlen=CLI_OUTPUT_MAX_LINES)
+    process = subprocess.Popen(
+        _cli_command(args),
+        encoding="utf-8",
+        errors="replace",
+        bufsize=1,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+    )
+    text_area = TextArea(
+        text="Working...",
+        read_only=True,
+        scrollbar=True,
+        wrap_lines=True,
+        focusable=False,
+    )
+    dialog = Dialog(title=f"{title} (Esc to cancel)", body=text_area, buttons=[], with_background=True)
+    kb = KeyBindings()
+
+    def _cancel(event=None) -> None:
+        if process.poll() is None:
+            process.terminate()
+
+    kb.add("escape")(_cancel)
+    kb.add("q")(_cancel)
+
+    app = Application(
+        layout=Layout(dialog),
+        key_bindings=merge_key_bindings([GLOBAL_KEY_BINDINGS, DEFAULT_KEY_BINDINGS, kb]),
+        mouse_support=False,
+        style=DIALOG_STYLE,
+        full_screen=True,
     )
-    output = result.stdout.strip()
-    _message(title, output or "Done.")
+    refresh_pending = threading.Event()
+
+    def _refresh() -> None:
+        refresh_pending.clear()
+        text = "".join(list(lines)[-CLI_STREAM_TAIL_LINES:])
+        text_area.document = Document(text, len(text))
+
+    def _pump(loop: asyncio.AbstractEventLoop) -> None:
+        for line in process.stdout:
+            lines.append(line)
+            if not refresh_pending.is_set():
+                refresh_pending.set()
+                loop.call_soon_threadsafe(_refresh)
+        process.wait()
+
+    async def _run_action() -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, _pump, loop)
+        finally:
+            _safe_app_exit(app)
+
+    try:
+        app.run(pre_run=lambda: app.create_background_task(_run_action()))
+    finally:
+        if process.poll() is None:
+            process.terminate()
+        process.wait()
+        process.stdout.close()
+        _clear_screen()
+    return CommandResult(returncode=process.returncode, stdout="".join(lines))
+
+
+def _run_cli_output(args: list[str], title: str) -> int:
+    result = _run_cli_streaming(args, title)
+    if result.returncode == 0:
+        empty = "Done."
+    elif result.returncode < 0:
+        empty = "Cancelled."
+    else:
+        empty = f"Failed with exit code {result.returncode}."
+    _output_message(title, result.stdout, empty)
     return result.returncode
 
 
@@ -765,11 +1466,18 @@ def _read_wpa_defaults() -> tuple[str, str]:
     path = Path("/etc/wpa_supplicant/wpa_supplicant.conf")
     if not path.exists():
         return "", ""
-    content = path.read_text(encoding="utf-8")
-    ssid_match = re.search(r'\bssid="([^"]+)"', content)
-    country_match = re.search(r'^country=([A-Za-z]{2})', content, flags=re.MULTILINE)
-    ssid = ssid_match.group(1) if ssid_match else ""
-    country = country_match.group(1) if country_match else ""
+    with path.open(encoding="utf-8") as handle:
+        for line in handle:
+            if not ssid:
+                ssid_match = _WPA_SSID_RE.search(line)
+                if ssid_match:
+                    ssid = ssid_match.group(1)
+            if not country:
+                country_match = _WPA_COUNTRY_RE.match(line)
+                if country_match:
+                    country = country_match.group(1)
+            if ssid and country:
+                break
     return ssid, country
 
 
@@ -781,6 +1489,7 @@ def _wifi_form() -> tuple[str | None, str | None, str | None]:
         raise _QuickExit()
     except EOFError:
         return None, None, None
+    ssid = str(ssid or "").strip()
     if not ssid:
         return None, None, None
     try:
@@ -795,7 +1504,7 @@ def _wifi_form() -> tuple[str | None, str | None, str | None]:
         raise _QuickExit()
     except EOFError:
         return None, None, None
-    return str(ssid).strip(), str(psk or "").strip(), str(country or "").strip()
+    return ssid, str(psk or "").strip(), str(country or "").strip()
 
 
 def _wifi_scan_form() -> tuple[str | None, str | None, str | None]:
@@ -803,7 +1512,7 @@ def _wifi_scan_form() -> tuple[str | None, str | None, str | None]:
     config = load_config(path)
 
     def _select_scan_interface() -> str | None:
-        interfaces = list_wifi_interfaces()
+        interfaces = _wifi_interfaces()
         if not interfaces:
             _message("Wi-Fi scan", "No Wi-Fi adapter detected.")
             return None
@@ -823,7 +1532,7 @@ def _wifi_scan_form() -> tuple[str | None, str | None, str | None]:
     iface = config.networking.wifi_interface
     warning: str | None = None
     while True:
-        networks, error = scan_wifi_networks(iface)
+        networks, error = _run_with_status("Wi-Fi scan", "Scanning for networks...", lambda: scan_wifi_networks(iface))
         if not error:
             break
         if "Multiple Wi-Fi interfaces detected" in error or "Select one." in error or "not found" in error:
@@ -838,9 +1547,9 @@ def _wifi_scan_form() -> tuple[str | None, str | None, str | None]:
             if _yesno("Wi-Fi scan", "Wi-Fi is disabled. Enable Wi-Fi and scan?"):
                 config.networking.wifi_enabled = True
                 save_config(config, path)
-                result = wifi_state("up", interface=iface)
+                result = _run_with_status("Wi-Fi scan", "Enabling Wi-Fi...", lambda: wifi_state("up", interface=iface))
                 if result.returncode != 0:
-                    _message("Wi-Fi scan", result.stdout.strip() or "Failed to enable Wi-Fi.")
+                    _output_message("Wi-Fi scan", result.stdout, "Failed to enable Wi-Fi.")
                     return None, None, None
                 continue
             return None, None, None
@@ -848,9 +1557,9 @@ def _wifi_scan_form() -> tuple[str | None, str | None, str | None]:
             if _yesno("Wi-Fi scan", "Wi-Fi is disabled. Enable Wi-Fi and scan?"):
                 config.networking.wifi_enabled = True
                 save_config(config, path)
-                result = wifi_state("up", interface=iface)
+                result = _run_with_status("Wi-Fi scan", "Enabling Wi-Fi...", lambda: wifi_state("up", interface=iface))
                 if result.returncode != 0:
-                    _message("Wi-Fi scan", result.stdout.strip() or "Failed to enable Wi-Fi.")
+                    _output_message("Wi-Fi scan", result.stdout, "Failed to enable Wi-Fi.")
                     return None, None, None
                 continue
             return None, None, None
@@ -898,6 +1607,18 @@ def _wifi_scan_form() -> tuple[str | None, str | None, str | None]:
     return str(choice).strip(), str(psk or "").strip(), str(country or "").strip()
 
 
+def _store_wifi_network(config: Config, ssid: str, psk: str, country: str | None) -> None:
+    for network in config.networking.wifi:
+        if network.ssid == ssid:
+            network.psk = psk
+            break
+    else:
+        config.networking.wifi.append(WifiNetwork(ssid=ssid, psk=psk))
+    if country:
+        config.networking.country_code = country
+    config.networking.wifi_enabled = True
+
+
 def _networking_menu() -> None:
     def _set_selected_interface(kind: str, name: str | None) -> CommandResult:
         path = _config_path()
@@ -916,17 +1637,7 @@ def _networking_menu() -> None:
     def _update_wifi_config(ssid: str, psk: str, country: str | None) -> CommandResult:
         path = _config_path()
         config = load_config(path)
-        updated = False
-        for network in config.networking.wifi:
-            if network.ssid == ssid:
-                network.psk = psk
-                updated = True
-                break
-        if not updated:
-            config.networking.wifi.append(WifiNetwork(ssid=ssid, psk=psk))
-        if country:
-            config.networking.country_code = country
-        config.networking.wifi_enabled = True
+        _store_wifi_network(config, ssid, psk, country)
         save_config(config, path)
         return set_wifi_credentials(
             ssid,
@@ -949,22 +1660,14 @@ def _networking_menu() -> None:
         result = wifi_state("up" if enabled else "down", interface=config.networking.wifi_interface)
         state = "enabled" if enabled else "disabled"
         output = [f"Wi-Fi {state} in config."]
-        if result.stdout.strip():
-            output.append(result.stdout.strip())
+        _append_output(output, result)
         return CommandResult(returncode=result.returncode, stdout="\n".join(output))
 
     def _configure_wifi_ip() -> CommandResult:
         path = _config_path()
         config = load_config(path)
         default_mode = "static" if not config.networking.wifi_dhcp4 else "dhcp"
-        mode = _menu(
-            "Wi-Fi IP settings",
-            [
-                ("dhcp", "DHCP (automatic)"),
-                ("static", "Static IP"),
-            ],
-            default=default_mode,
-        )
+        mode = _menu("Wi-Fi IP settings", _WIFI_IP_ITEMS, default=default_mode)
         if mode is None:
             return CommandResult(returncode=0, stdout="Cancelled.")
 
@@ -980,7 +1683,6 @@ def _networking_menu() -> None:
                 value = _inputbox(title, prompt, default)
                 if value is None:
                     return None
-                value = value.strip()
                 if not value:
                     return ""
                 if _is_valid_ip(value):
@@ -992,7 +1694,6 @@ def _networking_menu() -> None:
                 value = _inputbox("Wi-Fi DNS", "DNS servers (comma-separated, optional):", default)
                 if value is None:
                     return None
-                value = value.strip()
                 if not value:
                     return []
                 servers = [part for part in re.split(r"[ ,]+", value) if part]
@@ -1111,62 +1812,25 @@ def _networking_menu() -> None:
         else:
             _run_with_status_message("Ethernet interface", lambda: _set_selected_interface("ethernet", choice))
 
-    def _service_exists(name: str) -> bool:
-        for base in ("/etc/systemd/system", "/lib/systemd/system", "/usr/lib/systemd/system"):
-            if Path(base, f"{name}.service").exists():
-                return True
-        return False
-
-    def _select_service(candidates: list[str]) -> str:
-        for candidate in candidates:
-            if _service_exists(candidate):
-                return candidate
-        return candidates[0]
-
-    def _service_menu(title: str, candidates: list[str], description: str) -> None:
+    def _service_menu(title: str, candidates: tuple[str, ...], description: str) -> None:
         service = _select_service(candidates)
         if description:
             _message(title, description)
         while True:
-            action = _menu(
-                title,
-                [
-                    ("1", "Status"),
-                    ("2", "Start"),
-                    ("3", "Stop"),
-                    ("4", "Restart"),
-                    ("5", "Enable"),
-                    ("6", "Disable"),
-                    ("7", "Back"),
-                ],
-            )
+            action = _menu(title, _SERVICE_MENU_ITEMS)
             if action in (None, "7"):
                 return
-            action_map = {
-                "1": "status",
-                "2": "start",
-                "3": "stop",
-                "4": "restart",
-                "5": "enable",
-                "6": "disable",
-            }
-            action_name = action_map.get(action)
+            action_name = _SERVICE_ACTIONS.get(action)
             if action_name:
                 _run_cli_output(["services", service, action_name], f"{title} {action_name}")
 
     def _identity_menu() -> None:
         while True:
-            action = _menu(
-                "Identity",
-                [
-                    ("1", "Set hostname"),
-                    ("2", "Back"),
-                ],
-            )
+            action = _menu("Identity", _IDENTITY_ITEMS)
             if action in (None, "2"):
                 return
             if action == "1":
-                hostname = _inputbox("Hostname", "Enter new hostname:", os.uname().nodename)
+                hostname = _inputbox("Hostname", "Enter new hostname:", _nodename())
                 if hostname:
                     path = _config_path()
                     config = load_config(path)
@@ -1177,41 +1841,23 @@ def _networking_menu() -> None:
                     if result.returncode != 0:
                         _message("Hostname", details or "Failed to set hostname.")
                     else:
+                        _nodename.cache_clear()
                         location = f"mpwrd-config is now reachable at\n{hostname}.local"
                         _message("Hostname", f"{details}\n\n{location}" if details else location)
 
     def _interfaces_menu() -> None:
         while True:
-            action = _menu(
-                "Interfaces",
-                [
-                    ("1", "Select Wi-Fi interface"),
-                    ("2", "Select ethernet interface"),
-                    ("3", "Back"),
-                ],
-            )
+            action = _menu("Interfaces", _INTERFACES_ITEMS)
             if action in (None, "3"):
                 return
             if action == "1":
-                _select_interface("wifi", list_wifi_interfaces())
+                _select_interface("wifi", _wifi_interfaces())
             elif action == "2":
-                _select_interface("ethernet", list_ethernet_interfaces())
+                _select_interface("ethernet", _ethernet_interfaces())
 
     def _wifi_settings_menu() -> None:
         while True:
-            action = _menu(
-                "Wi-Fi Settings",
-                [
-                    ("1", "Wi-Fi status"),
-                    ("2", "Connect to Wi-Fi"),
-                    ("3", "Configure Wi-Fi IP"),
-                    ("4", "Enable Wi-Fi"),
-                    ("5", "Disable Wi-Fi"),
-                    ("6", "Select Wi-Fi interface"),
-                    ("7", "Restart Wi-Fi"),
-                    ("8", "Back"),
-                ],
-            )
+            action = _menu("Wi-Fi Settings", _WIFI_SETTINGS_ITEMS)
             if action in (None, "8"):
                 return
             if action == "1":
@@ -1227,7 +1873,7 @@ def _networking_menu() -> None:
             elif action == "5":
                 _run_with_status_message("Wi-Fi", lambda: _set_wifi_enabled(False))
             elif action == "6":
-                _select_interface("wifi", list_wifi_interfaces())
+                _select_interface("wifi", _wifi_interfaces())
             elif action == "7":
                 if not _has_wifi_interface():
                     _message("Restart Wi-Fi", "No Wi-Fi adapter detected.\n\nIs a Wi-Fi adapter connected?")
@@ -1236,16 +1882,7 @@ def _networking_menu() -> None:
 
     def _diagnostics_menu() -> None:
         while True:
-            action = _menu(
-                "Networking Diagnostics",
-                [
-                    ("1", "Wi-Fi status"),
-                    ("2", "Show ethernet status"),
-                    ("3", "Show IP addresses"),
-                    ("4", "Test internet connection"),
-                    ("5", "Back"),
-                ],
-            )
+            action = _menu("Networking Diagnostics", _NETWORKING_DIAGNOSTICS_ITEMS)
             if action in (None, "5"):
                 return
             if action == "1":
@@ -1253,67 +1890,66 @@ def _networking_menu() -> None:
             elif action == "2":
                 _run_with_status_message("Ethernet status", _show_selected_ethernet_status)
             elif action == "3":
-                _run_with_status_message("IP addresses", ip_addresses)
+                _run_with_status_message("IP addresses", lambda: _cached_status("ip_addresses", ip_addresses))
             elif action == "4":
                 _run_with_status_message("Internet test", test_internet)
 
+    handlers: dict[str, Callable[[], None]] = {
+        "1": _identity_menu,
+        "2": _interfaces_menu,
+        "3": _wifi_settings_menu,
+        "4": _diagnostics_menu,
+    }
     while True:
-        choice = _menu(
-            "Networking",
-            [
-                ("1", "Identity"),
-                ("2", "Interfaces"),
-                ("3", "Wi-Fi Settings"),
-                ("4", "Diagnostics"),
-                ("5", "Back"),
-            ],
-        )
+        choice = _menu("Networking", _NETWORKING_ITEMS)
         if choice in (None, "5"):
             return
-        if choice == "1":
-            _identity_menu()
-        elif choice == "2":
-            _interfaces_menu()
-        elif choice == "3":
-            _wifi_settings_menu()
-        elif choice == "4":
-            _diagnostics_menu()
+        handler = handlers.get(choice)
+        if handler:
+            handler()
 
 
 def _meshtastic_full_settings_menu(
     session: MeshtasticSession | None = None,
     section: str = "all",
 ) -> None:
+    from mpwrd_config.meshtastic import (
+        channel_add,
+        channel_add_url,
+        channel_delete,
+        channel_disable,
+        channel_enable,
+        channel_set,
+        channel_set_url,
+        get_preference,
+        list_preference_fields,
+        meshtastic_config,
+        set_preference,
+    )
+    from mpwrd_config.software_manager import full_control_conflicts_stopped
+
     def _show(title: str, action: Callable[[], object]) -> None:
         result = _run_meshtastic_with_reconnect(session, title, action)
         if result is None:
             return
-        _message(title, result.stdout.strip() or "No output.")
+        _output_message(title, result.stdout, "No output.")
 
     def _prompt_index() -> int | None:
         value = _input_with_validation(
             "Channel index",
             "Enter channel index (0+):",
             "0",
-            lambda v: v.isdigit(),
+            lambda v: v.isdecimal(),
             "Enter a numeric channel index.",
         )
         if value is None:
             return None
         return int(value)
 
-    manage_full_control_conflicts("stop")
-    try:
+    with full_control_conflicts_stopped():
         while True:
             if section == "all":
-                choice = _menu(
-                    "Meshtastic Settings",
-                    [
-                        ("1", "Preferences"),
-                        ("2", "Channels"),
-                        ("3", "Back"),
-                    ],
-                )
+                choice = _menu("Meshtastic Settings", _MESHTASTIC_SETTINGS_ITEMS)
                 if choice in (None, "3"):
                     return
                 if choice == "1":
@@ -1323,16 +1959,7 @@ def _meshtastic_full_settings_menu(
                 continue
 
             if section == "preferences":
-                choice = _menu(
-                    "Meshtastic Preferences",
-                    [
-                        ("1", "Show preferences + modules"),
-                        ("2", "List preference fields"),
-                        ("3", "Get preference value"),
-                        ("4", "Set preference value"),
-                        ("5", "Back"),
-                    ],
-                )
+                choice = _menu("Meshtastic Preferences", _MESHTASTIC_PREFERENCES_ITEMS)
                 if choice in (None, "5"):
                     return
                 if choice == "1":
@@ -1351,20 +1978,7 @@ def _meshtastic_full_settings_menu(
                             _show("Set preference", lambda: set_preference(field, value, session=session))
                 continue
 
-            choice = _menu(
-                "Meshtastic Channels",
-                [
-                    ("1", "Show channels"),
-                    ("2", "Set channel field"),
-                    ("3", "Add channel"),
-                    ("4", "Delete channel"),
-                    ("5", "Enable channel"),
-                    ("6", "Disable channel"),
-                    ("7", "Set channels from URL"),
-                    ("8", "Add channels from URL"),
-                    ("9", "Back"),
-                ],
-            )
+            choice = _menu("Meshtastic Channels", _MESHTASTIC_CHANNELS_ITEMS)
             if choice in (None, "9"):
                 return
             if choice == "1":
@@ -1410,11 +2024,16 @@ def _meshtastic_full_settings_menu(
                 url = _inputbox("Add channels from URL", "Enter configuration URL:")
                 if url:
                     _show("Add channels from URL", lambda: channel_add_url(url, session=session))
-    finally:
-        manage_full_control_conflicts("start")
 
 
 def _meshtastic_repo_menu() -> None:
+    from mpwrd_config.meshtastic import (
+        meshtastic_repo_status,
+        set_meshtastic_repo,
+        uninstall as meshtastic_uninstall,
+        upgrade as meshtastic_upgrade,
+    )
+
     def _show_repo(
         title: str,
         action: Callable[[], object],
@@ -1428,39 +2047,20 @@ def _meshtastic_repo_menu() -> None:
             else:
                 _message(title, f"Command failed (exit {result.returncode}).")
             return
-        _message(title, result.stdout.strip() or empty)
+        _output_message(title, result.stdout, empty)
 
     while True:
-        choice = _menu(
-            "Meshtastic Repo",
-            [
-                ("1", "Show current repo"),
-                ("2", "Upgrade meshtasticd"),
-                ("3", "Install/Update repo (choose channel)"),
-                ("4", "Use beta repo (install/update)"),
-                ("5", "Use alpha repo (install/update)"),
-                ("6", "Use daily repo (install/update)"),
-                ("7", "Uninstall meshtasticd"),
-                ("8", "Back"),
-            ],
-        )
+        choice = _menu("Meshtastic Repo", _MESHTASTIC_REPO_ITEMS)
         if choice in (None, "8"):
             return
         if choice == "1":
-            _show_repo("Meshtastic Repo", meshtastic_repo_status)
+            _show_repo("Meshtastic Repo", lambda: _cached_status("meshtastic_repo", meshtastic_repo_status))
+            continue
         elif choice == "2":
             if _yesno("Upgrade", "Upgrade meshtasticd now?"):
                 _show_repo("Upgrade", lambda: meshtastic_upgrade(stream=True), "Done.", stream=True)
         elif choice == "3":
-            channel = _menu(
-                "Install/Update Repo",
-                [
-                    ("beta", "Beta"),
-                    ("alpha", "Alpha"),
-                    ("daily", "Daily"),
-                    ("back", "Back"),
-                ],
-            )
+            channel = _menu("Install/Update Repo", _MESHTASTIC_REPO_INSTALL_ITEMS)
             if channel in (None, "back"):
                 continue
             _show_repo("Meshtastic Repo", lambda: set_meshtastic_repo(channel, stream=True), stream=True)
@@ -1473,9 +2073,35 @@ def _meshtastic_repo_menu() -> None:
         elif choice == "7":
             if _yesno("Uninstall", "Uninstall meshtasticd?"):
                 _show_repo("Uninstall", lambda: meshtastic_uninstall(stream=True), "Done.", stream=True)
+        _STATUS_CACHE.pop("meshtastic_repo", None)
 
 
 def _meshtastic_menu(session: MeshtasticSession) -> None:
+    from mpwrd_config.meshtastic import (
+        add_admin_key,
+        clear_admin_keys,
+        config_qr,
+        get_legacy_admin_state,
+        get_private_key,
+        get_public_key,
+        list_admin_keys,
+        lora_settings,
+        mac_address_source,
+        mac_address_source_options,
+        meshtastic_info,
+        meshtastic_summary,
+        meshtastic_update,
+        mesh_test,
+        service_action as meshtastic_service_action,
+        service_enable as meshtastic_service_enable,
+        service_status as meshtastic_service_status,
+        set_config_url,
+        set_legacy_admin_state,
+        set_mac_address_source,
+        set_private_key,
+        set_public_key,
+    )
+
     def _run_meshtastic(action: Callable[[], object]) -> object | None:
         return _run_meshtastic_with_reconnect(session, "Meshtastic", action)
 
@@ -1483,23 +2109,11 @@ def _meshtastic_menu(session: MeshtasticSession) -> None:
         result = _run_meshtastic(action)
         if result is None:
             return
-        _message(title, result.stdout.strip() or empty)
+        _output_message(title, result.stdout, empty)
 
     def _meshtasticd_service_menu() -> None:
         while True:
-            action = _menu(
-                "Meshtastic Service",
-                [
-                    ("1", "Status"),
-                    ("2", "Start"),
-                    ("3", "Stop"),
-                    ("4", "Restart"),
-                    ("5", "Enable"),
-                    ("6", "Disable"),
-                    ("7", "MAC address source"),
-                    ("8", "Back"),
-                ],
-            )
+            action = _menu("Meshtastic Service", _MESHTASTICD_SERVICE_ITEMS)
             if action in (None, "8"):
                 return
             if action == "1":
@@ -1519,43 +2133,16 @@ def _meshtastic_menu(session: MeshtasticSession) -> None:
 
     def _avahi_service_menu() -> None:
         while True:
-            action = _menu(
-                "Avahi service",
-                [
-                    ("1", "Status"),
-                    ("2", "Start"),
-                    ("3", "Stop"),
-                    ("4", "Restart"),
-                    ("5", "Enable"),
-                    ("6", "Disable"),
-                    ("7", "Back"),
-                ],
-            )
+            action = _menu("Avahi service", _SERVICE_MENU_ITEMS)
             if action in (None, "7"):
                 return
-            action_map = {
-                "1": "status",
-                "2": "start",
-                "3": "stop",
-                "4": "restart",
-                "5": "enable",
-                "6": "disable",
-            }
-            action_name = action_map.get(action)
+            action_name = _SERVICE_ACTIONS.get(action)
             if action_name:
                 _run_cli_output(["services", "avahi-daemon", action_name], f"avahi-daemon {action_name}")
 
     def _meshtastic_services_menu() -> None:
         while True:
-            action = _menu(
-                "Meshtastic services",
-                [
-                    ("1", "meshtasticd service"),
-                    ("2", "avahi"),
-                    ("3", "Admin mesh client Wi-Fi toggle"),
-                    ("4", "Back"),
-                ],
-            )
+            action = _menu("Meshtastic services", _MESHTASTIC_SERVICES_ITEMS)
             if action in (None, "4"):
                 return
             if action == "1":
@@ -1566,14 +2153,18 @@ def _meshtastic_menu(session: MeshtasticSession) -> None:
                 _wifi_mesh_menu()
 
     def _mac_source_menu() -> None:
-        result = _run_with_status("MAC Address Source", "Working...", mac_address_source)
+        result = _run_with_status(
+            "MAC Address Source",
+            "Working...",
+            lambda: _cached_status("mac_address_source", mac_address_source),
+        )
         current = result.stdout.strip() if hasattr(result, "stdout") else ""
         if getattr(result, "returncode", 1) != 0:
             current = ""
         options = mac_address_source_options()
         option_keys = {value for value, _ in options}
         if current and current not in option_keys:
-            if re.fullmatch(r"(?i)([0-9a-f]{2}:){5}[0-9a-f]{2}", current):
+            if _MAC_ADDRESS_RE.fullmatch(current):
                 _message(
                     "MAC Address Source",
                     "An explicit MAC address is configured:\n"
@@ -1593,25 +2184,12 @@ def _meshtastic_menu(session: MeshtasticSession) -> None:
         choice = _menu("MAC Address Source", options, default=current if current in option_keys else None)
         if not choice or choice == "back":
             return
+        _STATUS_CACHE.pop("mac_address_source", None)
         _show_result("MAC Address Source", lambda: set_mac_address_source(choice), "Done.")
 
     def _keys_menu() -> None:
         while True:
-            action = _menu(
-                "Meshtastic Keys",
-                [
-                    ("1", "Show public key"),
-                    ("2", "Set public key"),
-                    ("3", "Show private key"),
-                    ("4", "Set private key"),
-                    ("5", "List admin keys"),
-                    ("6", "Add admin key"),
-                    ("7", "Clear admin keys"),
-                    ("8", "Legacy admin status"),
-                    ("9", "Set legacy admin"),
-                    ("10", "Back"),
-                ],
-            )
+            action = _menu("Meshtastic Keys", _MESHTASTIC_KEYS_ITEMS)
             if action in (None, "10"):
                 return
             if action == "1":
@@ -1638,19 +2216,13 @@ def _meshtastic_menu(session: MeshtasticSession) -> None:
             elif action == "8":
                 _show_result("Legacy admin", lambda: get_legacy_admin_state(session=session))
             elif action == "9":
-                state = _menu("Legacy admin", [("true", "Enable"), ("false", "Disable"), ("back", "Back")])
+                state = _menu("Legacy admin", _LEGACY_ADMIN_ITEMS)
                 if state and state != "back":
                     _show_result("Legacy admin", lambda: set_legacy_admin_state(state == "true", session=session), "Done.")
 
     def _advanced_menu() -> None:
         while True:
-            action = _menu(
-                "Meshtastic Advanced",
-                [
-                    ("1", "Run custom Meshtastic command"),
-                    ("2", "Back"),
-                ],
-            )
+            action = _menu("Meshtastic Advanced", _MESHTASTIC_ADVANCED_ITEMS)
             if action in (None, "2"):
                 return
             if action == "1":
@@ -1664,14 +2236,7 @@ def _meshtastic_menu(session: MeshtasticSession) -> None:
 
     def _overview_menu() -> None:
         while True:
-            action = _menu(
-                "Meshtastic Overview",
-                [
-                    ("1", "Show node summary"),
-                    ("2", "Show node info"),
-                    ("3", "Back"),
-                ],
-            )
+            action = _menu("Meshtastic Overview", _MESHTASTIC_OVERVIEW_ITEMS)
             if action in (None, "3"):
                 return
             if action == "1":
@@ -1681,14 +2246,7 @@ def _meshtastic_menu(session: MeshtasticSession) -> None:
 
     def _url_menu() -> None:
         while True:
-            action = _menu(
-                "Meshtastic URL",
-                [
-                    ("1", "Show config URL + QR"),
-                    ("2", "Set config URL"),
-                    ("3", "Back"),
-                ],
-            )
+            action = _menu("Meshtastic URL", _MESHTASTIC_URL_ITEMS)
             if action in (None, "3"):
                 return
             if action == "1":
@@ -1703,14 +2261,7 @@ def _meshtastic_menu(session: MeshtasticSession) -> None:
 
     def _diagnostics_menu() -> None:
         while True:
-            action = _menu(
-                "Meshtastic Diagnostics",
-                [
-                    ("1", "Show LoRa settings"),
-                    ("2", "Mesh connectivity test"),
-                    ("3", "Back"),
-                ],
-            )
+            action = _menu("Meshtastic Diagnostics", _MESHTASTIC_DIAGNOSTICS_ITEMS)
             if action in (None, "3"):
                 return
             if action == "1":
@@ -1719,62 +2270,52 @@ def _meshtastic_menu(session: MeshtasticSession) -> None:
                     continue
                 result, settings = payload
                 if result.returncode != 0:
-                    _message("LoRa settings", result.stdout.strip() or "Unable to query Meshtastic.")
+                    _output_message("LoRa settings", result.stdout, "Unable to query Meshtastic.")
                 else:
                     body = "\n".join(f"{key}:{value}" for key, value in settings.items())
                     _message("LoRa settings", body or "No output.")
             elif action == "2":
                 _show_result("Mesh test", lambda: mesh_test(session=session))
 
+    handlers: dict[str, Callable[[], None]] = {
+        "1": _overview_menu,
+        "2": _url_menu,
+        "3": lambda: _meshtastic_full_settings_menu(session=session, section="channels"),
+        "4": lambda: _meshtastic_lora_menu(session=session),
+        "5": lambda: _meshtastic_full_settings_menu(session=session, section="preferences"),
+        "6": _keys_menu,
+        "7": _meshtastic_services_menu,
+        "8": _meshtastic_repo_menu,
+        "9": _diagnostics_menu,
+        "10": _advanced_menu,
+    }
     while True:
-        choice = _menu(
-            "Meshtastic",
-            [
-                ("1", "Meshtastic overview"),
-                ("2", "URL"),
-                ("3", "Channels"),
-                ("4", "LoRa configuration"),
-                ("5", "Preferences"),
-                ("6", "Keys & admin"),
-                ("7", "Meshtastic services"),
-                ("8", "Meshtastic repository"),
-                ("9", "Diagnostics"),
-                ("10", "Advanced"),
-                ("11", "Back"),
-            ],
-        )
+        choice = _menu("Meshtastic", _MESHTASTIC_ITEMS)
         if choice in (None, "11"):
             return
-        if choice == "1":
-            _overview_menu()
-        elif choice == "2":
-            _url_menu()
-        elif choice == "3":
-            _meshtastic_full_settings_menu(session=session, section="channels")
-        elif choice == "4":
-            _meshtastic_lora_menu(session=session)
-        elif choice == "5":
-            _meshtastic_full_settings_menu(session=session, section="preferences")
-        elif choice == "6":
-            _keys_menu()
-        elif choice == "7":
-            _meshtastic_services_menu()
-        elif choice == "8":
-            _meshtastic_repo_menu()
-        elif choice == "9":
-            _diagnostics_menu()
-        elif choice == "10":
-            _advanced_menu()
+        handler = handlers.get(choice)
+        if handler:
+            handler()
+
+
+def _valid_frequency_offset(value: str) -> bool:
+    return _FREQUENCY_OFFSET_RE.fullmatch(value) is not None and float(value) <= 1000000
+
+
+def _merge_lora_settings(current: dict[str, Any], settings: dict[str, str]) -> None:
+    current.update({_LORA_SETTING_KEYS[key]: value for key, value in settings.items() if key in _LORA_SETTING_KEYS})
 
 
-def _bool_prompt(title: str, prompt: str, current: str | None) -> str | None:
+def _bool_prompt(title: str, prompt: str, current: str | None) -> str | object | None:
     default = None
     if isinstance(current, str):
         if current.lower() in {"true", "false"}:
             default = current.lower()
-    choice = _menu(title, [("true", "True"), ("false", "False"), ("skip", "Cancel")], default=default)
+    choice = _menu(title, _BOOL_ITEMS, default=default)
     if choice in (None, "skip"):
         return None
+    if choice == default:
+        return _UNCHANGED
     return choice
 
 
@@ -1788,19 +2329,171 @@ def _input_with_validation(title: str, prompt: str, default: str, validator, err
         _message(title, error)
 
 
+def _lora_menu_field(
+    title: str,
+    items: Sequence[tuple[str, str]],
+    fallback: str | None = None,
+) -> Callable[[Any], str | None]:
+    def prompt(value: Any) -> str | None:
+        return _menu(title, items, default=str(value if fallback is None else value or fallback))
+
+    return prompt
+
+
+def _lora_bool_field(title: str, prompt: str) -> Callable[[Any], str | object | None]:
+    return lambda value: _bool_prompt(title, prompt, str(value))
+
+
+def _lora_input_field(spec: tuple[str, str, str, Callable[[str], Any], str]) -> Callable[[Any], str | None]:
+    title, prompt, fallback, validator, error = spec
+    return lambda value: _input_with_validation(title, prompt, str(value or fallback), validator, error)
+
+
+_LORA_INPUT_FIELDS: Mapping[str, tuple[str, str, str, Callable[[str], Any], str]] = MappingProxyType(
+    {
+        "frequency_offset": (
+            "Frequency offset",
+            "Frequency offset (0-1000000):",
+            "0",
+            _valid_frequency_offset,
+            "Must be between 0 and 1000000.",
+        ),
+        "hop_limit": (
+            "Hop limit",
+            "Hop limit (0-7):",
+            "3",
+            lambda v: v.isdecimal() and int(v) <= 7,
+            "Must be an integer between 0 and 7.",
+        ),
+        "tx_power": (
+            "TX power",
+            "TX power (0-30):",
+            "0",
+            lambda v: v.isdecimal() and int(v) <= 30,
+            "Must be an integer between 0 and 30.",
+        ),
+        "channel_num": (
+            "Frequency slot",
+            "Frequency slot (0+):",
+            "0",
+            lambda v: v.isdecimal(),
+            "Must be an integer 0 or higher.",
+        ),
+        "override_frequency": (
+            "Override frequency",
+            "Override frequency (MHz, 0+):",
+            "0",
+            _FREQUENCY_RE.fullmatch,
+            "Must be a number 0 or higher.",
+        ),
+    }
+)
+
+_LORA_FIELD_PROMPTS: Mapping[str, Callable[[Any], str | object | None]] = MappingProxyType(
+    {
+        "region": _lora_menu_field("Region", _LORA_REGION_ITEMS, "UNSET"),
+        "use_preset": _lora_bool_field("Use modem preset", "Use preset?"),
+        "modem_preset": _lora_menu_field("Preset", _LORA_PRESET_ITEMS),
+        "bandwidth": _lora_menu_field("Bandwidth", _LORA_BANDWIDTH_ITEMS),
+        "spread_factor": _lora_menu_field("Spread factor", _LORA_SPREAD_FACTOR_ITEMS),
+        "coding_rate": _lora_menu_field("Coding rate", _LORA_CODING_RATE_ITEMS),
+        "frequency_offset": _lora_input_field(_LORA_INPUT_FIELDS["frequency_offset"]),
+        "hop_limit": _lora_input_field(_LORA_INPUT_FIELDS["hop_limit"]),
+        "tx_enabled": _lora_bool_field("TX enabled", "Enable TX?"),
+        "tx_power": _lora_input_field(_LORA_INPUT_FIELDS["tx_power"]),
+        "channel_num": _lora_input_field(_LORA_INPUT_FIELDS["channel_num"]),
+        "override_duty_cycle": _lora_bool_field("Override duty cycle", "Override duty cycle?"),
+        "sx126x_rx_boosted_gain": _lora_bool_field("SX126X RX boosted gain", "Enable SX126X RX boosted gain?"),
+        "override_frequency": _lora_input_field(_LORA_INPUT_FIELDS["override_frequency"]),
+        "ignore_mqtt": _lora_bool_field("Ignore MQTT", "Ignore MQTT?"),
+        "config_ok_to_mqtt": _lora_bool_field("OK to MQTT", "OK to MQTT?"),
+    }
+)
+
+_LORA_MENU_FIELDS: Mapping[str, str] = MappingProxyType(
+    {
+        "4": "region",
+        "5": "use_preset",
+        "6": "modem_preset",
+        "7": "bandwidth",
+        "8": "spread_factor",
+        "9": "coding_rate",
+        "10": "frequency_offset",
+        "11": "hop_limit",
+        "12": "tx_enabled",
+        "13": "tx_power",
+        "14": "channel_num",
+        "15": "override_duty_cycle",
+        "16": "sx126x_rx_boosted_gain",
+        "17": "override_frequency",
+        "18": "ignore_mqtt",
+        "19": "config_ok_to_mqtt",
+    }
+)
+
+_LORA_WIZARD_MODEM_FIELDS = ("bandwidth", "spread_factor", "coding_rate")
+_LORA_WIZARD_INPUT_FIELDS = ("frequency_offset", "hop_limit", "tx_power", "channel_num", "override_frequency")
+_LORA_WIZARD_BOOL_FIELDS = (
+    "tx_enabled",
+    "override_duty_cycle",
+    "sx126x_rx_boosted_gain",
+    "ignore_mqtt",
+    "config_ok_to_mqtt",
+)
+
+
+def _prompt_lora_field(key: str, current: Mapping[str, Any]) -> str | object | None:
+    return _LORA_FIELD_PROMPTS[key](current.get(_LORA_SETTING_KEYS[key]))
+
+
 def _meshtastic_lora_menu(session: MeshtasticSession | None = None) -> None:
+    from mpwrd_config.meshtastic import (
+        config_qr,
+        current_radio,
+        lora_settings,
+        set_config_url,
+        set_lora_settings,
+        set_radio,
+    )
+
     def _run_lora(action: Callable[[], object]) -> object | None:
         return _run_meshtastic_with_reconnect(session, "LoRa settings", action)
 
+    def _load_context() -> tuple[Any, dict[str, Any], Any]:
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            radio_future = pool.submit(current_radio)
+            result, discovered = lora_settings(session=session)
+            return result, discovered, radio_future.result()
+
     current: dict[str, Any] = {}
-    initial = _run_lora(lambda: lora_settings(session=session))
+    radio_model: str | None = None
+    initial = _run_lora(_load_context)
     connected = False
     if initial is not None:
-        result, discovered = initial
+        result, discovered, radio = initial
+        radio_model = radio.stdout.strip()
         if result.returncode == 0:
             current = discovered
             connected = True
 
+    def _radio_model() -> str:
+        nonlocal radio_model
+        if radio_model is None:
+            radio_model = _run_with_status("LoRa radio", "Working...", lambda: current_radio().stdout.strip())
+        return radio_model
+
+    pending: dict[str, str] = {}
+
+    def flush() -> None:
+        if not pending:
+            return
+        count = len(pending)
+        if not _yesno("LoRa settings", f"Apply {count} pending change{'s' if count != 1 else ''}?"):
+            return
+        settings = dict(pending)
+        pending.clear()
+        apply(settings, "LoRa settings")
+
     def apply(settings: dict[str, str], title: str) -> None:
         nonlocal current
         if not settings:
@@ -1808,38 +2501,27 @@ def _meshtastic_lora_menu(session: MeshtasticSession | None = None) -> None:
         response = _run_lora(lambda: set_lora_settings(settings, session=session))
         if response is None:
             return
-        _message(title, response.stdout.strip() or "Done.")
-        if response.returncode == 0:
-            refreshed_payload = _run_lora(lambda: lora_settings(session=session))
-            if refreshed_payload is not None:
-                refreshed, updated = refreshed_payload
-                if refreshed.returncode == 0:
-                    current = updated
+        _output_message(title, response.stdout, "Done.")
+        if response.returncode == 0 and os.getenv("MPWRD_FORCE_REFRESH") != "1":
+            _merge_lora_settings(current, settings)
+            return
+        refreshed_payload = _run_lora(lambda: lora_settings(session=session))
+        if refreshed_payload is not None:
+            refreshed, updated = refreshed_payload
+            if refreshed.returncode == 0:
+                current = updated
 
     def select_radio() -> None:
-        current_model = _run_with_status(
-            "LoRa radio",
-            "Working...",
-            lambda: current_radio().stdout.strip(),
-        )
-        options = [
-            ("lr1121_tcxo", "LR1121 TCXO"),
-            ("sx1262_tcxo", "SX1262 TCXO (Ebyte e22-900m30s / Heltec ht-ra62 / Seeed wio-sx1262)"),
-            ("sx1262_xtal", "SX1262 XTAL (Ebyte e80-900m22s / Waveshare / AI Thinker ra-01sh)"),
-            ("lora-meshstick-1262", "LoRa Meshstick 1262 (USB)"),
-            ("sim", "Simulated radio (software)"),
-            ("none", "Auto-detect (no forced profile)"),
-        ]
-        model = _menu(
-            "LoRa radio",
-            options,
-            default=current_model if current_model in {opt[0] for opt in options} else None,
-        )
+        nonlocal radio_model
+        current_model = _radio_model()
+        model = _menu("LoRa radio", _RADIO_OPTIONS, default=current_model if current_model in _RADIO_KEYS else None)
         if model:
             response = _run_lora(lambda: set_radio(model))
             if response is None:
                 return
-            _message("LoRa radio", response.stdout.strip() or "Done.")
+            if response.returncode == 0:
+                radio_model = model
+            _output_message("LoRa radio", response.stdout, "Done.")
 
     if not connected:
         _message(
@@ -1849,13 +2531,7 @@ def _meshtastic_lora_menu(session: MeshtasticSession | None = None) -> None:
             "Other LoRa settings require a live Meshtastic connection.",
         )
         while True:
-            choice = _menu(
-                "LoRa settings",
-                [
-                    ("1", "Set LoRa radio model"),
-                    ("2", "Back"),
-                ],
-            )
+            choice = _menu("LoRa settings", _LORA_OFFLINE_ITEMS)
             if choice in (None, "2"):
                 return
             if choice == "1":
@@ -1875,7 +2551,7 @@ def _meshtastic_lora_menu(session: MeshtasticSession | None = None) -> None:
         response = _run_lora(lambda: set_config_url(url, session=session))
         if response is None:
             return False
-        _message("Meshtastic URL", response.stdout.strip() or "URL updated.")
+        _output_message("Meshtastic URL", response.stdout, "URL updated.")
         refreshed_payload = _run_lora(lambda: lora_settings(session=session))
         if refreshed_payload is not None:
             refreshed, updated = refreshed_payload
@@ -1883,326 +2559,105 @@ def _meshtastic_lora_menu(session: MeshtasticSession | None = None) -> None:
                 current = updated
         return True
 
-    while True:
-        choice = _menu(
-            "LoRa settings",
-            [
-                ("1", "Wizard (set all)"),
-                ("2", "Set LoRa radio model"),
-                ("3", "Configure with URL"),
-                ("4", "Region"),
-                ("5", "Use modem preset"),
-                ("6", "Preset"),
-                ("7", "Bandwidth"),
-                ("8", "Spread factor"),
-                ("9", "Coding rate"),
-                ("10", "Frequency offset"),
-                ("11", "Hop limit"),
-                ("12", "Enable/disable TX"),
-                ("13", "TX power"),
-                ("14", "Frequency slot"),
-                ("15", "Override duty cycle"),
-                ("16", "SX126X RX boosted gain"),
-                ("17", "Override frequency"),
-                ("18", "Ignore MQTT"),
-                ("19", "OK to MQTT"),
-                ("20", "Show current LoRa settings"),
-                ("21", "Show config URL + QR"),
-                ("22", "Back"),
-            ],
-        )
-        if choice in (None, "22"):
-            return
-        if choice == "1":
-            current_radio_value = _run_with_status(
-                "LoRa wizard",
-                "Working...",
-                lambda: current_radio().stdout.strip(),
-            )
-            if _yesno(
-                "LoRa wizard",
-                f"Current radio: {current_radio_value}\n\nSet radio model?",
-            ):
-                select_radio()
-            method = _menu(
-                "Meshtastic configuration method",
-                [
-                    ("url", "Automatic configuration with URL"),
-                    ("manual", "Manual configuration"),
-                    ("cancel", "Cancel"),
-                ],
-                default="manual",
-            )
-            if method in (None, "cancel"):
-                continue
-            if method == "url":
-                config_url_prompt()
-                refreshed_payload = _run_lora(lambda: lora_settings(session=session))
-                if refreshed_payload is not None:
-                    refreshed, updated = refreshed_payload
-                    if refreshed.returncode == 0:
-                        current = updated
-                continue
-            _meshtastic_lora_wizard(current, session=session)
-        elif choice == "2":
+    def run_wizard() -> None:
+        current_radio_value = _radio_model()
+        if _yesno(
+            "LoRa wizard",
+            f"Current radio: {current_radio_value}\n\nSet radio model?",
+        ):
             select_radio()
-        elif choice == "3":
+        method = _menu("Meshtastic configuration method", _LORA_CONFIG_METHOD_ITEMS, default="manual")
+        if method in (None, "cancel"):
+            return
+        if method == "url":
             config_url_prompt()
-        elif choice == "4":
-            regions = [
-                "UNSET",
-                "US",
-                "EU_433",
-                "EU_868",
-                "CN",
-                "JP",
-                "ANZ",
-                "KR",
-                "TW",
-                "RU",
-                "IN",
-                "NZ_865",
-                "TH",
-                "LORA_24",
-                "UA_433",
-                "UA_868",
-                "MY_433",
-                "MY_919",
-                "SG_923",
-            ]
-            region = _menu("Region", [(value, value) for value in regions], default=str(current.get("lora_region") or "UNSET"))
-            if region:
-                apply({"region": region}, "Region")
-        elif choice == "5":
-            value = _bool_prompt("Use modem preset", "Use preset?", str(current.get("lora_usePreset")))
-            if value is not None:
-                apply({"use_preset": value}, "Use modem preset")
-        elif choice == "6":
-            presets = [
-                "LONG_FAST",
-                "LONG_SLOW",
-                "VERY_LONG_SLOW",
-                "MEDIUM_SLOW",
-                "MEDIUM_FAST",
-                "SHORT_SLOW",
-                "SHORT_FAST",
-                "SHORT_TURBO",
-            ]
-            preset = _menu("Preset", [(value, value) for value in presets], default=str(current.get("lora_modemPreset")))
-            if preset:
-                apply({"modem_preset": preset}, "Preset")
-        elif choice == "7":
-            bandwidth = _menu(
-                "Bandwidth",
-                [(value, value) for value in ["0", "31", "62", "125", "250", "500"]],
-                default=str(current.get("lora_bandwidth")),
-            )
-            if bandwidth:
-                apply({"bandwidth": bandwidth}, "Bandwidth")
-        elif choice == "8":
-            spread = _menu(
-                "Spread factor",
-                [(value, value) for value in ["0", "7", "8", "9", "10", "11", "12"]],
-                default=str(current.get("lora_spreadFactor")),
-            )
-            if spread:
-                apply({"spread_factor": spread}, "Spread factor")
-        elif choice == "9":
-            coding = _menu(
-                "Coding rate",
-                [(value, value) for value in ["0", "5", "6", "7", "8"]],
-                default=str(current.get("lora_codingRate")),
-            )
-            if coding:
-                apply({"coding_rate": coding}, "Coding rate")
-        elif choice == "10":
-            value = _input_with_validation(
-                "Frequency offset",
-                "Frequency offset (0-1000000):",
-                str(current.get("lora_frequencyOffset") or "0"),
-                lambda v: re.fullmatch(r"[0-9]{1,7}(\\.[0-9]+)?", v) is not None and float(v) <= 1000000,
-                "Must be between 0 and 1000000.",
-            )
-            if value:
-                apply({"frequency_offset": value}, "Frequency offset")
-        elif choice == "11":
-            value = _input_with_validation(
-                "Hop limit",
-                "Hop limit (0-7):",
-                str(current.get("lora_hopLimit") or "3"),
-                lambda v: v.isdigit() and 0 <= int(v) <= 7,
-                "Must be an integer between 0 and 7.",
-            )
-            if value:
-                apply({"hop_limit": value}, "Hop limit")
-        elif choice == "12":
-            value = _bool_prompt("TX enabled", "Enable TX?", str(current.get("lora_txEnabled")))
-            if value is not None:
-                apply({"tx_enabled": value}, "TX enabled")
-        elif choice == "13":
-            value = _input_with_validation(
-                "TX power",
-                "TX power (0-30):",
-                str(current.get("lora_txPower") or "0"),
-                lambda v: v.isdigit() and 0 <= int(v) <= 30,
-                "Must be an integer between 0 and 30.",
-            )
-            if value:
-                apply({"tx_power": value}, "TX power")
-        elif choice == "14":
-            value = _input_with_validation(
-                "Frequency slot",
-                "Frequency slot (0+):",
-                str(current.get("lora_channelNum") or "0"),
-                lambda v: v.isdigit() and int(v) >= 0,
-                "Must be an integer 0 or higher.",
-            )
-            if value:
-                apply({"channel_num": value}, "Frequency slot")
-        elif choice == "15":
-            value = _bool_prompt("Override duty cycle", "Override duty cycle?", str(current.get("lora_overrideDutyCycle")))
-            if value is not None:
-                apply({"override_duty_cycle": value}, "Override duty cycle")
-        elif choice == "16":
-            value = _bool_prompt(
-                "SX126X RX boosted gain",
-                "Enable SX126X RX boosted gain?",
-                str(current.get("lora_sx126xRxBoostedGain")),
-            )
-            if value is not None:
-                apply({"sx126x_rx_boosted_gain": value}, "SX126X RX boosted gain")
-        elif choice == "17":
-            value = _input_with_validation(
-                "Override frequency",
-                "Override frequency (MHz, 0+):",
-                str(current.get("lora_overrideFrequency") or "0"),
-                lambda v: re.fullmatch(r"[0-9]+(\\.[0-9]+)?", v) is not None,
-                "Must be a number 0 or higher.",
-            )
-            if value:
-                apply({"override_frequency": value}, "Override frequency")
-        elif choice == "18":
-            value = _bool_prompt("Ignore MQTT", "Ignore MQTT?", str(current.get("lora_ignoreMqtt")))
-            if value is not None:
-                apply({"ignore_mqtt": value}, "Ignore MQTT")
-        elif choice == "19":
-            value = _bool_prompt("OK to MQTT", "OK to MQTT?", str(current.get("lora_configOkToMqtt")))
-            if value is not None:
-                apply({"config_ok_to_mqtt": value}, "OK to MQTT")
-        elif choice == "20":
-            payload = _run_lora(lambda: lora_settings(session=session))
-            if payload is None:
-                continue
-            result, settings = payload
-            if result.returncode != 0:
-                _message("LoRa settings", result.stdout.strip() or "Unable to query Meshtastic.")
-            else:
-                body = "\n".join(f"{key}:{value}" for key, value in settings.items())
-                _message("LoRa settings", body or "No output.")
-        elif choice == "21":
-            result = _run_lora(lambda: config_qr(session=session))
-            if result is None:
+            return
+        _meshtastic_lora_wizard(current, session=session)
+
+    def show_settings() -> None:
+        payload = _run_lora(lambda: lora_settings(session=session))
+        if payload is None:
+            return
+        result, settings = payload
+        if result.returncode != 0:
+            _output_message("LoRa settings", result.stdout, "Unable to query Meshtastic.")
+        else:
+            body = "\n".join(f"{key}:{value}" for key, value in settings.items())
+            _message("LoRa settings", body or "No output.")
+
+    def show_config_url() -> None:
+        result = _run_lora(lambda: config_qr(session=session))
+        if result is None:
+            return
+        _output_message("LoRa config URL", result.stdout, "No output.")
+
+    handlers: dict[str, Callable[[], object]] = {
+        "1": run_wizard,
+        "2": select_radio,
+        "3": config_url_prompt,
+        "20": show_settings,
+        "21": show_config_url,
+    }
+
+    try:
+        while True:
+            title = f"LoRa settings ({len(pending)} pending)" if pending else "LoRa settings"
+            choice = _menu(title, _LORA_MENU_ITEMS)
+            if choice in (None, "22"):
+                return
+            field = _LORA_MENU_FIELDS.get(choice)
+            if field:
+                staged = dict(current)
+                _merge_lora_settings(staged, pending)
+                value = _prompt_lora_field(field, staged)
+                if value and value is not _UNCHANGED:
+                    pending[field] = value
                 continue
-            _message("LoRa config URL", result.stdout.strip() or "No output.")
+            handler = handlers.get(choice)
+            if handler:
+                flush()
+                handler()
+    finally:
+        flush()
 
 
 def _meshtastic_lora_wizard(
     current: dict[str, Any],
     session: MeshtasticSession | None = None,
 ) -> None:
+    from mpwrd_config.meshtastic import set_lora_settings
+
     settings: dict[str, str] = {}
-    region = _menu(
-        "Region",
-        [(value, value) for value in ["UNSET", "US", "EU_433", "EU_868", "CN", "JP", "ANZ", "KR", "TW", "RU", "IN", "NZ_865", "TH", "LORA_24", "UA_433", "UA_868", "MY_433", "MY_919", "SG_923"]],
-        default=str(current.get("lora_region")),
-    )
-    if region:
-        settings["region"] = region
-    use_preset = _bool_prompt("Use modem preset", "Use preset?", str(current.get("lora_usePreset")))
-    if use_preset is not None:
-        settings["use_preset"] = use_preset
+
+    def ask(key: str) -> str | None:
+        value = _prompt_lora_field(key, current)
+        if value is _UNCHANGED:
+            return str(current.get(_LORA_SETTING_KEYS[key])).lower()
+        if value:
+            settings[key] = value
+        return value
+
+    ask("region")
+    use_preset = ask("use_preset")
     if use_preset == "true":
-        preset = _menu(
-            "Preset",
-            [(value, value) for value in ["LONG_FAST", "LONG_SLOW", "VERY_LONG_SLOW", "MEDIUM_SLOW", "MEDIUM_FAST", "SHORT_SLOW", "SHORT_FAST", "SHORT_TURBO"]],
-            default=str(current.get("lora_modemPreset")),
-        )
-        if preset:
-            settings["modem_preset"] = preset
+        ask("modem_preset")
     elif use_preset == "false":
-        bandwidth = _menu("Bandwidth", [(value, value) for value in ["0", "31", "62", "125", "250", "500"]], default=str(current.get("lora_bandwidth")))
-        if bandwidth:
-            settings["bandwidth"] = bandwidth
-        spread = _menu("Spread factor", [(value, value) for value in ["0", "7", "8", "9", "10", "11", "12"]], default=str(current.get("lora_spreadFactor")))
-        if spread:
-            settings["spread_factor"] = spread
-        coding = _menu("Coding rate", [(value, value) for value in ["0", "5", "6", "7", "8"]], default=str(current.get("lora_codingRate")))
-        if coding:
-            settings["coding_rate"] = coding
-    freq_offset = _input_with_validation(
-        "Frequency offset",
-        "Frequency offset (0-1000000):",
-        str(current.get("lora_frequencyOffset") or "0"),
-        lambda v: re.fullmatch(r"[0-9]{1,7}(\\.[0-9]+)?", v) is not None and float(v) <= 1000000,
-        "Must be between 0 and 1000000.",
-    )
-    if freq_offset:
-        settings["frequency_offset"] = freq_offset
-    hop_limit = _input_with_validation(
-        "Hop limit",
-        "Hop limit (0-7):",
-        str(current.get("lora_hopLimit") or "3"),
-        lambda v: v.isdigit() and 0 <= int(v) <= 7,
-        "Must be an integer between 0 and 7.",
-    )
-    if hop_limit:
-        settings["hop_limit"] = hop_limit
-    tx_enabled = _bool_prompt("TX enabled", "Enable TX?", str(current.get("lora_txEnabled")))
-    if tx_enabled is not None:
-        settings["tx_enabled"] = tx_enabled
-    tx_power = _input_with_validation(
-        "TX power",
-        "TX power (0-30):",
-        str(current.get("lora_txPower") or "0"),
-        lambda v: v.isdigit() and 0 <= int(v) <= 30,
-        "Must be an integer between 0 and 30.",
-    )
-    if tx_power:
-        settings["tx_power"] = tx_power
-    channel_num = _input_with_validation(
-        "Frequency slot",
-        "Frequency slot (0+):",
-        str(current.get("lora_channelNum") or "0"),
-        lambda v: v.isdigit() and int(v) >= 0,
-        "Must be an integer 0 or higher.",
-    )
-    if channel_num:
-        settings["channel_num"] = channel_num
-    override_duty = _bool_prompt("Override duty cycle", "Override duty cycle?", str(current.get("lora_overrideDutyCycle")))
-    if override_duty is not None:
-        settings["override_duty_cycle"] = override_duty
-    rx_gain = _bool_prompt(
-        "SX126X RX boosted gain",
-        "Enable SX126X RX boosted gain?",
-        str(current.get("lora_sx126xRxBoostedGain")),
-    )
-    if rx_gain is not None:
-        settings["sx126x_rx_boosted_gain"] = rx_gain
-    override_freq = _input_with_validation(
-        "Override frequency",
-        "Override frequency (MHz, 0+):",
-        str(current.get("lora_overrideFrequency") or "0"),
-        lambda v: re.fullmatch(r"[0-9]+(\\.[0-9]+)?", v) is not None,
-        "Must be a number 0 or higher.",
+        for key in _LORA_WIZARD_MODEM_FIELDS:
+            ask(key)
+    defaults = {
+        key: str(current.get(_LORA_SETTING_KEYS[key]) or _LORA_INPUT_FIELDS[key][2]) for key in _LORA_WIZARD_INPUT_FIELDS
+    }
+    values = _formbox(
+        "LoRa settings",
+        [
+            (key, _LORA_INPUT_FIELDS[key][1], defaults[key], _LORA_INPUT_FIELDS[key][3], _LORA_INPUT_FIELDS[key][4])
+            for key in _LORA_WIZARD_INPUT_FIELDS
+        ],
     )
-    if override_freq:
-        settings["override_frequency"] = override_freq
-    ignore_mqtt = _bool_prompt("Ignore MQTT", "Ignore MQTT?", str(current.get("lora_ignoreMqtt")))
-    if ignore_mqtt is not None:
-        settings["ignore_mqtt"] = ignore_mqtt
-    ok_mqtt = _bool_prompt("OK to MQTT", "OK to MQTT?", str(current.get("lora_configOkToMqtt")))
-    if ok_mqtt is not None:
-        settings["config_ok_to_mqtt"] = ok_mqtt
+    if values:
+        settings.update({key: value for key, value in values.items() if value != defaults[key]})
+    for key in _LORA_WIZARD_BOOL_FIELDS:
+        ask(key)
     if settings:
         response = _run_meshtastic_with_reconnect(
             session,
@@ -2211,19 +2666,14 @@ def _meshtastic_lora_wizard(
         )
         if response is None:
             return
-        _message("LoRa wizard", response.stdout.strip() or "Done.")
+        _output_message("LoRa wizard", response.stdout, "Done.")
+        if response.returncode == 0:
+            _merge_lora_settings(current, settings)
 
 
 def _system_menu() -> None:
     while True:
-        choice = _menu(
-            "System Actions",
-            [
-                ("1", "Reboot"),
-                ("2", "Shutdown"),
-                ("3", "Back"),
-            ],
-        )
+        choice = _menu("System Actions", _SYSTEM_ACTIONS_ITEMS)
         if choice in (None, "3"):
             return
         if choice == "1":
@@ -2233,17 +2683,10 @@ def _system_menu() -> None:
 
 
 def _time_menu() -> None:
+    from mpwrd_config.time_config import current_timezone, set_time, set_timezone, status as time_status
+
     while True:
-        choice = _menu(
-            "Time & Timezone",
-            [
-                ("1", "Show current status"),
-                ("2", "Set timezone"),
-                ("3", "Set time"),
-                ("4", "Watchclock service"),
-                ("5", "Back"),
-            ],
-        )
+        choice = _menu("Time & Timezone", _TIME_ITEMS)
         if choice in (None, "5"):
             return
         if choice == "1":
@@ -2258,15 +2701,10 @@ def _time_menu() -> None:
                 continue
             tz = _run_with_status("Timezone", "Working...", lambda: current_timezone().stdout.strip())
             try:
-                timezones = _run_with_status(
-                    "Timezone",
-                    "Working...",
-                    lambda: subprocess.check_output(["timedatectl", "list-timezones"], text=True).splitlines(),
-                )
+                items = _run_with_status("Timezone", "Working...", _timezone_items)
             except Exception as exc:
                 _message("Timezone", f"Unable to list timezones.\n\n{exc}")
                 continue
-            items = [(zone, "") for zone in timezones]
             selected = _menu("Set Time Zone", items, default=tz)
             if selected:
                 _run_with_status_message("Timezone", lambda: set_timezone(selected), empty="Timezone updated.")
@@ -2285,16 +2723,70 @@ def _time_menu() -> None:
             _watchclock_menu()
 
 
-def _software_action_dialog(title: str, result) -> None:
-    body = ""
-    if result.user_message:
-        body += f"{result.user_message}\n\n"
-    if result.output:
-        body += f"Log:\n{result.output}"
-    _message(title, body or "Done.")
+class _ActionLogView:
+    def __init__(self, title: str) -> None:
+        self._title = title
+        self._entries: deque[str] = deque()
+        self._size = 0
+
+    def __enter__(self) -> _ActionLogView:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        return None
+
+    def write(self, title: str, result) -> None:
+        body = ""
+        if result.user_message:
+            body += f"{result.user_message}\n\n"
+        if result.output:
+            body += f"Log:\n{result.output[-MESSAGE_MAX_CHARS:]}"
+        entry = f"== {title} ==\n{body.rstrip() or 'Done.'}"
+        self._entries.append(entry)
+        self._size += len(entry) + 2
+        while self._size > MESSAGE_MAX_CHARS and len(self._entries) > 1:
+            self._size -= len(self._entries.popleft()) + 2
+        _message(self._title, "\n\n".join(reversed(self._entries)))
+
+
+def _software_actions(info) -> tuple[list[tuple[str, str]], dict[str, str]]:
+    installed = info.installed
+    options = info.options
+    actions: list[tuple[str, str]] = []
+    if "l" in options and installed:
+        actions.append(("run", "Run software"))
+    if "i" in options and not installed:
+        actions.append(("install", "Install"))
+    if "u" in options and installed:
+        actions.append(("uninstall", "Uninstall"))
+    if "a" in options and installed:
+        actions.append(("init", "Initialize"))
+    if "g" in options and installed:
+        actions.append(("upgrade", "Upgrade"))
+    if "e" in options and installed:
+        actions.append(("enable", "Enable service"))
+        actions.append(("disable", "Disable service"))
+        actions.append(("stop", "Stop service"))
+        actions.append(("restart", "Start/restart service"))
+    if "S" in options and installed:
+        actions.append(("status", "Detailed service status"))
+    if "G" in options:
+        actions.append(("license", "License"))
+    extra_actions = {f"extra:{key}": label for key, label in info.extra_actions}
+    actions.extend(extra_actions.items())
+    actions.append(("back", "Back"))
+    return actions, extra_actions
 
 
 def _software_menu() -> None:
+    from mpwrd_config.software_manager import (
+        license_text,
+        list_packages,
+        package_info,
+        run_action,
+        service_action as package_service_action,
+    )
+
     while True:
         packages = _run_with_status("Software Manager", "Working...", list_packages)
         if not packages:
@@ -2311,91 +2803,50 @@ def _software_menu() -> None:
             f"{info.description or ''}\n\nInstalled: {info.installed}\nOptions: {info.options}",
         ):
             continue
-        while True:
-            actions: list[tuple[str, str]] = []
-            if "l" in info.options and info.installed:
-                actions.append(("run", "Run software"))
-            if "i" in info.options and not info.installed:
-                actions.append(("install", "Install"))
-            if "u" in info.options and info.installed:
-                actions.append(("uninstall", "Uninstall"))
-            if "a" in info.options and info.installed:
-                actions.append(("init", "Initialize"))
-            if "g" in info.options and info.installed:
-                actions.append(("upgrade", "Upgrade"))
-            if "e" in info.options and info.installed:
-                actions.append(("enable", "Enable service"))
-                actions.append(("disable", "Disable service"))
-                actions.append(("stop", "Stop service"))
-                actions.append(("restart", "Start/restart service"))
-            if "S" in info.options and info.installed:
-                actions.append(("status", "Detailed service status"))
-            if "G" in info.options:
-                actions.append(("license", "License"))
-            extra_actions = {f"extra:{key}": label for key, label in info.extra_actions}
-            for action_key, label in extra_actions.items():
-                actions.append((action_key, label))
-            actions.append(("back", "Back"))
-            action = _menu(info.name, actions)
-            if action in (None, "back"):
-                break
-            if action in extra_actions:
-                result = _run_with_status(
-                    extra_actions[action],
-                    "Working...",
-                    lambda: run_action(choice, f"-{action.split(':', 1)[1]}"),
-                )
-                _software_action_dialog(extra_actions[action], result)
-                continue
-            if action == "license":
-                _run_with_status_message("License", lambda: license_text(choice), empty="No license text.")
-                continue
-            if action == "status":
-                result = _run_with_status("Service status", "Working...", lambda: package_service_action(choice, "-S"))
-                _message("Service status", result.stdout)
-                continue
-            if action in {"enable", "disable", "stop", "restart"}:
-                flag_map = {
-                    "enable": "-e",
-                    "disable": "-d",
-                    "stop": "-s",
-                    "restart": "-r",
-                }
-                result = _run_with_status(
-                    info.name,
-                    "Working...",
-                    lambda: package_service_action(choice, flag_map[action]),
-                )
-                _message(info.name, result.stdout or "Done.")
-                continue
-            if action == "install":
-                result = _run_with_status("Install", "Working...", lambda: run_action(choice, "-i"))
-                _software_action_dialog("Install", result)
-            elif action == "uninstall":
-                result = _run_with_status("Uninstall", "Working...", lambda: run_action(choice, "-u"))
-                _software_action_dialog("Uninstall", result)
-            elif action == "upgrade":
-                result = _run_with_status("Upgrade", "Working...", lambda: run_action(choice, "-g"))
-                _software_action_dialog("Upgrade", result)
-            elif action == "init":
-                result = _run_with_status("Initialize", "Working...", lambda: run_action(choice, "-a"))
-                _software_action_dialog("Initialize", result)
-            elif action == "run":
-                result = _run_with_status("Run", "Working...", lambda: run_action(choice, "-l"))
-                _software_action_dialog("Run", result)
+        actions, extra_actions = _software_actions(info)
+        with _ActionLogView(info.name) as log:
+            while True:
+                action = _menu(info.name, actions)
+                if action in (None, "back"):
+                    break
+                if action in extra_actions:
+                    result = _run_with_status(
+                        extra_actions[action],
+                        "Working...",
+                        lambda: run_action(choice, f"-{action.split(':', 1)[1]}"),
+                    )
+                    log.write(extra_actions[action], result)
+                    _forget_unit_files()
+                    continue
+                if action == "license":
+                    _run_with_status_message("License", lambda: license_text(choice), empty="No license text.")
+                    continue
+                if action == "status":
+                    _run_with_status_message(
+                        "Service status",
+                        lambda: package_service_action(choice, "-S"),
+                        empty="No output.",
+                    )
+                    continue
+                if action in _PKG_SERVICE_FLAGS:
+                    _run_with_status_message(info.name, lambda: package_service_action(choice, _PKG_SERVICE_FLAGS[action]))
+                    continue
+                run = _SOFTWARE_RUN_ACTIONS.get(action)
+                if run:
+                    title, flag = run
+                    result = _run_with_status(title, "Working...", lambda: run_action(choice, flag))
+                    log.write(title, result)
+                    if action in _SOFTWARE_STATE_ACTIONS:
+                        _forget_unit_files()
+                        info = _run_with_status("Software Manager", "Working...", lambda: package_info(choice))
+                        actions, extra_actions = _software_actions(info)
 
 
 def _meshtastic_i2c_menu() -> None:
+    from mpwrd_config.meshtastic import i2c_state
+
     while True:
-        action = _menu(
-            "Meshtastic I2C",
-            [
-                ("1", "Check I2C state"),
-                ("2", "Enable I2C"),
-                ("3", "Disable I2C"),
-                ("4", "Back"),
-            ],
-        )
+        action = _menu("Meshtastic I2C", _MESHTASTIC_I2C_ITEMS)
         if action in (None, "4"):
             return
         if action == "1":
@@ -2407,218 +2858,127 @@ def _meshtastic_i2c_menu() -> None:
 
 
 def _utilities_menu() -> None:
+    from mpwrd_config.system_utils import (
+        act_led,
+        all_system_info,
+        cpu_info,
+        generate_ssh_keys,
+        legacy_tool_command,
+        logging_state,
+        networking_info,
+        os_info,
+        peripherals_info,
+        storage_info,
+        ttyd_action,
+    )
+
+    system_info_sections = {
+        "all": ("System Info", all_system_info),
+        "cpu": ("CPU Info", cpu_info),
+        "os": ("OS Info", os_info),
+        "storage": ("Storage Info", storage_info),
+        "network": ("Networking Info", networking_info),
+        "peripherals": ("Peripherals Info", peripherals_info),
+    }
+
+    def _system_info() -> None:
+        section = system_info_sections.get(_menu("System Info", _SYSTEM_INFO_ITEMS))
+        if section:
+            _run_with_status_message(*section)
+
+    def _logging() -> None:
+        state = _menu("Logging", _LOGGING_ITEMS)
+        if state and state != "back":
+            _run_with_status_message("Logging", lambda: logging_state(state))
+
+    def _act_led() -> None:
+        state = _menu("Activity LED", _ACT_LED_ITEMS)
+        if state and state != "back":
+            _run_with_status_message("Activity LED", lambda: act_led(state))
+
+    def _ttyd() -> None:
+        action = _menu("ttyd", _TTYD_ITEMS)
+        if action:
+            _run_with_status_message("ttyd", lambda: ttyd_action(action))
+
+    def _ssh_keys() -> None:
+        if _yesno("SSH Keys", "Regenerate SSH host keys?"):
+            _run_with_status_message("SSH Keys", generate_ssh_keys)
+
+    def _process_viewer() -> None:
+        command = legacy_tool_command(["htop", "top"])
+        if command:
+            _run_interactive(command, "Process Viewer", "Process viewer not available.")
+        else:
+            _message("Process Viewer", "Process viewer not available.")
+
+    handlers: dict[str, Callable[[], None]] = {
+        "1": _system_info,
+        "2": _logging,
+        "3": _act_led,
+        "4": _meshtastic_i2c_menu,
+        "5": _ttyd,
+        "6": _ssh_keys,
+        "7": _process_viewer,
+        "8": _time_menu,
+    }
     while True:
-        choice = _menu(
-            "System Utilities",
-            [
-                ("1", "System info"),
-                ("2", "Logging"),
-                ("3", "Activity LED"),
-                ("4", "Meshtastic I2C"),
-                ("5", "ttyd service"),
-                ("6", "Regenerate SSH keys"),
-                ("7", "Process viewer/manager"),
-                ("8", "Time & Timezone"),
-                ("9", "Back"),
-            ],
-        )
+        choice = _menu("System Utilities", _UTILITIES_ITEMS)
         if choice in (None, "9"):
             return
-        if choice == "1":
-            section = _menu(
-                "System Info",
-                [
-                    ("all", "All"),
-                    ("cpu", "CPU"),
-                    ("os", "OS"),
-                    ("storage", "Storage"),
-                    ("network", "Networking"),
-                    ("peripherals", "Peripherals"),
-                    ("back", "Back"),
-                ],
-            )
-            if section in (None, "back"):
-                continue
-            if section == "all":
-                _run_with_status_message("System Info", all_system_info)
-            elif section == "cpu":
-                _run_with_status_message("CPU Info", cpu_info)
-            elif section == "os":
-                _run_with_status_message("OS Info", os_info)
-            elif section == "storage":
-                _run_with_status_message("Storage Info", storage_info)
-            elif section == "network":
-                _run_with_status_message("Networking Info", networking_info)
-            elif section == "peripherals":
-                _run_with_status_message("Peripherals Info", peripherals_info)
-        elif choice == "2":
-            state = _menu(
-                "Logging",
-                [
-                    ("enable", "Enable /var/log"),
-                    ("disable", "Disable /var/log"),
-                    ("check", "Check"),
-                    ("back", "Back"),
-                ],
-            )
-            if state and state != "back":
-                _run_with_status_message("Logging", lambda: logging_state(state))
-        elif choice == "3":
-            state = _menu(
-                "Activity LED",
-                [("enable", "Enable"), ("disable", "Disable"), ("check", "Check"), ("back", "Back")],
-            )
-            if state and state != "back":
-                _run_with_status_message("Activity LED", lambda: act_led(state))
-        elif choice == "4":
-            _meshtastic_i2c_menu()
-        elif choice == "5":
-            action = _menu(
-                "ttyd",
-                [("enable", "Enable"), ("disable", "Disable"), ("start", "Start"), ("stop", "Stop"), ("restart", "Restart"), ("check", "Check")],
-            )
-            if action:
-                _run_with_status_message("ttyd", lambda: ttyd_action(action))
-        elif choice == "6":
-            if _yesno("SSH Keys", "Regenerate SSH host keys?"):
-                _run_with_status_message("SSH Keys", generate_ssh_keys)
-        elif choice == "7":
-            command = legacy_tool_command(["htop", "top"])
-            if command:
-                _run_interactive(command, "Process Viewer", "Process viewer not available.")
-            else:
-                _message("Process Viewer", "Process viewer not available.")
-        elif choice == "8":
-            _time_menu()
+        handler = handlers.get(choice)
+        if handler:
+            handler()
 
 
 def _help_menu() -> None:
+    from mpwrd_config.system_utils import license_info, pinout_info
+
     while True:
-        choice = _menu(
-            "Help / About",
-            [
-                ("1", "About mpwrd-config"),
-                ("2", "Display pinout"),
-                ("3", "Femtofox licensing info - short"),
-                ("4", "Femtofox licensing info - long"),
-                ("5", "Meshtastic licensing info"),
-                ("6", "Back"),
-            ],
-        )
+        choice = _menu("Help / About", _HELP_ITEMS)
         if choice in (None, "6"):
             return
-        if choice == "1":
-            _run_with_status_message("About mpwrd-config", lambda: license_info("about"))
-        elif choice == "2":
-            pinout_choice = _menu(
-                "Pinouts",
-                [
-                    ("femtofox", "Femtofox Pro/CE"),
-                    ("zero", "Femtofox Zero"),
-                    ("tiny", "Femtofox Tiny"),
-                    ("luckfox", "Luckfox Pico Mini"),
-                    ("back", "Back"),
-                ],
-            )
+        if choice == "2":
+            pinout_choice = _menu("Pinouts", _PINOUT_ITEMS)
             if pinout_choice and pinout_choice != "back":
                 _run_with_status_message("Pinout", lambda: pinout_info(pinout_choice))
-        elif choice == "3":
-            _run_with_status_message("Femtofox license", lambda: license_info("short"))
-        elif choice == "4":
-            _run_with_status_message("Femtofox license (long)", lambda: license_info("long"))
-        elif choice == "5":
-            _run_with_status_message("Meshtastic license", lambda: license_info("meshtastic"))
+            continue
+        license_section = _HELP_LICENSE_SECTIONS.get(choice)
+        if license_section:
+            title, kind = license_section
+            _run_with_status_message(title, lambda: license_info(kind))
 
 
 def _wifi_mesh_menu() -> None:
-    def _service_exists(name: str) -> bool:
-        for base in ("/etc/systemd/system", "/lib/systemd/system", "/usr/lib/systemd/system"):
-            if Path(base, f"{name}.service").exists():
-                return True
-        return False
-
-    def _select_service(candidates: list[str]) -> str:
-        for candidate in candidates:
-            if _service_exists(candidate):
-                return candidate
-        return candidates[0]
+    from mpwrd_config.wifi_mesh import sync_once as wifi_mesh_sync
 
-    service = _select_service(["femto-wifi-mesh", "femto-wifi-mesh-control"])
+    service = _select_service(_WIFI_MESH_SERVICES)
     while True:
-        choice = _menu(
-            "Admin mesh client Wi-Fi toggle",
-            [
-                ("1", "Run sync now"),
-                ("2", "Service status"),
-                ("3", "Start service"),
-                ("4", "Stop service"),
-                ("5", "Restart service"),
-                ("6", "Enable service"),
-                ("7", "Disable service"),
-                ("8", "Back"),
-            ],
-        )
+        choice = _menu("Admin mesh client Wi-Fi toggle", _WIFI_MESH_ITEMS)
         if choice in (None, "8"):
             return
         if choice == "1":
             _run_with_status_message("Admin mesh client Wi-Fi toggle", wifi_mesh_sync, empty="Sync complete.")
             continue
-        action_map = {
-            "2": "status",
-            "3": "start",
-            "4": "stop",
-            "5": "restart",
-            "6": "enable",
-            "7": "disable",
-        }
-        action = action_map.get(choice)
+        action = _WIFI_MESH_ACTIONS.get(choice)
         if action:
             _run_cli_output(["services", service, action], f"{service} {action}")
 
 
 def _watchclock_menu() -> None:
-    def _service_exists(name: str) -> bool:
-        for base in ("/etc/systemd/system", "/lib/systemd/system", "/usr/lib/systemd/system"):
-            if Path(base, f"{name}.service").exists():
-                return True
-        return False
-
-    def _select_service(candidates: list[str]) -> str:
-        for candidate in candidates:
-            if _service_exists(candidate):
-                return candidate
-        return candidates[0]
-
-    service = _select_service(["femto-watchclock", "watchclock"])
+    service = _select_service(_WATCHCLOCK_SERVICES)
     while True:
-        choice = _menu(
-            "Watchclock service",
-            [
-                ("1", "Status"),
-                ("2", "Start"),
-                ("3", "Stop"),
-                ("4", "Restart"),
-                ("5", "Enable"),
-                ("6", "Disable"),
-                ("7", "Back"),
-            ],
-        )
+        choice = _menu("Watchclock service", _SERVICE_MENU_ITEMS)
         if choice in (None, "7"):
             return
-        action_map = {
-            "1": "status",
-            "2": "start",
-            "3": "stop",
-            "4": "restart",
-            "5": "enable",
-            "6": "disable",
-        }
-        action = action_map.get(choice)
+        action = _SERVICE_ACTIONS.get(choice)
         if action:
             _run_cli_output(["services", service, action], f"{service} {action}")
 
 
 def _install_wizard() -> None:
+    from mpwrd_config.meshtastic import MeshtasticSession, set_config_url, set_private_key, set_public_key
+
     def _run_cli_step(title: str, args: list[str]) -> int:
         return _run_cli_output(args, title)
 
@@ -2629,53 +2989,81 @@ def _install_wizard() -> None:
     ):
         return
     _time_menu()
-    hostname = _inputbox("Hostname", "Enter hostname:", os.uname().nodename)
+    path = _config_path()
+    config = load_config(path)
+    applied_messages: list[str] = []
+    hostname = _inputbox("Hostname", "Enter hostname:", _nodename())
     if hostname:
-        if _run_cli_step("Hostname", ["networking", "hostname", "set", "--name", hostname]) == 0:
-            if _run_cli_step("Networking", ["networking", "apply"]) == 0:
-                _message("Hostname", f"Femtofox is now reachable at\n{hostname}.local")
+        config.networking.hostname = hostname
+        applied_messages.append(f"Femtofox is now reachable at\n{hostname}.local")
     if _yesno("Install Wizard", "Configure Wi-Fi settings?"):
         ssid, psk, country = _wifi_form()
         if ssid:
-            args = ["networking", "wifi", "set", "--ssid", ssid, "--psk", psk]
-            if country:
-                args.extend(["--country", country])
-            if _run_cli_step("Wi-Fi", args) == 0:
-                if _run_cli_step("Networking", ["networking", "apply"]) == 0:
-                    _message("Wi-Fi", "Wi-Fi settings saved.")
+            _store_wifi_network(config, ssid, psk or "", country)
+            applied_messages.append("Wi-Fi settings saved.")
+    if applied_messages:
+        save_config(config, path)
+        if _run_cli_step("Networking", ["--config", str(path), "networking", "apply"]) == 0:
+            _nodename.cache_clear()
+            _INTERFACE_CACHE.clear()
+            _message("Networking", "\n\n".join(applied_messages))
     if _yesno("Install Wizard", "Configure Meshtastic?"):
-        while True:
-            choice = _menu(
-                "Meshtastic Configuration",
-                [
-                    ("1", "Set LoRa radio model"),
-                    ("2", "Set configuration URL"),
-                    ("3", "Set private key"),
-                    ("4", "Set public key"),
-                    ("5", "Full Meshtastic settings"),
-                    ("6", "Continue"),
-                ],
-            )
-            if choice in (None, "6"):
-                break
-            if choice == "1":
-                model = _inputbox("LoRa radio", "Enter radio model (or 'none'):", "none")
-                if model:
-                    _run_cli_step("Meshtastic radio", ["meshtastic", "set-radio", "--model", model])
-            elif choice == "2":
-                url = _inputbox("Config URL", "Enter config URL:")
-                if url:
-                    _run_cli_step("Meshtastic URL", ["meshtastic", "set-config-url", "--url", url])
-            elif choice == "3":
-                key = _inputbox("Private Key", "Enter private key:")
-                if key:
-                    _run_cli_step("Meshtastic private key", ["meshtastic", "set-private-key", "--key", key])
-            elif choice == "4":
-                key = _inputbox("Public Key", "Enter public key:")
-                if key:
-                    _run_cli_step("Meshtastic public key", ["meshtastic", "set-public-key", "--key", key])
-            elif choice == "5":
-                _meshtastic_full_settings_menu()
+        session = MeshtasticSession()
+        connect_lock = threading.Lock()
+        connect_state = {"done": False, "closing": False}
+
+        def _connect() -> None:
+            try:
+                session.get_interface(wait_for_config=False, reconnect=True, attempts=1)
+            except Exception:
+                pass
+            with connect_lock:
+                connect_state["done"] = True
+                if connect_state["closing"]:
+                    session.close(wait=False)
+
+        connect_thread = threading.Thread(target=_connect, name="meshtastic-wizard-connect", daemon=True)
+        connect_thread.start()
+
+        def _wait_for_connect() -> None:
+            if connect_thread.is_alive():
+                _run_with_status("Install Wizard", "Connecting to Meshtastic API...\nPlease wait.", connect_thread.join)
+
+        def _run_meshtastic_step(title: str, action: Callable[[], object]) -> None:
+            _wait_for_connect()
+            result = _run_meshtastic_with_reconnect(session, title, action)
+            if result is not None:
+                _output_message(title, result.stdout, "Done.")
+
+        try:
+            while True:
+                choice = _menu("Meshtastic Configuration", _WIZARD_MESHTASTIC_ITEMS)
+                if choice in (None, "6"):
+                    break
+                if choice == "1":
+                    model = _inputbox("LoRa radio", "Enter radio model (or 'none'):", "none")
+                    if model:
+                        _run_cli_step("Meshtastic radio", ["meshtastic", "set-radio", "--model", model])
+                elif choice == "2":
+                    url = _inputbox("Config URL", "Enter config URL:")
+                    if url:
+                        _run_meshtastic_step("Meshtastic URL", lambda: set_config_url(url, session=session))
+                elif choice == "3":
+                    key = _inputbox("Private Key", "Enter private key:")
+                    if key:
+                        _run_meshtastic_step("Meshtastic private key", lambda: set_private_key(key, session=session))
+                elif choice == "4":
+                    key = _inputbox("Public Key", "Enter public key:")
+                    if key:
+                        _run_meshtastic_step("Meshtastic public key", lambda: set_public_key(key, session=session))
+                elif choice == "5":
+                    _wait_for_connect()
+                    _meshtastic_full_settings_menu(session)
+        finally:
+            with connect_lock:
+                connect_state["closing"] = True
+                if connect_state["done"]:
+                    session.close(wait=False)
     _message("Install Wizard", "Setup wizard complete!")
 
 
@@ -2685,22 +3073,23 @@ def main(wizard: bool = False) -> int:
         return 0
     if os.getenv("MPWRD_TUI_STARTING_SHOWN") != "1":
         _print_starting_notice()
-    meshtastic_session = MeshtasticSession()
+    meshtastic_session: MeshtasticSession | None = None
     startup_done = threading.Event()
-    startup_state: dict[str, Any] = {"connected": False, "error": "Meshtastic is still connecting."}
-    startup_lock = threading.Lock()
+    startup_state: tuple[bool, str] = (False, "Meshtastic is still connecting.")
 
     def _set_startup(connected: bool, error: str) -> None:
-        with startup_lock:
-            startup_state["connected"] = connected
-            startup_state["error"] = error
+        nonlocal startup_state
+        startup_state = (connected, error or "")
 
     def _get_startup() -> tuple[bool, str]:
-        with startup_lock:
-            return bool(startup_state["connected"]), str(startup_state["error"] or "")
+        return startup_state
 
     def _startup_connect() -> None:
+        nonlocal meshtastic_session
         try:
+            from mpwrd_config.meshtastic import MeshtasticSession
+
+            meshtastic_session = MeshtasticSession()
             error, interface = meshtastic_session.get_interface(
                 wait_for_config=False,
                 reconnect=True,
@@ -2719,7 +3108,7 @@ def main(wizard: bool = False) -> int:
     startup_thread.start()
 
     def close_handler() -> None:
-        if startup_thread.is_alive():
+        if startup_thread.is_alive() or meshtastic_session is None:
             return
         meshtastic_session.close(wait=False)
 
@@ -2731,6 +3120,9 @@ def main(wizard: bool = False) -> int:
                 lambda: startup_done.wait(),
             )
         startup_connected, startup_error = _get_startup()
+        if meshtastic_session is None:
+            _message("Meshtastic", startup_error or "Meshtastic support is unavailable.")
+            return
         if not startup_connected:
             if _recover_meshtastic_connection(
                 meshtastic_session,
@@ -2742,59 +3134,35 @@ def main(wizard: bool = False) -> int:
 
     def _basic_menu() -> None:
         while True:
-            choice = _menu(
-                "Basic",
-                [
-                    ("1", "Install Wizard"),
-                    ("2", "Back"),
-                ],
-            )
+            choice = _menu("Basic", _BASIC_MENU_ITEMS)
             if choice in (None, "2"):
                 return
             if choice == "1":
                 _install_wizard()
 
+    advanced_handlers: dict[str, Callable[[], None]] = {
+        "1": _open_meshtastic_menu,
+        "2": _networking_menu,
+        "3": _software_menu,
+        "4": _utilities_menu,
+        "5": _system_menu,
+        "6": _help_menu,
+    }
+
     def _advanced_menu() -> None:
         while True:
-            choice = _menu(
-                "Advanced",
-                [
-                    ("1", "Meshtastic"),
-                    ("2", "Networking"),
-                    ("3", "Software Manager"),
-                    ("4", "System Utilities"),
-                    ("5", "System Actions"),
-                    ("6", "Help / About"),
-                    ("7", "Back"),
-                ],
-            )
+            choice = _menu("Advanced", _ADVANCED_MENU_ITEMS)
             if choice in (None, "7"):
                 return
-            if choice == "1":
-                _open_meshtastic_menu()
-            elif choice == "2":
-                _networking_menu()
-            elif choice == "3":
-                _software_menu()
-            elif choice == "4":
-                _utilities_menu()
-            elif choice == "5":
-                _system_menu()
-            elif choice == "6":
-                _help_menu()
+            handler = advanced_handlers.get(choice)
+            if handler:
+                handler()
 
     atexit.register(close_handler)
 
     try:
         while True:
-            choice = _menu(
-                MAIN_MENU_TITLE,
-                [
-                    ("1", "Basic"),
-                    ("2", "Advanced"),
-                    ("3", "Exit"),
-                ],
-            )
+            choice = _menu(MAIN_MENU_TITLE, _MAIN_MENU_ITEMS)
             if choice in (None, "3"):
                 _print_exiting_notice()
                 return 0
@@ -1,44 +1,45 @@
 from __future__ import annotations
 
 import os
+import signal
 import sys
-import threading
 from typing import Callable, TypeVar
 
 SPINNER_FRAMES = ("⣾", "⣽", "⣻", "⢿", "⡿", "⣟", "⣯", "⣷")
-SPINNER_INTERVAL = 0.08
+SPINNER_INTERVAL = 0.25
 
 T = TypeVar("T")
 
 
+def _write_spinner_frame(label: str, index: int, end: str = "") -> None:
+    frame = SPINNER_FRAMES[index % len(SPINNER_FRAMES)]
+    try:
+        sys.stdout.write(f"\r{frame} {label}{end}")
+        sys.stdout.flush()
+    except Exception:
+        pass
+
+
 def _run_with_spinner(label: str, action: Callable[[], T]) -> T:
-    stop = threading.Event()
-
-    def _spin() -> None:
-        index = 0
-        while not stop.is_set():
-            frame = SPINNER_FRAMES[index % len(SPINNER_FRAMES)]
-            try:
-                sys.stdout.write(f"\r{frame} {label}")
-                sys.stdout.flush()
-            except Exception:
-                return
-            index += 1
-            stop.wait(SPINNER_INTERVAL)
-        frame = SPINNER_FRAMES[index % len(SPINNER_FRAMES)]
-        try:
-            sys.stdout.write(f"\r{frame} {label}\n")
-            sys.stdout.flush()
-        except Exception:
-            return
-
-    spinner = threading.Thread(target=_spin, name="mpwrd-start-spinner", daemon=True)
-    spinner.start()
+    if not sys.stdout.isatty() or not hasattr(signal, "setitimer"):
+        _write_spinner_frame(label, 0, "\n")
+        return action()
+    index = 0
+
+    def _tick(signum=None, frame=None) -> None:
+        nonlocal index
+        _write_spinner_frame(label, index)
+        index += 1
+
+    previous = signal.signal(signal.SIGALRM, _tick)
+    _tick()
+    signal.setitimer(signal.ITIMER_REAL, SPINNER_INTERVAL, SPINNER_INTERVAL)
     try:
         return action()
     finally:
-        stop.set()
-        spinner.join(timeout=0.5)
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+        _write_spinner_frame(label, index, "\n")
 
 
 def main() -> int:
@@ -4,6 +4,7 @@ import os
 import time
 from dataclasses import dataclass
 from pathlib import Path
+from typing import TextIO
 
 from mpwrd_config.system import CommandResult, _run
 
@@ -11,6 +12,7 @@ from mpwrd_config.system import CommandResult, _run
 DEFAULT_THRESHOLD_SECONDS = 7 * 24 * 60 * 60
 DEFAULT_LOGFILE = Path("/var/log/time_change.log")
 DEFAULT_LAST_TIME_FILE = Path("/tmp/last_time")
+ACTIVE_CHECK_TTL_SECONDS = 60
 
 
 @dataclass
@@ -19,10 +21,16 @@ class WatchclockResult:
     stdout: str
 
 
-def _log(path: Path, message: str) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("a", encoding="utf-8") as handle:
-        handle.write(f"{time.ctime()} - {message}\n")
+def _log(handle: TextIO, logfile: Path, message: str) -> TextIO:
+    try:
+        rotated = os.stat(logfile).st_ino != os.fstat(handle.fileno()).st_ino
+    except OSError:
+        rotated = True
+    if rotated:
+        handle.close()
+        handle = logfile.open("a", encoding="utf-8", buffering=1)
+    handle.write(f"{time.ctime()} - {message}\n")
+    return handle
 
 
 def run_watchclock(
@@ -41,23 +49,39 @@ def run_watchclock(
     if not os.access(last_time_file, os.W_OK):
         return WatchclockResult(returncode=1, stdout=f"ERROR: Last time file {last_time_file} is not writable")
 
-    while True:
-        if _run(["systemctl", "is-active", "--quiet", "meshtasticd"]).returncode != 0:
-            time.sleep(interval_seconds)
-            continue
-        new_time = int(time.time())
-        if not os.access(last_time_file, os.R_OK):
-            return WatchclockResult(returncode=1, stdout=f"ERROR: Last time file {last_time_file} is not readable")
-        try:
-            old_time = int(last_time_file.read_text(encoding="utf-8").strip())
-        except ValueError:
+    if not os.access(last_time_file, os.R_OK):
+        return WatchclockResult(returncode=1, stdout=f"ERROR: Last time file {last_time_file} is not readable")
+    try:
+        old_time = int(last_time_file.read_text(encoding="utf-8").strip())
+    except ValueError:
+        old_time = int(time.time())
+
+    fd = os.open(last_time_file, os.O_WRONLY | os.O_CREAT)
+    log_handle = logfile.open("a", encoding="utf-8", buffering=1)
+    try:
+        last_active_check = (float("-inf"), False)
+        while True:
+            now = time.monotonic()
+            if now - last_active_check[0] >= ACTIVE_CHECK_TTL_SECONDS:
+                active = _run(["systemctl", "is-active", "--quiet", "meshtasticd"]).returncode == 0
+                last_active_check = (now, active)
+            if not last_active_check[1]:
+                time.sleep(interval_seconds)
+                continue
+            new_time = int(time.time())
+            time_diff = new_time - old_time
+            if abs(time_diff) >= threshold_seconds:
+                log_handle = _log(log_handle, logfile, f"Large time change detected ({time_diff} seconds), restarting meshtasticd")
+                _run(["systemctl", "restart", "meshtasticd"])
+                last_active_check = (time.monotonic(), True)
+            data = str(new_time).encode()
+            try:
+                os.pwrite(fd, data, 0)
+                os.ftruncate(fd, len(data))
+            except OSError:
+                return WatchclockResult(returncode=1, stdout=f"ERROR: Failed to write to {last_time_file}")
             old_time = new_time
-        time_diff = new_time - old_time
-        if abs(time_diff) >= threshold_seconds:
-            _log(logfile, f"Large time change detected ({time_diff} seconds), restarting meshtasticd")
-            _run(["systemctl", "restart", "meshtasticd"])
-        if os.access(last_time_file, os.W_OK):
-            last_time_file.write_text(str(new_time), encoding="utf-8")
-        else:
-            return WatchclockResult(returncode=1, stdout=f"ERROR: Failed to write to {last_time_file}")
-        time.sleep(interval_seconds)
+            time.sleep(interval_seconds)
+    finally:
+        log_handle.close()
+        os.close(fd)
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
-import re
+import atexit
 import time
 from dataclasses import dataclass
 from pathlib import Path
+from typing import TextIO
 import os
 
 from mpwrd_config.core import DEFAULT_CONFIG_PATH, load_config
@@ -13,6 +14,7 @@ from mpwrd_config.system import CommandResult, _run, list_wifi_interfaces
 LOG_FILE = Path("/var/log/meshtastic_wifi.log")
 WIFI_STATE_FILE = Path("/etc/wifi_state.txt")
 PROTO_FILE = Path("/root/.portduino/default/prefs/config.proto")
+LORA_DEVICE = "/dev/spidev0.0"
 
 
 @dataclass
@@ -21,45 +23,83 @@ class WifiMeshResult:
     stdout: str
 
 
+_LOG_HANDLE: TextIO | None = None
+_LOG_STAMP: tuple[int, str] = (-1, "")
+
+
+def _close_log() -> None:
+    global _LOG_HANDLE
+    if _LOG_HANDLE is not None:
+        _LOG_HANDLE.close()
+        _LOG_HANDLE = None
+
+
+atexit.register(_close_log)
+
+
 def _log(message: str) -> None:
-    LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with LOG_FILE.open("a", encoding="utf-8") as handle:
-        handle.write(f"{time.ctime()} - {message}\n")
+    global _LOG_HANDLE, _LOG_STAMP
+    now = int(time.time())
+    if now != _LOG_STAMP[0]:
+        _LOG_STAMP = (now, time.ctime(now))
+    if _LOG_HANDLE is not None:
+        try:
+            rotated = os.stat(LOG_FILE).st_ino != os.fstat(_LOG_HANDLE.fileno()).st_ino
+        except OSError:
+            rotated = True
+        if rotated:
+            _close_log()
+    if _LOG_HANDLE is None:
+        LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
+        _LOG_HANDLE = LOG_FILE.open("a", encoding="utf-8", buffering=1)
+    _LOG_HANDLE.write(f"{_LOG_STAMP[1]} - {message}\n")
 
 
 def _config_path() -> Path:
     return Path(os.getenv("MPWRD_CONFIG_PATH") or DEFAULT_CONFIG_PATH)
 
 
-def _select_wifi_interface() -> str:
+WIFI_INTERFACE_TTL = 30.0
+_WIFI_INTERFACE: tuple[float, str, str] | None = None
+
+
+def _wifi_interface_entry() -> tuple[str, str]:
+    global _WIFI_INTERFACE
+    now = time.monotonic()
+    if _WIFI_INTERFACE is not None and now < _WIFI_INTERFACE[0]:
+        return _WIFI_INTERFACE[1], _WIFI_INTERFACE[2]
     interfaces = list_wifi_interfaces()
     config = load_config(_config_path())
     preferred = config.networking.wifi_interface
     if preferred and preferred in interfaces:
-        return preferred
-    if len(interfaces) == 1:
-        return interfaces[0]
-    return ""
+        iface = preferred
+    elif len(interfaces) == 1:
+        iface = interfaces[0]
+    else:
+        iface = ""
+    sysfs_dir = f"/sys/class/net/{iface}" if iface else ""
+    _WIFI_INTERFACE = (now + WIFI_INTERFACE_TTL, iface, sysfs_dir)
+    return iface, sysfs_dir
+
+
+def _select_wifi_interface() -> str:
+    return _wifi_interface_entry()[0]
 
 
 def get_mobile_wifi_state() -> str:
-    if not PROTO_FILE.exists():
+    from google.protobuf.message import DecodeError
+    from meshtastic.protobuf import localonly_pb2
+
+    try:
+        data = PROTO_FILE.read_bytes()
+    except OSError:
         return "down"
-    result = _run(["/bin/sh", "-c", f"cat {PROTO_FILE} | protoc --decode_raw"])
-    state = "down"
-    in_section = False
-    for line in result.stdout.splitlines():
-        if re.match(r"\s*4\s*\{", line):
-            in_section = True
-            continue
-        if in_section and line.strip().startswith("}"):
-            in_section = False
-        if in_section:
-            match = re.match(r"\s*1:\s*(\d+)", line)
-            if match:
-                state = "up" if match.group(1) == "1" else "down"
-                break
-    return state
+    config = localonly_pb2.LocalConfig()
+    try:
+        config.ParseFromString(data)
+    except DecodeError:
+        return "down"
+    return "up" if config.network.wifi_enabled else "down"
 
 
 def set_mobile_wifi_state(state: str) -> None:
@@ -94,13 +134,14 @@ def validate_wifi_state_file() -> None:
 
 
 def _current_wlan_state() -> str:
-    iface = _select_wifi_interface()
+    iface, sysfs_dir = _wifi_interface_entry()
     if not iface:
         return "down"
-    path = Path(f"/sys/class/net/{iface}/operstate")
-    if not path.exists():
+    try:
+        with open(f"{sysfs_dir}/operstate", encoding="utf-8") as handle:
+            return handle.read().strip()
+    except OSError:
         return "down"
-    return path.read_text(encoding="utf-8").strip()
 
 
 def sync_states() -> None:
@@ -115,22 +156,72 @@ def sync_states() -> None:
         _log(f"Synced Wi-Fi state to {text_state}.")
 
 
+def _proto_stamp() -> tuple[int, int] | None:
+    try:
+        stat = PROTO_FILE.stat()
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _meshtasticd_pid() -> str:
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return ""
+    for name in entries:
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/comm", encoding="utf-8") as handle:
+                if handle.read().strip() == "meshtasticd":
+                    return name
+        except OSError:
+            continue
+    return ""
+
+
+def _process_holds(pid: str, device: str) -> bool:
+    fd_dir = f"/proc/{pid}/fd"
+    try:
+        fds = os.listdir(fd_dir)
+    except OSError:
+        return False
+    for fd in fds:
+        try:
+            if os.readlink(f"{fd_dir}/{fd}") == device:
+                return True
+        except OSError:
+            continue
+    return False
+
+
 def monitor_changes() -> None:
+    proto_stamp = _proto_stamp()
     previous_mobile_state = get_mobile_wifi_state()
+    mobile_state = previous_mobile_state
     previous_wlan_state = _current_wlan_state()
+    lora_pid = ""
     while True:
-        pid_result = _run(["/bin/sh", "-c", "ps -C meshtasticd -o pid="])
-        pid = pid_result.stdout.strip()
-        if pid:
-            lsof_result = _run(["/bin/sh", "-c", "lsof /dev/spidev0.0"])
-            has_lora = pid in lsof_result.stdout
+        pid = _meshtasticd_pid()
+        if pid and pid == lora_pid:
+            has_lora = True
+        elif pid:
+            has_lora = _process_holds(pid, LORA_DEVICE)
+            lora_pid = pid if has_lora else ""
         else:
             has_lora = False
-        iface = _select_wifi_interface()
-        wlan_exists = bool(iface) and Path(f"/sys/class/net/{iface}").exists()
-        meshtastic_running = _run(["systemctl", "is-active", "--quiet", "meshtasticd"]).returncode == 0
-        if pid and has_lora and wlan_exists and meshtastic_running:
-            current_mobile_state = get_mobile_wifi_state()
+        sysfs_dir = _wifi_interface_entry()[1] if has_lora else ""
+        if (
+            sysfs_dir
+            and os.path.exists(sysfs_dir)
+            and _run(["systemctl", "is-active", "--quiet", "meshtasticd"]).returncode == 0
+        ):
+            stamp = _proto_stamp()
+            if stamp != proto_stamp:
+                proto_stamp = stamp
+                mobile_state = get_mobile_wifi_state()
+            current_mobile_state = mobile_state
             current_wlan_state = _current_wlan_state()
             if current_mobile_state != previous_mobile_state:
                 _log(f"Detected mobile Wi-Fi state change: {previous_mobile_state} -> {current_mobile_state}")